@@ -1,20 +1,22 @@
-from AppOpener import close, open as appopen # Import functions to open and close apps.
 from webbrowser import open as webopen # Import web browser functionality.
-from pywhatkit import search, playonyt # Import functions for Google search and YouTube playback.
 from dotenv import dotenv_values #Import dotenv to manage environment variables.
-from bs4 import BeautifulSoup # Import BeautifulSoup for parsing HTML content.
 from rich import print #Import rich for styled console output.
-from groq import Groq
 import webbrowser
 import subprocess
-from AppOpener import run
-#Import Groq for AI chat functionalities.
 # Import webbrowser for opening URLS.
 # Import subprocess for interacting with the system.
-import requests # Import requests for making HTTP requests.
-import keyboard # Import keyboard for keyboard-related actions.
 import asyncio # Import asyncio for asynchronous programming.
 import os #Import us for operating system functionalities.
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.http_clients import http_clients # Shared keep-alive sessions and API clients.
+from Backend.lazy_imports import lazy_module # Heavy packages are imported on first use, not at startup.
+AppOpener = lazy_module("AppOpener") # Open and close apps.
+pywhatkit = lazy_module("pywhatkit") # Google search and YouTube playback.
+bs4 = lazy_module("bs4") # BeautifulSoup for parsing HTML content.
+keyboard = lazy_module("keyboard") # Keyboard-related actions.
+# Modules Main.py may import in the background after the GUI is up.
+PrewarmModules = ["AppOpener", "pywhatkit", "bs4", "keyboard"]
 # Load environment variables from the .env file.
 env_vars= dotenv_values(".env")
 GroqAPIKey = env_vars.get("GroqAPIKey") # Retrieve the Groq API key.
@@ -22,14 +24,12 @@ GroqAPIKey = env_vars.get("GroqAPIKey") # Retrieve the Groq API key.
 classes = ["zCubwf", "hgKElc", "LTKOO SY7ric", "Z0LcW", "gsrt vk_bk FzvWSb YwPhnf", "pclqee", "tw-Data-text tw-text-small tw-ta", "IZ6rdc", "05uR6d LTKOO", "vlzY6d", "webanswers-webanswers_table_webanswers-table", "dDoNo ikb4Bb gsrt", "sXLa0e", "LWkfKe", "VQF4g", "qv3Wpe", "kno-rdesc", "SPZz6b"]
 #Define a user-agent for making web requests.
 useragent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36'
-#Initialize the Groq client with the API key.
-client = Groq(api_key=GroqAPIKey)
 #Predefined professional responses for user interactions.
 professional_responses = ["Your satisfaction is my top priority; feel free to reach out if there's anything else I can help you with.", "I'm at your service for any additional questions or support you may need-don't hesitate to ask.",]#List to store chatbot messages.
 messages = []
 SystemChatBot = [{"role": "system", "content": f"Hello, I am {os.environ['Username']}, You're a content writer. You have to write content like letters, codes, applications, essays, notes, songs, poems, etc."}] #Function to perform a Google search.
 def GoogleSearch(Topic):
-  search(Topic) # Use pywhatkit's search function to perform a Google search.
+  pywhatkit.search(Topic) # Use pywhatkit's search function to perform a Google search.
   return True # Indicate success.
 #Function to generate content using AI and save it to a file.
 #GoogleSearch("Mahatma Gandhi") #Function to generate content using AI and save it to a file.
@@ -43,7 +43,7 @@ def Content (Topic):
   # Nested function to generate content using the AI chatbot.
   def ContentWriterAI(prompt):
     messages.append({"role": "user", "content": f"{prompt}"}) # Add the user's prompt to messages.
-    completion = client.chat.completions.create(
+    completion = http_clients.groq(GroqAPIKey).chat.completions.create( # Shared Groq client, created on first use.
       #model="mixtral-8x7b-32768",  Specify the AI model.
       model="llama3-8b-8192",
       messages=SystemChatBot + messages, # Include system instructions and chat history.
@@ -82,12 +82,13 @@ def YouTubeSearch(Topic):
 
 # Function to play a video on YouTube.
 def PlayYoutube(query):
-  playonyt(query) # Use pywhatkit's playonyt function to play the video.
+  pywhatkit.playonyt(query) # Use pywhatkit's playonyt function to play the video.
   return True # Indicate success.
 
-def OpenApp(app, sess=requests.session()):
+def OpenApp(app, sess=None):
+  sess = sess or http_clients.session("web", headers={"User-Agent": useragent}) # Pooled session reused across calls.
   try:
-    appopen(app, match_closest=True, output=True, throw_error=True) # Attempt to open the app.
+    AppOpener.open(app, match_closest=True, output=True, throw_error=True) # Attempt to open the app.
     return True # Indicate success.
   except:
     if app.lower() == "essl":
@@ -104,7 +105,7 @@ def OpenApp(app, sess=requests.session()):
     def extract_links(html):
       if html is None:
         return []
-      soup = BeautifulSoup(html, 'html.parser') # Parse the HTML content.
+      soup = bs4.BeautifulSoup(html, 'html.parser') # Parse the HTML content.
       links = soup.find_all('a', {'jsname': 'UWckNb'}) # Find relevant links.
       return [link.get('href') for link in links] # Return the links.
 
@@ -133,7 +134,7 @@ def CloseApp(app):
     pass # Skip if the app is Chrome.
   else:
     try:
-      close(app, match_closest=True, output=True, throw_error=True) # Attempt to close the app.
+      AppOpener.close(app, match_closest=True, output=True, throw_error=True) # Attempt to close the app.
       return True # Indicate success.
     except:
       return False # Indicate failure.
@@ -1,5 +1,4 @@
 # Enhanced Chatbot.py - Added summarization capabilities like RTSE
-from groq import Groq
 import datetime
 from dotenv import dotenv_values
 import os
@@ -10,6 +9,7 @@ import re
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from Data.database import db
+from Backend.http_clients import http_clients
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -20,7 +20,7 @@ GroqAPIKey = env_vars.get("GroqAPIKey")
 if not GroqAPIKey:
     raise ValueError("GroqAPIKey not found in environment variables")
 
-client = Groq(api_key=GroqAPIKey)
+client = http_clients.groq(GroqAPIKey)
 
 class ChatBot:
     def __init__(self):
@@ -1,33 +1,42 @@
-import asyncio
 import os
+import sys
+import time
+import itertools
+import threading
 import requests
+from queue import PriorityQueue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from random import randint
 from PIL import Image
 from dotenv import load_dotenv
 from time import sleep
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.http_clients import http_clients
+
 # Load API key from .env file
 load_dotenv()
 API_KEY = os.getenv("HuggingFaceAPIKey")
 
-if not API_KEY:
-    raise ValueError("API key is missing! Please check your .env file.")
-
 # API details for Hugging Face Stable Diffusion model
 API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
 headers = {"Authorization": f"Bearer {API_KEY}"}
 
+# Worker tuning
+DEFAULT_VARIANTS = int(os.getenv("ImageVariants", "4"))
+VARIANT_CONCURRENCY = int(os.getenv("ImageVariantConcurrency", "4"))
+REQUEST_TIMEOUT = 120  # seconds per variant
+
 # Function to open and display images
-def open_images(prompt):
+def open_images(prompt, files=None):
     folder_path = "Data"
     prompt = prompt.replace(" ", "_")
 
     # List all generated files
-    files = [f"{prompt}{i}.jpg" for i in range(1, 5)]
-    
-    for jpg_file in files:
-        image_path = os.path.join(folder_path, jpg_file)
-        
+    if files is None:
+        files = [os.path.join(folder_path, f"{prompt}{i}.jpg") for i in range(1, DEFAULT_VARIANTS + 1)]
+
+    for image_path in files:
         try:
             if os.path.exists(image_path) and os.path.getsize(image_path) > 0:
                 img = Image.open(image_path)
@@ -39,77 +48,187 @@ def open_images(prompt):
         except IOError:
             print(f"Unable to open {image_path}")
 
-# Async function to query Hugging Face API
-async def query(payload):
-    response = await asyncio.to_thread(requests.post, API_URL, headers=headers, json=payload)
-
-    if response.status_code != 200:
-        print(f"API Error {response.status_code}: {response.text}")
-        return None
-    
-    return response.content
 
-# Async function to generate images
-async def generate_images(prompt: str):
-    tasks = []
-    prompt = prompt.replace(" ", "_")
-
-    # Create 4 image generation tasks
-    for i in range(4):
+class ImageJob:
+    """A queued image generation request"""
+
+    def __init__(self, job_id, prompt, priority=0, variants=DEFAULT_VARIANTS):
+        self.id = job_id
+        self.prompt = prompt
+        self.priority = priority
+        self.variants = max(1, int(variants))
+        self.cancelled = threading.Event()
+        self.queued_at = time.perf_counter()
+
+
+class ImageWorker:
+    """Resident worker: priority job queue, shared HTTP pool and concurrent variants per job"""
+
+    def __init__(self, notify=None, variant_concurrency=VARIANT_CONCURRENCY):
+        self.notify = notify or (lambda kind, **payload: None)
+        self.queue = PriorityQueue()
+        self.jobs = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        # One keep-alive connection pool reused by every job
+        self.session = http_clients.session("huggingface", pool_maxsize=variant_concurrency, headers=headers)
+        self.executor = ThreadPoolExecutor(max_workers=variant_concurrency, thread_name_prefix="ImageVariant")
+
+        self._thread = threading.Thread(target=self._run, name="ImageWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, job: ImageJob):
+        """Queue a job; lower priority values run first, FIFO within a priority"""
+        with self._lock:
+            self.jobs[job.id] = job
+        self.queue.put((job.priority, next(self._sequence), job))
+        self.notify('queued', id=job.id, prompt=job.prompt, position=self.queue.qsize())
+
+    def cancel(self, job_id) -> bool:
+        """Cancel a queued job, or the variants of a running job that have not started yet"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if not job:
+            return False
+        job.cancelled.set()
+        return True
+
+    def stop(self):
+        self.queue.put((float('-inf'), next(self._sequence), None))
+        self._thread.join(timeout=5)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self):
+        while True:
+            _, _, job = self.queue.get()
+            if job is None:
+                break
+            try:
+                if job.cancelled.is_set():
+                    self.notify('error', id=job.id, prompt=job.prompt, error='cancelled')
+                    continue
+                self.run_job(job)
+            except Exception as e:
+                print(f"Error: {e}")
+                self.notify('error', id=job.id, prompt=job.prompt, error=str(e))
+            finally:
+                with self._lock:
+                    self.jobs.pop(job.id, None)
+
+    def query(self, payload):
+        """POST one variant request over the shared session"""
+        response = self.session.post(API_URL, json=payload, timeout=REQUEST_TIMEOUT)
+
+        if response.status_code != 200:
+            print(f"API Error {response.status_code}: {response.text}")
+            return None
+
+        return response.content
+
+    def _generate_variant(self, job: ImageJob, index: int):
+        if job.cancelled.is_set():
+            return index, None, 0.0
+        started = time.perf_counter()
         payload = {
-            "inputs": f"{prompt}, quality=4K, sharpness=maximum, Ultra High details, high resolution, seed={randint(0, 1000000)}"
+            "inputs": f"{job.prompt.replace(' ', '_')}, quality=4K, sharpness=maximum, Ultra High details, high resolution, seed={randint(0, 1000000)}"
         }
-        task = asyncio.create_task(query(payload))
-        tasks.append(task)
-
-    # Wait for all tasks to complete
-    image_bytes_list = await asyncio.gather(*tasks)
-
-    # Ensure "Data" folder exists
-    os.makedirs("Data", exist_ok=True)
-
-    for i, image_bytes in enumerate(image_bytes_list):
-        file_path = f"Data/{prompt}{i + 1}.jpg"
-        
-        if image_bytes:  # Only save if valid
-            with open(file_path, "wb") as f:
-                f.write(image_bytes)
-            
-            # Verify if the saved file is a valid image
-            try:
-                Image.open(file_path).verify()  # Check if it's a real image
-            except:
-                print(f"Error: {file_path} is not a valid image!")
-                os.remove(file_path)  # Delete the corrupted file
-        else:
-            print(f"Skipping {file_path} (API returned invalid data)")
+        try:
+            image_bytes = self.query(payload)
+        except requests.RequestException as e:
+            print(f"API request failed: {e}")
+            image_bytes = None
+        return index, image_bytes, (time.perf_counter() - started) * 1000
+
+    def run_job(self, job: ImageJob):
+        """Generate all variants of a job and report progress and timings"""
+        if not API_KEY:
+            raise ValueError("API key is missing! Please check your .env file.")
+
+        started = time.perf_counter()
+        self.notify('started', id=job.id, prompt=job.prompt, queued_ms=round((started - job.queued_at) * 1000, 1))
+
+        prompt = job.prompt.replace(" ", "_")
+        os.makedirs("Data", exist_ok=True)
+
+        futures = [self.executor.submit(self._generate_variant, job, i) for i in range(job.variants)]
+        saved_files = []
+        variant_ms = []
+        completed = 0
+
+        for future in as_completed(futures):
+            index, image_bytes, elapsed_ms = future.result()
+            completed += 1
+            file_path = f"Data/{prompt}{index + 1}.jpg"
+
+            if image_bytes:  # Only save if valid
+                with open(file_path, "wb") as f:
+                    f.write(image_bytes)
+
+                # Verify if the saved file is a valid image
+                try:
+                    Image.open(file_path).verify()  # Check if it's a real image
+                    saved_files.append(file_path)
+                    variant_ms.append(round(elapsed_ms, 1))
+                except:
+                    print(f"Error: {file_path} is not a valid image!")
+                    os.remove(file_path)  # Delete the corrupted file
+            elif not job.cancelled.is_set():
+                print(f"Skipping {file_path} (API returned invalid data)")
+
+            self.notify('progress', id=job.id, prompt=job.prompt, completed=completed, total=job.variants)
+
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        if job.cancelled.is_set():
+            self.notify('error', id=job.id, prompt=job.prompt, error='cancelled', files=sorted(saved_files))
+            return saved_files
+
+        self.notify('done', id=job.id, prompt=job.prompt, files=sorted(saved_files),
+                    total_ms=total_ms, variant_ms=variant_ms)
+        open_images(job.prompt, sorted(saved_files))
+        return saved_files
 
-def GenerateImages(prompt: str):
-    asyncio.run(generate_images(prompt))
-    open_images(prompt)
 
-# Main loop to monitor image generation requests
-while True:
+def GenerateImages(prompt: str):
+    """Generate and show images for a single prompt (standalone use)"""
+    worker = ImageWorker()
     try:
-        with open("Frontend/Files/ImageGeneration.data", "r") as f:
-            data = f.read().strip()
-
-        if not data:
-            continue
-
-        prompt, status = data.split(",")
+        job = ImageJob("standalone", prompt)
+        return worker.run_job(job)
+    finally:
+        worker.stop()
+
+def serve(channel):
+    """Block on the channel and feed requests to the resident worker until told to shut down"""
+    worker = ImageWorker(notify=channel.send)
+
+    while True:
+        request = channel.recv()
+        if request is None or request.get('type') == 'shutdown':
+            break
 
-        if status.strip().lower() == "true":
+        if request.get('type') == 'generate':
             print("Generating Images ...")
-            GenerateImages(prompt=prompt.strip())
-
-            # Reset the status in the file after generating images
-            with open("Frontend/Files/ImageGeneration.data", "w") as f:
-                f.write("False, False")
-
-            break
-        else:
-            sleep(1)
-    except Exception as e:
-        print(f"Error: {e}")
-        sleep(1)
+            worker.submit(ImageJob(
+                request.get('id'),
+                str(request.get('prompt', '')).strip(),
+                priority=request.get('priority', 0),
+                variants=request.get('variants', DEFAULT_VARIANTS)
+            ))
+        elif request.get('type') == 'cancel':
+            worker.cancel(request.get('id'))
+
+    worker.stop()
+    channel.close()
+
+if __name__ == "__main__":
+    from Backend.ipc_channel import connect_from_env
+
+    worker_channel = connect_from_env()
+    if worker_channel:
+        # Long-lived worker started by Backend/image_client.py
+        serve(worker_channel)
+    else:
+        # Standalone testing
+        while True:
+            GenerateImages(input("Enter the image prompt: ").strip())
@@ -1,10 +1,22 @@
-import cohere
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
 from rich import print
 from dotenv import dotenv_values
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.intent_classifier import intent_classifier
+from Backend.http_clients import http_clients
 
 env_vars = dotenv_values(".env")
 CohereAPIKey = env_vars.get("CohereAPIKey")
-co = cohere.Client(api_key=CohereAPIKey)
+co = http_clients.cohere(CohereAPIKey)
+
+DecisionCacheTTL = float(env_vars.get("DecisionCacheTTL", "3600"))  # seconds
+DecisionCacheSize = int(env_vars.get("DecisionCacheSize", "256"))
+MaxDecisionRetries = 2
 
 funcs = [
     "exit", "general", "realtime", "open", "close", "play", "generate image", "system", "content", "google search",
@@ -60,10 +72,106 @@ ChatHistory = [
     {"role": "Chatbot", "message": "general chat with me."}
 ]
 
+intent_classifier.train_from_history(ChatHistory)
+intent_classifier.train(intent_classifier.load_log())
+
+class DecisionCache:
+    """TTL + LRU cache of FirstLayerDMM decisions keyed by exact and normalized prompt text"""
+
+    def __init__(self, ttl: float = DecisionCacheTTL, max_size: int = DecisionCacheSize):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'exact_hits': 0, 'normalized_hits': 0, 'local_hits': 0, 'misses': 0,
+                      'remote_calls': 0, 'remote_ms_total': 0.0, 'saved_ms': 0.0}
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace so trivial variations share an entry"""
+        text = re.sub(r"[^\w\s']", " ", prompt.lower())
+        return " ".join(text.split())
+
+    def get(self, prompt: str):
+        """Return a cached decision or None"""
+        key = self.normalize(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            original, decision, stored_at = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['exact_hits' if original == prompt else 'normalized_hits'] += 1
+            self.stats['saved_ms'] += self._average_remote_ms()
+            return list(decision)
+
+    def put(self, prompt: str, decision: list):
+        if not decision:
+            return
+        key = self.normalize(prompt)
+        with self._lock:
+            self._entries[key] = (prompt, list(decision), time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def record_remote(self, elapsed_ms: float):
+        """Record the latency of one remote classifier call"""
+        with self._lock:
+            self.stats['remote_calls'] += 1
+            self.stats['remote_ms_total'] += elapsed_ms
+
+    def record_local(self):
+        """Record a decision made by the local classifier instead of the remote model"""
+        with self._lock:
+            self.stats['local_hits'] += 1
+            self.stats['saved_ms'] += self._average_remote_ms()
+
+    def _average_remote_ms(self) -> float:
+        calls = self.stats['remote_calls']
+        return self.stats['remote_ms_total'] / calls if calls else 0.0
+
+    def get_stats(self) -> dict:
+        """Hit rate and the classifier latency avoided by the cache and fast path"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['avg_remote_ms'] = round(self._average_remote_ms(), 1)
+            stats['saved_ms'] = round(stats['saved_ms'], 1)
+        served = stats['exact_hits'] + stats['normalized_hits'] + stats['local_hits']
+        total = served + stats['remote_calls']
+        stats['hit_rate'] = round(served / total, 3) if total else 0.0
+        return stats
+
+
+decision_cache = DecisionCache()
 
 def FirstLayerDMM(prompt: str = "test"):
+    cached = decision_cache.get(prompt)
+    if cached:
+        return cached
+
+    # High-confidence commands are resolved locally in microseconds
+    decision = intent_classifier.classify(prompt)
+    if decision:
+        decision_cache.record_local()
+        decision_cache.put(prompt, decision)
+        return decision
+
+    decision = RemoteDecision(prompt)
+    decision_cache.put(prompt, decision)
+    intent_classifier.log_decision(prompt, decision)
+    return decision
+
+def RemoteDecision(prompt: str, attempt: int = 0):
     messages.append({"role": "user", "content": f"{prompt}"})
 
+    started = time.perf_counter()
     stream = co.chat_stream(
         model='command-r-plus',
         message=prompt,
@@ -79,6 +187,8 @@ def FirstLayerDMM(prompt: str = "test"):
         if event.event_type == "text-generation":
             response += event.text
 
+    decision_cache.record_remote((time.perf_counter() - started) * 1000)
+
     response = response.replace("\n", "")
     response = response.split(",")
     response = [i.strip() for i in response]
@@ -92,12 +202,16 @@ def FirstLayerDMM(prompt: str = "test"):
 
     response = temp
 
-    if "(query)" in response:
-        newresponse = FirstLayerDMM(prompt=prompt)
-        return newresponse
+    if any("(query)" in task for task in response):
+        # The model echoed the template; retry a bounded number of times
+        if attempt < MaxDecisionRetries:
+            return RemoteDecision(prompt=prompt, attempt=attempt + 1)
+        return [f"general {prompt}"]
     else:
         return response
 
 if __name__ == "__main__":
     while True:
-        print(FirstLayerDMM(input(">>> ")))
\ No newline at end of file
+        print(FirstLayerDMM(input(">>> ")))
+        print(decision_cache.get_stats())
+        print(intent_classifier.get_stats())
\ No newline at end of file
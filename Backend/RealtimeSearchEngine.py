@@ -1,94 +1,21 @@
 import datetime
-from dotenv import dotenv_values
-from time import sleep
 import os
+import re
 import sys
-import requests
-from typing import List, Dict, Optional
+import threading
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
 import json
 from dotenv import dotenv_values
 
-# Try to import SerpAPI with fallback handling
-SERPAPI_AVAILABLE = False
-GoogleSearch = None
-SERPAPI_TYPE = None
-
-#Assistant name
-env_vars = dotenv_values(".env")
-Username = env_vars.get("Username", "User")
-Assistantname = env_vars.get("Assistantname", "Assistant")
-
-def detect_serpapi_package():
-    """Detect which SerpAPI package is available and how to use it"""
-    global SERPAPI_AVAILABLE, GoogleSearch, SERPAPI_TYPE
-    
-    # Method 1: Try legacy google-search-results package
-    try:
-        from serpapi import GoogleSearch as LegacyGoogleSearch
-        GoogleSearch = LegacyGoogleSearch
-        SERPAPI_AVAILABLE = True
-        SERPAPI_TYPE = "legacy"
-        print("✓ Using legacy google-search-results package")
-        return True
-    except ImportError:
-        pass
-    
-    # Method 2: Try newer serpapi package with GoogleSearch
-    try:
-        import serpapi
-        if hasattr(serpapi, 'GoogleSearch'):
-            GoogleSearch = serpapi.GoogleSearch
-            SERPAPI_AVAILABLE = True
-            SERPAPI_TYPE = "new_with_googlesearch"
-            print("✓ Using newer serpapi package with GoogleSearch")
-            return True
-    except ImportError:
-        pass
-    
-    # Method 3: Try newer serpapi package with direct API
-    try:
-        import serpapi
-        import requests
-        SERPAPI_AVAILABLE = True
-        SERPAPI_TYPE = "new_direct_api"
-        print("✓ Using newer serpapi package with direct API calls")
-        return True
-    except ImportError:
-        pass
-    
-    # No SerpAPI package found
-    print("⚠ Warning: No SerpAPI package found.")
-    print("Please install one of the following:")
-    print("  pip install google-search-results  # Recommended legacy package")
-    print("  pip install serpapi               # Newer package")
-    SERPAPI_AVAILABLE = False
-    return False
-
-# Detect available SerpAPI package
-detect_serpapi_package()
-
-# Try to import Google Gemini
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-    print("✓ Google Gemini AI available")
-except ImportError:
-    print("Warning: Google Gemini package not found. Please install with: pip install google-generativeai")
-    GEMINI_AVAILABLE = False
-    genai = None
-
-# Try to import Groq (fallback)
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-    print("✓ Groq available (fallback)")
-except ImportError:
-    print("Warning: Groq package not found. Please install with: pip install groq")
-    GROQ_AVAILABLE = False
-    Groq = None
-
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.lru_cache import memory_cache_key, search_memory_cache
+from Backend.query_similarity import QueryIndex
+from Backend.llm_hedging import llm_caller
+from Backend.lazy_imports import prewarm
+from Backend.search_providers import (LLMBackend, available_llm_backends, detect_backends,
+                                      resolve_llm_backends, resolve_search_provider)
 
 # Try to import the database, with fallback for testing
 try:
@@ -103,107 +30,157 @@ except ImportError:
 env_vars = dotenv_values(".env")
 Username = env_vars.get("Username", "User")
 Assistantname = env_vars.get("Assistantname", "Ray")
-GeminiAPIKey = env_vars.get("GeminiAPIKey")  # New Gemini API key
-GroqAPIKey = env_vars.get("GroqAPIKey")      # Fallback
-SerpAPIKey = env_vars.get("SerpAPIKey")
-
-# Check API keys
-if not GeminiAPIKey and GEMINI_AVAILABLE:
-    print("Warning: GeminiAPIKey not found in environment variables")
-
-if not GroqAPIKey and GROQ_AVAILABLE:
-    print("Warning: GroqAPIKey not found in environment variables")
-
-if not SerpAPIKey and SERPAPI_AVAILABLE:
-    print("Warning: SerpAPIKey not found in environment variables")
-
-# Initialize AI clients
-gemini_model = None
-groq_client = None
-
-# Primary: Initialize Gemini
-if GEMINI_AVAILABLE and GeminiAPIKey:
-    try:
-        genai.configure(api_key=GeminiAPIKey)
-        gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-        print("✓ Gemini model initialized (Primary AI)")
-    except Exception as e:
-        print(f"Warning: Failed to initialize Gemini: {e}")
-        GEMINI_AVAILABLE = False
-
-# Fallback: Initialize Groq
-if GROQ_AVAILABLE and GroqAPIKey:
-    try:
-        groq_client = Groq(api_key=GroqAPIKey)
-        print("✓ Groq client initialized (Fallback AI)")
-    except Exception as e:
-        print(f"Warning: Failed to initialize Groq: {e}")
-        GROQ_AVAILABLE = False
+# Minimum estimated Jaccard similarity for serving a rephrased query from cache (0 disables);
+# the content words must also be identical, see query_similarity.content_words
+SearchCacheSimilarity = float(env_vars.get("SearchCacheSimilarity", "0.85"))
+
+# Freshness tiers: (query class, pattern, cache TTL in minutes); first match wins
+FreshnessTiers = [
+    ("live", re.compile(r"\b(scores?|live|weather|temperature|forecast|stocks?|share price|price|exchange rate|traffic|right now)\b"), 10),
+    ("news", re.compile(r"\b(news|latest|headlines?|today|tonight|recent|updates?|breaking|this week)\b"), 60),
+    ("reference", re.compile(r"\b(who (was|were)|biography|history of|born|died|founded|invented|capital of|definition|meaning of)\b"), 10080),
+]
+DefaultFreshness = ("general", 360)
+
+def classify_freshness(query: str) -> Tuple[str, int]:
+    """Return (query class, TTL in minutes) for a search query"""
+    text = query.lower()
+    for query_class, pattern, ttl in FreshnessTiers:
+        if pattern.search(text):
+            return query_class, ttl
+    return DefaultFreshness
 
 class RealtimeSearchEngine:
-    def __init__(self):
-        """Initialize the enhanced realtime search engine with Gemini integration"""
-        self.gemini_model = gemini_model
-        self.groq_client = groq_client
-        self.serpapi_key = SerpAPIKey
-        self.search_cache_duration = 30  # minutes
+    def __init__(self, search_provider: str = None, llm_backends: List[str] = None,
+                 system_prompt: Callable[[], str] = None, max_tokens: int = None, max_lines: int = None):
+        """
+        Initialize the realtime search engine
+        
+        Args:
+            search_provider: 'serpapi' or 'googlesearch'; defaults to the first one installed
+            llm_backends: LLM names in fallback order, e.g. ['gemini', 'groq']
+            system_prompt: Callable building the LLM system prompt; None keeps each backend's default
+            max_tokens: Answer token limit; None keeps each backend's default
+            max_lines: Keep only this many non-empty lines of each answer; None keeps all
+        """
+        # Backends (and their SDK imports) are resolved once, on first use or by prewarm()
+        self._search_preference = search_provider
+        self._llm_preference = llm_backends
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.max_lines = max_lines
+        self._search_provider = None
+        self._llm_backends = None
+        self._ai_priority = "simple"
+        self._resolved = False
+        self._resolve_lock = threading.Lock()
+        self.llm_caller = llm_caller  # hedges/races the backends and keeps their latency histograms
         self.max_search_results = 5
-        self.rate_limit_delay = 2  # seconds between searches
-        self.cache = {}  # In-memory cache fallback
-        
-        # AI Service Priority: Gemini > Groq > Simple Formatting
-        self.ai_priority = self._determine_ai_priority()
-        
-        # Check if required services are available
-        if not SERPAPI_AVAILABLE:
-            print("Warning: SerpAPI not available. Search functionality will be limited.")
-        if not GEMINI_AVAILABLE and not GROQ_AVAILABLE:
-            print("Warning: No AI services available. Response generation will be limited.")
-        
-    def _determine_ai_priority(self) -> str:
-        """Determine which AI service to use based on availability"""
-        if GEMINI_AVAILABLE and self.gemini_model:
-            return "gemini"
-        elif GROQ_AVAILABLE and self.groq_client:
-            return "groq"
-        else:
-            return "simple"
-        
-    def process(self, query: str, conversation_id: str = None) -> str:
+        self.search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="WebSearch")
+        self.similar_queries = QueryIndex(threshold=SearchCacheSimilarity)
+        self._load_similarity_index()
+        self.cache = search_memory_cache  # In-memory LRU fallback, shared by all engines
+
+    def _ensure_backends(self):
+        """Resolve the search provider and LLM backends, importing their SDKs, exactly once"""
+        if self._resolved:
+            return
+        with self._resolve_lock:
+            if self._resolved:
+                return
+            self._search_provider = resolve_search_provider(self._search_preference)
+            self._llm_backends = self._with_engine_options(resolve_llm_backends(self._llm_preference))
+            
+            # AI Service Priority: first LLM backend, falling back down the list, then simple formatting
+            self._ai_priority = self._llm_backends[0].name if self._llm_backends else "simple"
+            
+            # Check if required services are available
+            if not self._search_provider:
+                print("Warning: No search provider available. Search functionality will be limited.")
+            if not self._llm_backends:
+                print("Warning: No AI services available. Response generation will be limited.")
+            self._resolved = True
+
+    def _with_engine_options(self, backends: List[LLMBackend]) -> List[LLMBackend]:
+        """Copies of the backends using this engine's system prompt and token limit, if it sets them"""
+        if self.system_prompt or self.max_tokens:
+            return [backend.with_options(self.system_prompt, self.max_tokens) for backend in backends]
+        return backends
+
+    def prewarm(self, delay: float = 0.0) -> threading.Thread:
+        """Resolve backends on a background thread so the first search doesn't pay for SDK imports"""
+        return prewarm([self._ensure_backends], delay)
+
+    @property
+    def search_provider(self):
+        self._ensure_backends()
+        return self._search_provider
+
+    @property
+    def llm_backends(self) -> List[LLMBackend]:
+        self._ensure_backends()
+        return self._llm_backends
+
+    @llm_backends.setter
+    def llm_backends(self, backends: List[LLMBackend]):
+        self._ensure_backends()
+        self._llm_backends = backends
+
+    @property
+    def rate_limiter(self):
+        return self.search_provider.rate_limiter if self.search_provider else None
+
+    @property
+    def ai_priority(self) -> str:
+        self._ensure_backends()
+        return self._ai_priority
+
+    @ai_priority.setter
+    def ai_priority(self, service: str):
+        self._ensure_backends()
+        self._ai_priority = service
+        
+    def process(self, query: Union[str, List[str]], conversation_id: str = None,
+                max_age_minutes: int = None, max_results: int = None) -> str:
         """
         Main processing method for search queries
         
         Args:
-            query: Search query/prompt
+            query: Search query/prompt, or a list of sub-queries searched in parallel
             conversation_id: Current conversation ID for context
+            max_age_minutes: Accept cached answers up to this old instead of the query class TTL
+            max_results: Results per search instead of self.max_search_results
             
         Returns:
             Processed search response
         """
         try:
             # Check if services are available
-            if not SERPAPI_AVAILABLE:
+            if not self.search_provider:
                 return "Search service is not available. Please install SerpAPI package."
             
-            # Check cache first
-            cached_result = self._get_cached_result(query)
+            queries = self._as_query_list(query)
+            query = " and ".join(queries)
+            
+            # Check cache first; a stored answer is returned without touching the LLM
+            cached_result = self._get_cached_result(query, max_age_minutes)
             if cached_result:
                 return self._format_cached_response(cached_result, query)
             
-            # Perform new search
-            search_results = self._perform_google_search(query)
+            # Perform new search(es)
+            search_results, search_context = self._search_all(queries, max_results)
             
             if not search_results:
                 return self._handle_no_results(query)
             
             # Generate AI response with search context (priority: Gemini > Groq > Simple)
-            response = self._generate_search_response(query, search_results, conversation_id)
+            response, answered = self._generate_search_response(query, search_results, conversation_id, search_context)
             
-            # Cache the results
+            # Cache the results; fallback and error texts are not stored, so a later hit regenerates them
             cache_data = {
                 'query': query,
                 'results': search_results,
-                'response': response,
+                'response': response if answered else '',
                 'ai_service': self.ai_priority,
                 'timestamp': datetime.datetime.now().isoformat()
             }
@@ -219,18 +196,16 @@ class RealtimeSearchEngine:
     def search(self, query: str, time_filter: str = 'recent', max_results: int = 3) -> str:
         """Wrapper method for compatibility with MainWindow expectations"""
         try:
-            # Configure based on time filter
+            # Per-call settings are passed down rather than stored on the shared instance
             if time_filter == 'day':
-                self.search_cache_duration = 1440  # 24 hours
+                max_age_minutes = 1440  # 24 hours
             elif time_filter == 'week':
-                self.search_cache_duration = 10080  # 1 week
-            else:  # recent/default
-                self.search_cache_duration = 30  # minutes
-            
-            self.max_search_results = max_results
+                max_age_minutes = 10080  # 1 week
+            else:  # recent/default: the query class decides
+                max_age_minutes = None
         
             # Perform the search
-            result = self.process(query)
+            result = self.process(query, max_age_minutes=max_age_minutes, max_results=max_results)
         
             # Format for MainWindow expectations
             if "No search results" in result:
@@ -242,312 +217,319 @@ class RealtimeSearchEngine:
             print(f"Search wrapper error: {e}")
             return ""   
 
-    def _get_cached_result(self, query: str) -> Optional[Dict]:
-        """Get cached search results with fallback"""
+    @staticmethod
+    def _as_query_list(query: Union[str, List[str]]) -> List[str]:
+        """Normalize a query or list of sub-queries to a de-duplicated list"""
+        queries = [query] if isinstance(query, str) else list(query)
+        return list(dict.fromkeys(q.strip() for q in queries if q and q.strip())) or [""]
+
+    def _search_all(self, queries: List[str], max_results: int = None) -> Tuple[List[Dict], str]:
+        """
+        Search one query, or fan several sub-queries out in parallel
+        
+        Returns:
+            (all search results, search context fused into one LLM prompt section)
+        """
+        if len(queries) == 1:
+            search_results = self._perform_google_search(queries[0], max_results)
+            return search_results, self._build_search_context(search_results)
+        
+        groups = self._search_many(queries, max_results)
+        search_results = [result for _, results in groups for result in results]
+        return search_results, self._build_multi_search_context(groups)
+
+    def _search_many(self, queries: List[str], max_results: int = None) -> List[Tuple[str, List[Dict]]]:
+        """Search sub-queries concurrently, each with its own cache lookup; results keep query order"""
+        groups = []
+        futures = {}
+        for sub_query in queries:
+            cached = self._get_cached_result(sub_query)
+            results = self._cached_search_results(cached) if cached else []
+            if not results:
+                futures[sub_query] = self.search_pool.submit(self._perform_google_search, sub_query, max_results)
+            groups.append((sub_query, results))
+        
+        for i, (sub_query, results) in enumerate(groups):
+            if sub_query not in futures:
+                continue
+            results = futures[sub_query].result() or []
+            if results:
+                # Cache the raw results so a later question about this part alone is a hit
+                self._save_to_cache(sub_query, {
+                    'query': sub_query,
+                    'results': results,
+                    'response': '',
+                    'ai_service': self.ai_priority,
+                    'timestamp': datetime.datetime.now().isoformat()
+                })
+            groups[i] = (sub_query, results)
+        
+        return groups
+
+    @staticmethod
+    def _cached_search_results(cached_data: Dict) -> List[Dict]:
+        """Search results stored in a cache entry"""
+        results = cached_data.get('results', [])
+        return results if isinstance(results, list) else []
+
+    def _build_multi_search_context(self, groups: List[Tuple[str, List[Dict]]]) -> str:
+        """Build one LLM search context with a section per sub-query"""
+        context = ""
+        for sub_query, results in groups:
+            context += f"\n### Results for: {sub_query}\n"
+            context += self._build_search_context(results) + "\n"
+        return context
+
+    def _load_similarity_index(self):
+        """Seed the near-duplicate index with recently cached queries"""
+        if DATABASE_AVAILABLE and db and SearchCacheSimilarity > 0:
+            try:
+                # Oldest first, so the newest queries end up most recently used
+                for cached_query in reversed(db.get_recent_search_queries(self.similar_queries.max_entries)):
+                    self.similar_queries.add(cached_query)
+            except Exception as e:
+                print(f"Similarity index load error: {e}")
+
+    def _get_cached_result(self, query: str, max_age_minutes: int = None) -> Optional[Dict]:
+        """Get cached search results, falling back to a near-duplicate of an earlier query"""
+        cached = self._get_exact_cached_result(query, max_age_minutes)
+        if cached or SearchCacheSimilarity <= 0:
+            return cached
+        
+        match = self.similar_queries.lookup(query)
+        if not match:
+            return None
+        similar_query, similarity = match
+        cached = self._get_exact_cached_result(similar_query, max_age_minutes)
+        if not cached:
+            # Expired or evicted since it was indexed
+            self.similar_queries.discard(similar_query)
+            return None
+        
+        # A stored answer saves the search and the LLM call; bare results only the search
+        self.similar_queries.record_hit(2 if cached.get('response') else 1)
+        print(f"Near-duplicate cache hit ({similarity:.2f}): '{query}' ~ '{similar_query}'")
+        return cached
+
+    def _get_exact_cached_result(self, query: str, max_age_minutes: int = None) -> Optional[Dict]:
+        """Get cached search results with fallback; entries expire by their own TTL unless max_age_minutes is given"""
         try:
             # Try database first if available
             if DATABASE_AVAILABLE and db:
-                return db.get_search_cache(query, self.search_cache_duration)
+                return db.get_search_cache(query, max_age_minutes)
             
             # Fallback to in-memory cache
-            cache_key = hash(query.lower().strip())
-            if cache_key in self.cache:
-                cached_data = self.cache[cache_key]
-                timestamp = datetime.datetime.fromisoformat(cached_data['timestamp'])
-                now = datetime.datetime.now()
-                
-                # Check if cache is still valid
-                if (now - timestamp).total_seconds() < (self.search_cache_duration * 60):
-                    return cached_data
-                else:
-                    # Remove expired cache
-                    del self.cache[cache_key]
-            
-            return None
+            max_age = max_age_minutes * 60 if max_age_minutes is not None else None
+            return self.cache.get(memory_cache_key(query), max_age=max_age)
             
         except Exception as e:
             print(f"Cache retrieval error: {e}")
             return None
 
     def _save_to_cache(self, query: str, cache_data: Dict):
-        """Save to cache with fallback"""
+        """Save to cache with fallback, tagging the entry with its freshness tier"""
         try:
+            query_class, ttl = classify_freshness(query)
+            cache_data['query_class'] = query_class
+            cache_data['cache_duration'] = ttl
+            
             # Try database first if available
             if DATABASE_AVAILABLE and db:
-                db.save_search_result(query, cache_data, cache_data.get('ai_service', 'unknown'))
-            
-            # Always save to in-memory cache as backup
-            cache_key = hash(query.lower().strip())
-            self.cache[cache_key] = cache_data
-            
-            # Limit in-memory cache size
-            if len(self.cache) > 50:
-                # Remove oldest entries
-                oldest_key = min(self.cache.keys(), 
-                               key=lambda k: self.cache[k]['timestamp'])
-                del self.cache[oldest_key]
+                db.save_search_result(query, cache_data, cache_data.get('ai_service', 'unknown'), ttl)
+            
+            self.similar_queries.add(query)
+            
+            # Always save to in-memory cache as backup; the LRU bounds entries and bytes
+            self.cache.set(memory_cache_key(query), cache_data, ttl=ttl * 60)
                 
         except Exception as e:
             print(f"Cache save error: {e}")
 
-    def _perform_google_search(self, query: str) -> List[Dict]:
+    def _perform_google_search(self, query: str, max_results: int = None) -> List[Dict]:
         """
-        Perform Google search using SerpAPI and return structured results
+        Search the web with the configured provider and return structured results
         
         Args:
             query: Search query
+            max_results: Number of results to request (defaults to self.max_search_results)
             
         Returns:
             List of search result dictionaries
         """
         try:
-            if not SERPAPI_AVAILABLE or not self.serpapi_key:
-                print("SerpAPI not available or API key missing")
+            if not self.search_provider:
+                print("No search provider available")
                 return []
             
-            # Add rate limiting
-            sleep(self.rate_limit_delay)
+            # Only waits when the shared quota is actually exhausted
+            self.rate_limiter.acquire()
             
-            print(f"Searching Google via SerpAPI for: {query}")
+            print(f"Searching Google via {self.search_provider.name} for: {query}")
             
-            # Handle different SerpAPI package types
-            if SERPAPI_TYPE == "legacy":
-                return self._search_legacy_serpapi(query)
-            elif SERPAPI_TYPE == "new_with_googlesearch":
-                return self._search_new_with_googlesearch(query)
-            elif SERPAPI_TYPE == "new_direct_api":
-                return self._search_new_direct_api(query)
-            else:
-                print(f"Unknown SerpAPI type: {SERPAPI_TYPE}")
-                return []
+            results = self.search_provider.search(query, max_results or self.max_search_results)
+            print(f"Found {len(results)} search results")
+            return results
                 
         except Exception as e:
-            print(f"SerpAPI search error: {e}")
-            return []
-
-    def _search_legacy_serpapi(self, query: str) -> List[Dict]:
-        """Search using legacy google-search-results package"""
-        try:
-            # Set up SerpAPI search parameters
-            search_params = {
-                "q": query,
-                "api_key": self.serpapi_key,
-                "num": self.max_search_results,
-                "hl": "en",
-                "gl": "us"
-            }
-            
-            # Create GoogleSearch instance and perform search
-            search = GoogleSearch(search_params)
-            results = search.get_dict()
-            
-            return self._extract_search_results(results)
-            
-        except Exception as e:
-            print(f"Legacy SerpAPI search error: {e}")
-            return []
-
-    def _search_new_with_googlesearch(self, query: str) -> List[Dict]:
-        """Search using newer serpapi package with GoogleSearch class"""
-        try:
-            search = GoogleSearch({
-                "q": query,
-                "api_key": self.serpapi_key,
-                "num": self.max_search_results,
-                "hl": "en",
-                "gl": "us"
-            })
-            results = search.get_dict()
-            return self._extract_search_results(results)
-            
-        except Exception as e:
-            print(f"New SerpAPI (GoogleSearch) search error: {e}")
-            return []
-
-    def _search_new_direct_api(self, query: str) -> List[Dict]:
-        """Search using direct API calls when GoogleSearch is not available"""
-        try:
-            import requests
-            
-            params = {
-                "q": query,
-                "api_key": self.serpapi_key,
-                "num": self.max_search_results,
-                "hl": "en",
-                "gl": "us",
-                "engine": "google"
-            }
-            
-            response = requests.get("https://serpapi.com/search", params=params)
-            response.raise_for_status()
-            results = response.json()
-            
-            return self._extract_search_results(results)
-            
-        except Exception as e:
-            print(f"Direct API search error: {e}")
-            return []
-
-    def _extract_search_results(self, results: Dict) -> List[Dict]:
-        """Extract and structure search results from SerpAPI response"""
-        try:
-            # Extract organic results
-            organic_results = results.get("organic_results", [])
-            
-            # Structure the results
-            structured_results = []
-            for i, result in enumerate(organic_results):
-                try:
-                    structured_result = {
-                        'title': result.get('title', 'No Title'),
-                        'description': result.get('snippet', 'No Description'),
-                        'url': result.get('link', ''),
-                        'rank': i + 1
-                    }
-                    structured_results.append(structured_result)
-                except Exception as e:
-                    print(f"Error processing search result {i}: {e}")
-                    continue
-            
-            print(f"Found {len(structured_results)} search results")
-            return structured_results
-            
-        except Exception as e:
-            print(f"Error extracting search results: {e}")
+            print(f"{self.search_provider.name} search error: {e}")
             return []
 
     def _generate_search_response(self, query: str, search_results: List[Dict], 
-                                conversation_id: str = None) -> str:
+                                conversation_id: str = None, search_context: str = None) -> str:
         """
-        Generate AI response based on search results using Gemini (primary) or Groq (fallback)
+        Generate AI response based on search results, falling back down the LLM backend list
         
         Args:
             query: Original search query
             search_results: List of search result dictionaries
             conversation_id: Current conversation ID for context
+            search_context: Prebuilt context (e.g. fused from several sub-queries)
             
         Returns:
-            Generated response string with AI service indicator
+            (generated response string with AI service indicator, whether an LLM backend produced it)
         """
         try:
             # Build search context
-            search_context = self._build_search_context(search_results)
+            if search_context is None:
+                search_context = self._build_search_context(search_results)
             
             # Get conversation context if available
-            conversation_context = ""
-            if conversation_id and DATABASE_AVAILABLE and db:
-                try:
-                    recent_messages = db.get_conversation_context(conversation_id, limit=3)
-                    if recent_messages:
-                        conversation_context = "Recent conversation context:\n"
-                        for role, content in recent_messages[-3:]:
-                            conversation_context += f"{role}: {content}\n"
-                        conversation_context += "\n"
-                except Exception as e:
-                    print(f"Context retrieval error: {e}")
-            
-            # Try Gemini first (Primary AI)
-            if self.ai_priority == "gemini":
-                response = self._generate_gemini_response(query, search_context, conversation_context)
-                if response:
-                    return self._format_ai_response(response, "Gemini")
-            
-            # Fallback to Groq
-            if self.ai_priority in ["groq", "gemini"] and GROQ_AVAILABLE and self.groq_client:
-                response = self._generate_groq_response(query, search_context, conversation_context)
-                if response:
-                    return self._format_ai_response(response, "Groq")
+            conversation_context = self._build_conversation_context(conversation_id)
+            
+            # Try each LLM backend in priority order
+            response, backend = self._generate_with_fallback(query, search_context, conversation_context)
+            if response:
+                return self._format_ai_response(response, backend.label), True
             
             # Final fallback to simple response
-            return self._generate_simple_response(query, search_results)
+            return self._generate_simple_response(query, search_results), False
             
         except Exception as e:
-            return f"Error generating search response: {str(e)}"
+            return f"Error generating search response: {str(e)}", False
 
-    def _generate_gemini_response(self, query: str, search_context: str, conversation_context: str) -> str:
-        """Generate response using Google Gemini"""
+    def _build_conversation_context(self, conversation_id: str = None) -> str:
+        """Build the recent-conversation preamble for LLM prompts"""
+        conversation_context = ""
+        if conversation_id and DATABASE_AVAILABLE and db:
+            try:
+                recent_messages = db.get_conversation_context(conversation_id, limit=3)
+                if recent_messages:
+                    conversation_context = "Recent conversation context:\n"
+                    for role, content in recent_messages[-3:]:
+                        conversation_context += f"{role}: {content}\n"
+                    conversation_context += "\n"
+            except Exception as e:
+                print(f"Context retrieval error: {e}")
+        return conversation_context
+
+    def _generate_with_fallback(self, query: str, search_context: str,
+                                conversation_context: str) -> Tuple[Optional[str], Optional[LLMBackend]]:
+        """
+        Get an answer from the LLM backends; a slow primary is hedged with the next backend
+        
+        Returns:
+            (cleaned answer, backend that produced it) or (None, None)
+        """
+        response, backend = self.llm_caller.generate(
+            self.llm_backends,
+            lambda backend: backend.generate(query, search_context, conversation_context)
+        )
+        if response:
+            return self._clean_search_response(response), backend
+        return None, None
+
+    def process_stream(self, query: Union[str, List[str]], conversation_id: str = None,
+                       max_age_minutes: int = None, max_results: int = None):
+        """
+        Streaming variant of process: yields the answer while the LLM is still generating it
+        
+        Args:
+            query: Search query/prompt, or a list of sub-queries searched in parallel
+            conversation_id: Current conversation ID for context
+            
+        Yields:
+            Response text chunks, cleaned line by line like the cached answer
+        """
         try:
-            if not self.gemini_model:
-                return None
+            if not self.search_provider:
+                yield "Search service is not available. Please install SerpAPI package."
+                return
             
-            print("Generating response with Google Gemini...")
+            queries = self._as_query_list(query)
+            query = " and ".join(queries)
             
-            # Build prompt for Gemini
-            current_time = datetime.datetime.now()
-            prompt = f"""You are {Assistantname}, an AI assistant providing helpful search-based responses.
-
-{conversation_context}User Query: {query}
-
-Search Results:
-{search_context}
-
-Instructions:
-- Provide a comprehensive and accurate answer based on the search results
-- Keep the response informative but concise (3-5 sentences)
-- Include relevant details and key facts
-- Use a natural, conversational tone
-- Don't mention sources or URLs explicitly
-- Focus on answering the user's specific question
-
-Current Date: {current_time.strftime('%A, %B %d, %Y')}
-Current Time: {current_time.strftime('%I:%M %p')}
-
-Please provide your response:"""
-
-            # Generate response
-            response = self.gemini_model.generate_content(prompt)
+            # Cached answers are complete already
+            cached_result = self._get_cached_result(query, max_age_minutes)
+            if cached_result:
+                yield self._format_cached_response(cached_result, query)
+                return
             
-            if response and response.text:
-                return self._clean_search_response(response.text)
+            search_results, search_context = self._search_all(queries, max_results)
+            if not search_results:
+                yield self._handle_no_results(query)
+                return
             
-            return None
+            conversation_context = self._build_conversation_context(conversation_id)
             
-        except Exception as e:
-            print(f"Gemini API Error: {e}")
-            return None
-
-    def _generate_groq_response(self, query: str, search_context: str, conversation_context: str) -> str:
-        """Generate response using Groq (fallback)"""
-        try:
-            if not self.groq_client:
-                return None
+            chunks = []
+            for chunk in self._clean_stream(self._stream_search_response(query, search_context, conversation_context)):
+                chunks.append(chunk)
+                yield chunk
             
-            print("Generating response with Groq (fallback)...")
+            if chunks:
+                response = "".join(chunks)
+            else:
+                # Not cached, so a later hit asks the LLM again
+                yield self._generate_simple_response(query, search_results)
+                response = ''
             
-            # Build system prompt for search response
-            system_prompt = self._build_search_system_prompt()
+            self._save_to_cache(query, {
+                'query': query,
+                'results': search_results,
+                'response': response,
+                'ai_service': self.ai_priority,
+                'timestamp': datetime.datetime.now().isoformat()
+            })
             
-            # Build user prompt with search results
-            user_prompt = f"""{conversation_context}User Query: {query}
-
-Search Results:
-{search_context}
+        except Exception as e:
+            print(f"RealtimeSearchEngine Error: {e}")
+            yield f"I encountered an error while searching: {str(e)}"
 
-Please provide a comprehensive and accurate answer based on the search results above. Include relevant details and cite sources when appropriate."""
+    def _stream_search_response(self, query: str, search_context: str, conversation_context: str):
+        """Yield LLM output chunks from whichever backend starts answering first"""
+        for _, chunk in self.llm_caller.stream(
+            self.llm_backends,
+            lambda backend: backend.stream(query, search_context, conversation_context)
+        ):
+            yield chunk
 
-            # Generate response
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            completion = self.groq_client.chat.completions.create(
-                model="llama3-70b-8192",
-                messages=messages,
-                temperature=0.3,
-                max_tokens=200,
-                top_p=0.9,
-                stream=False
-            )
-            
-            if completion and completion.choices[0].message.content:
-                return self._clean_search_response(completion.choices[0].message.content)
-            
-            return None
+    def _clean_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Clean streamed LLM output as each line completes, applying the same rules as _clean_search_response
+        
+        Args:
+            chunks: Raw LLM output chunks
             
-        except Exception as e:
-            print(f"Groq API Error: {e}")
-            return None
+        Yields:
+            Cleaned lines, newline-joined, so the pieces add up to the cleaned full answer
+        """
+        def lines():
+            buffer = ""
+            for chunk in chunks:
+                buffer += chunk
+                *complete, buffer = buffer.split('\n')
+                yield from complete
+            yield buffer
+        
+        emitted = 0
+        for line in lines():
+            line = self._strip_markup(line).strip()
+            if not line:
+                continue
+            yield line if not emitted else "\n" + line
+            emitted += 1
+            if self.max_lines and emitted >= self.max_lines:
+                return
 
     def _format_ai_response(self, response: str, ai_service: str) -> str:
         """Format AI response with service indicator"""
@@ -589,49 +571,35 @@ Please provide a comprehensive and accurate answer based on the search results a
         
         return context
 
-    def _build_search_system_prompt(self) -> str:
-        """Build system prompt for search responses (used by Groq)"""
-        current_time = datetime.datetime.now()
-        return f"""You are {Assistantname}, an AI assistant that provides helpful answers using web search results.
-
-Instructions:
-1. Extract key information from the search results
-2. Provide a comprehensive but concise summary (3-5 sentences)
-3. Include relevant facts and details
-4. Use natural, conversational language
-5. Don't mention sources or URLs explicitly
-6. Focus on answering the user's specific question
-7. Be accurate and informative
-
-Current Context:
-- Date: {current_time.strftime('%A, %B %d, %Y')}
-- Time: {current_time.strftime('%I:%M %p')}
-
-Provide a helpful and informative response based on the search results."""
-
     def _clean_search_response(self, response: str) -> str:
         """Clean and format search response"""
         if not response:
             return "I couldn't generate a proper response from the search results."
         
+        cleaned = self._strip_markup(response.strip())
+        
+        # Format properly
+        lines = [line.strip() for line in cleaned.split('\n') if line.strip()]
+        if self.max_lines:
+            lines = lines[:self.max_lines]
+        cleaned = '\n'.join(lines)
+        
+        return cleaned
+
+    @staticmethod
+    def _strip_markup(text: str) -> str:
+        """Remove end tokens, citations, bold markers and URLs; each rule stays within one line"""
         # Remove artifacts
-        cleaned = response.strip()
-        cleaned = cleaned.replace("</s>", "")
+        cleaned = text.replace("</s>", "")
         cleaned = cleaned.replace("<|end|>", "")
 
         # Remove all (Source: ...) patterns and citations
-        import re
         cleaned = re.sub(r'\(Source:.*?\)', '', cleaned)
         cleaned = re.sub(r'\[.*?\]', '', cleaned)
         cleaned = re.sub(r'\*\*.*?\*\*', lambda m: m.group(0).replace('**', ''), cleaned)
         
         # Remove URLs
         cleaned = re.sub(r'http\S+|www\.\S+', '', cleaned)
-        
-        # Format properly
-        lines = [line.strip() for line in cleaned.split('\n') if line.strip()]
-        cleaned = '\n'.join(lines)
-        
         return cleaned
 
     def _format_cached_response(self, cached_data: Dict, query: str) -> str:
@@ -642,13 +610,21 @@ Provide a helpful and informative response based on the search results."""
             
             if cached_response:
                 # Add cache indicator with AI service info
-                timestamp = cached_data.get('timestamp', 'unknown time')
                 cache_note = f"\n\n*[From cache - {ai_service} AI]*"
                 return cached_response + cache_note
             else:
                 # Regenerate from cached results if no response stored
-                search_results = cached_data.get('results', [])
-                return self._generate_search_response(query, search_results)
+                search_results = self._cached_search_results(cached_data)
+                response, answered = self._generate_search_response(query, search_results)
+                if answered:
+                    self._save_to_cache(query, {
+                        'query': query,
+                        'results': search_results,
+                        'response': response,
+                        'ai_service': self.ai_priority,
+                        'timestamp': datetime.datetime.now().isoformat()
+                    })
+                return response
         except Exception:
             return "Error retrieving cached search results."
 
@@ -739,12 +715,19 @@ Would you like me to try a different search approach?"""
 
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
+        availability = detect_backends()
         stats = {
             'in_memory_cache_size': len(self.cache),
+            'memory_cache': self.cache.get_stats(),
+            'rate_limiter': self.rate_limiter.state() if self.rate_limiter else None,
+            'similarity_cache': self.similar_queries.get_stats(),
             'database_available': DATABASE_AVAILABLE,
-            'serpapi_available': SERPAPI_AVAILABLE,
-            'gemini_available': GEMINI_AVAILABLE,
-            'groq_available': GROQ_AVAILABLE,
+            'search_provider': self.search_provider.name if self.search_provider else None,
+            'llm_backends': [backend.name for backend in self.llm_backends],
+            'llm_calls': self.llm_caller.get_stats(),
+            'serpapi_available': availability['serpapi'],
+            'gemini_available': availability['gemini'],
+            'groq_available': availability['groq'],
             'primary_ai_service': self.ai_priority
         }
         
@@ -768,15 +751,16 @@ Would you like me to try a different search approach?"""
             True if successful, False otherwise
         """
         try:
-            if service == 'gemini' and GEMINI_AVAILABLE and self.gemini_model:
-                self.ai_priority = 'gemini'
-                print(f"✓ Switched to Gemini AI service")
-                return True
-            elif service == 'groq' and GROQ_AVAILABLE and self.groq_client:
-                self.ai_priority = 'groq'
-                print(f"✓ Switched to Groq AI service")
+            backends = available_llm_backends()
+            if service in backends:
+                # Requested backend first, the rest stay behind it as fallbacks
+                self.llm_backends = (self._with_engine_options([backends[service]])
+                                     + [b for b in self.llm_backends if b.name != service])
+                self.ai_priority = service
+                print(f"✓ Switched to {backends[service].label} AI service")
                 return True
             elif service == 'simple':
+                self.llm_backends = []
                 self.ai_priority = 'simple'
                 print(f"✓ Switched to simple formatting")
                 return True
@@ -797,16 +781,17 @@ def RealtimeSearchEngine_Legacy(prompt):
 def check_requirements():
     """Check and suggest installation of required packages"""
     missing_packages = []
+    availability = detect_backends()
     
-    if not SERPAPI_AVAILABLE:
+    if not availability['serpapi'] and not availability['googlesearch']:
         missing_packages.append("SerpAPI package (choose one):")
         missing_packages.append("  pip install google-search-results  # Recommended legacy package")
         missing_packages.append("  pip install serpapi               # Newer package")
     
-    if not GEMINI_AVAILABLE:
+    if not availability['gemini']:
         missing_packages.append("pip install google-generativeai")
     
-    if not GROQ_AVAILABLE:
+    if not availability['groq']:
         missing_packages.append("pip install groq")
     
     try:
@@ -828,8 +813,7 @@ def check_requirements():
 if __name__ == "__main__":
     print(f"Enhanced {Assistantname} Search Engine - Ready for testing")
     print(f"Database available: {DATABASE_AVAILABLE}")
-    print(f"SerpAPI available: {SERPAPI_AVAILABLE}")
-    print(f"Groq available: {GROQ_AVAILABLE}")
+    print(f"Backends available: {detect_backends()}")
     
     # Check requirements
     if not check_requirements():
@@ -5,7 +5,11 @@ from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import dotenv_values
 import os
+import sys
 import mtranslate as mt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.state_bus import bus, ASSISTANT_STATUS
 <<<<<<< HEAD
 import time  # Added for proper delays
 
@@ -134,9 +138,7 @@ driver = webdriver.Chrome(service=service, options=chrome_options)
 
 # Helper functions
 def SetAssistantStatus(Status):
-    os.makedirs("Frontend/Files", exist_ok=True)
-    with open(r'Frontend/Files/Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(ASSISTANT_STATUS, Status)
 
 def QueryModifier(Query):
     if not Query:
@@ -155,10 +157,9 @@ driver = webdriver.Chrome(service=service, options=chrome_options)
 TempDirPath = rf"{current_dir}/Frontend/Files"
 os.makedirs(TempDirPath, exist_ok=True)
 
-# Function to set the assistant's status by writing it to a file.
+# Function to set the assistant's status on the shared state bus.
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}/Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(ASSISTANT_STATUS, Status)
 
 # Function to modify a query to ensure proper punctuation and formatting.
 def QueryModifier(Query):
@@ -1,84 +1,59 @@
-import pygame
 import random
-# Import pygame library for handling audio playback # Import random for generating random choices
-import asyncio
-# Import asyncio for asynchronous operations
-import edge_tts # Import edge_tts for text-to-speech functionality
+# Import random for generating random choices
 import os #Import os for file path handling
-from dotenv import dotenv_values # Import dotenv for reading environment variables from a .env file
-# Load environment variables from a .env file
-env_vars=dotenv_values(".env")
-
-AssistantVoice = env_vars.get("AssistantVoice") # Get the AssistantVoice from the environment variables I
-# Asynchronous function to convert text to an audio file
-async def TextToAudioFile(text) -> None:
-  file_path = os.path.join("Data","speech.mp3")#r"Data\speech.mp3" # Define the path where the speech file will be saved
-  if os.path.exists(file_path):
-    os.remove(file_path)
-
-  communicate = edge_tts. Communicate (text, AssistantVoice, pitch='+5Hz', rate='+13%')
-  await communicate.save(r'Data\\speech.mp3') #Save the generated speech as an MP3 file
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.audio_player import audio_player # Shared in-memory synthesis and long-lived mixer
+# List of predefined responses for cases where the text is too long
+responses = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    "The remaining part of the text is now on the chat screen, sir.",
+    "Sir, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, sir.",
+    "The next part of the text is on the chat screen, sir.",
+    "Sir, please check the chat screen for more information.",
+    "There's more text on the chat screen for you, sir.",
+    "Sir, take a look at the chat screen for additional text.",
+    "You'll find more to read on the chat screen, sir.",
+    "Sir, check the chat screen for the rest of the text.",
+    "The chat screen has the rest of the text, sir.",
+    "There's more to see on the chat screen, sir, please look.",
+    "Sir, the chat screen holds the continuation of the text.",
+    "You'll find the complete answer on the chat screen, kindly check it out sir.",
+    "Please review the chat screen for the rest of the text, sir.",
+    "Sir, look at the chat screen for the complete answer."
+]
+# Synthesise the canned responses into the TTS cache so they play without a network call
+def PrewarmResponses():
+  return audio_player.prewarm(responses)
 #Function to manage Text-to-Speech (TTS) functionality
 def TTS(Text, func=lambda r=None: True):
-  while True:
-    try:
-      # Convert text to an audio file asynchronously
-      asyncio.run(TextToAudioFile(Text))
-      #Initialize pygame mixer for audio playback
-      pygame.mixer.init()
-      #Load the generated speech file into pygame mixer
-      pygame.mixer.music.load(r"Data\\speech.mp3")
-      pygame.mixer.music.play() # Play the audio
-#Loop until the audio is done playing or the function stops
-      while pygame.mixer.music.get_busy():
-        if func() == False:
-          break
-           # Check if the external function returns False
-        clock = pygame.time.Clock() # Initialize a pygame clock
-        clock.tick(10) # Limit the loop to 10 ticks per second
-      return True # Return True if the audio played successfully
-    except Exception as e: # Handle any exceptions during the process
-      print(f"Error in TTS: {e}")
-    finally:
-        try:
-            func(False)
-            pygame.mixer.music.stop() # Stop the audio playback
-            pygame.mixer.quit() # Quit the pygame mixer
-        except Exception as e: # Handle any exceptions during cleanup
-            print(f"Error in finally block: {e}")
+  try:
+    # Synthesise straight into memory and play on the shared mixer; no Data/speech.mp3 round-trip
+    return audio_player.speak(Text, func) # Return True if the audio played successfully
+  except Exception as e: # Handle any exceptions during the process
+    print(f"Error in TTS: {e}")
+  finally:
+      try:
+          func(False)
+      except Exception as e: # Handle any exceptions during cleanup
+          print(f"Error in finally block: {e}")
 #Function to manage Text-to-Speech with additional responses for long text
 def TextToSpeech(Text, func=lambda r=None: True):
   Data = str(Text).split(".") # Split the text by periods into a list of sentences
-# List of predefined responses for cases where the text is too long
-  responses = [
-        "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-        "The rest of the text is now on the chat screen, sir, please check it.",
-        "You can see the rest of the text on the chat screen, sir.",
-        "The remaining part of the text is now on the chat screen, sir.",
-        "Sir, you'll find more text on the chat screen for you to see.",
-        "The rest of the answer is now on the chat screen, sir.",
-        "Sir, please look at the chat screen, the rest of the answer is there.",
-        "You'll find the complete answer on the chat screen, sir.",
-        "The next part of the text is on the chat screen, sir.",
-        "Sir, please check the chat screen for more information.",
-        "There's more text on the chat screen for you, sir.",
-        "Sir, take a look at the chat screen for additional text.",
-        "You'll find more to read on the chat screen, sir.",
-        "Sir, check the chat screen for the rest of the text.",
-        "The chat screen has the rest of the text, sir.",
-        "There's more to see on the chat screen, sir, please look.",
-        "Sir, the chat screen holds the continuation of the text.",
-        "You'll find the complete answer on the chat screen, kindly check it out sir.",
-        "Please review the chat screen for the rest of the text, sir.",
-        "Sir, look at the chat screen for the complete answer."
-    ]
 # If the text is very long (more than 4 sentences
 
 
 
 # If the text is very long (more than 4 sentences and 250 charantees), add a response message
   if len(Data) > 4 and len(Text) >= 250:
-    TTS(" ".join(Text.split(".")[0:2]) + ". "+ random.choice(responses), func)
+    # Spoken separately so the canned response is served from the TTS cache
+    if TTS(" ".join(Text.split(".")[0:2]) + ". ", func) != False:
+      TTS(random.choice(responses), func)
 # Otherwise, just play the whole text
   else:
     TTS(Text, func)
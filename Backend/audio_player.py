@@ -0,0 +1,138 @@
+# audio_player.py - Long-lived in-memory audio playback shared by every TTS path
+import io
+import os
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import edge_tts
+import pygame
+from dotenv import dotenv_values
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.tts_cache import TTSCache, tts_cache
+from Backend.event_loop import event_loop
+
+env_vars = dotenv_values(".env")
+AssistantVoice = env_vars.get("AssistantVoice", "en-US-AriaNeural")
+
+
+class AudioPlayer:
+    """
+    Synthesises speech to MP3 bytes in memory and plays them on one mixer.
+
+    The mixer is initialised once and kept open for the life of the process.
+    Playback is serialised, so overlapping utterances queue up instead of
+    fighting over a shared file or device.
+    """
+
+    def __init__(self, voice: str = AssistantVoice, pitch: str = '+5Hz', rate: str = '+13%',
+                 cache: Optional[TTSCache] = tts_cache):
+        self.voice = voice
+        self.pitch = pitch
+        self.rate = rate
+        self.cache = cache
+        self._mixer_lock = threading.Lock()
+        self._play_lock = threading.Lock()
+        self._mixer_ready = False
+
+    async def synthesize_async(self, text: str, should_continue: Callable[[], bool] = lambda: True) -> bytes:
+        """Synthesise text to MP3 bytes without touching the disk"""
+        communicate = edge_tts.Communicate(text, self.voice, pitch=self.pitch, rate=self.rate)
+        audio = bytearray()
+        async for chunk in communicate.stream():
+            if not should_continue():
+                break
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+        return bytes(audio)
+
+    def synthesize(self, text: str, should_continue: Callable[[], bool] = lambda: True) -> bytes:
+        """Synthesise text, serving repeated phrases from the TTS cache"""
+        if self.cache and self.cache.cacheable(text):
+            data = self.cache.get(text, self.voice, self.pitch, self.rate)
+            if data:
+                return data
+
+        data = event_loop.run(self.synthesize_async(text, should_continue))
+
+        # Only complete synthesis results are cached
+        if self.cache and data and should_continue() != False:
+            self.cache.put(text, self.voice, self.pitch, self.rate, data)
+        return data
+
+    def prewarm(self, phrases: Iterable[str]) -> threading.Thread:
+        """Synthesise canned phrases into the cache in the background"""
+        phrases = list(dict.fromkeys(phrases))
+
+        def warm():
+            for phrase in phrases:
+                try:
+                    self.synthesize(phrase)
+                except Exception as e:
+                    print(f"Error prewarming TTS cache: {e}")
+            if self.cache:
+                print(f"TTS cache prewarmed: {self.cache.get_stats()}")
+
+        thread = threading.Thread(target=warm, name="TTSPrewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def _ensure_mixer(self):
+        with self._mixer_lock:
+            if not self._mixer_ready:
+                pygame.mixer.init()
+                self._mixer_ready = True
+
+    def play(self, data: bytes, should_continue: Callable[[], bool] = lambda: True) -> bool:
+        """
+        Play MP3 bytes, blocking until done
+
+        Args:
+            data: MP3 encoded audio
+            should_continue: Polled during playback; returning False stops it
+
+        Returns:
+            True if playback ran to completion
+        """
+        if not data:
+            return False
+
+        with self._play_lock:
+            self._ensure_mixer()
+            pygame.mixer.music.load(io.BytesIO(data), "mp3")
+            pygame.mixer.music.play()
+            while pygame.mixer.music.get_busy():
+                if should_continue() == False:
+                    pygame.mixer.music.stop()
+                    return False
+                time.sleep(0.05)
+            return True
+
+    def speak(self, text: str, should_continue: Callable[[], bool] = lambda: True) -> bool:
+        """Synthesise and play text"""
+        data = self.synthesize(text, should_continue)
+        if should_continue() == False:
+            return False
+        return self.play(data, should_continue)
+
+    def stop(self):
+        """Stop whatever is playing right now"""
+        try:
+            if self._mixer_ready:
+                pygame.mixer.music.stop()
+        except Exception as e:
+            print(f"Error stopping playback: {e}")
+
+    def close(self):
+        """Release the audio device"""
+        self.stop()
+        with self._mixer_lock:
+            if self._mixer_ready:
+                pygame.mixer.quit()
+                self._mixer_ready = False
+
+
+# Global player instance
+audio_player = AudioPlayer()
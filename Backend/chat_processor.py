@@ -1,6 +1,9 @@
 import time
 import threading
 import traceback
+import socket
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import sys
 import os
@@ -8,14 +11,82 @@ import os
 # Add project root to Python path if needed
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from Data.database import db
+from Backend.lru_cache import LRUCache
+
+# Claimants created by this process; a same-PID claimant missing here is from an earlier process
+_local_claimants = set()
+
+# Seconds between sweeps for claims left behind by processors that are gone
+ClaimSweepInterval = 60
+
+def process_alive(pid):
+    """Whether a process with this PID is running on this machine"""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        try:
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))) and exit_code.value == 259
+        finally:
+            kernel32.CloseHandle(handle)  # 259 above is STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def claimant_alive(claimant):
+    """
+    Whether the processor behind a claimant id ('host:pid:instance') may still be running.
+    Claims from other hosts can't be checked and are left to expire with their lease.
+    """
+    host, _, rest = claimant.partition(':')
+    pid_text = rest.partition(':')[0]
+    if host != socket.gethostname() or not pid_text.isdigit():
+        return True
+    pid = int(pid_text)
+    if pid == os.getpid():
+        return claimant in _local_claimants
+    return process_alive(pid)
 
 class EnhancedChatProcessor:
-    def __init__(self):
+    """
+    Answers pending user messages with a pool of worker threads.
+
+    Different conversations are processed in parallel; messages of one
+    conversation go to a single worker at a time, oldest first. Messages
+    are claimed in the database before processing, so several processor
+    processes can share one queue.
+    """
+
+    def __init__(self, batch_size=5, workers=4, max_in_flight=None, lease_seconds=300):
         self.is_running = False
         self.processing_thread = None
         self.debug = True
-        self.currently_processing = set()
-        self.processed_messages = set()  # Track processed messages to prevent duplicates
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 4
+        self.lease_seconds = lease_seconds
+        # Unique per processor instance, recorded on the messages it claims
+        self.claimant = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        _local_claimants.add(self.claimant)
+        self._last_claim_sweep = 0.0
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ChatWorker")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.conversation_queues = {}  # conversation_id -> claimed messages waiting for that conversation's worker
+        self.currently_processing = set()  # Claimed, unfinished message ids (at most max_in_flight)
+        self.processed_messages = LRUCache(max_entries=1000)  # Recently finished messages, to drop re-deliveries
+        self.metrics = {'claimed': 0, 'processed': 0, 'failed': 0, 'skipped': 0, 'busy_ms_total': 0.0}
+        self.started_at = time.monotonic()
         
     def log_debug(self, message):
         """Debug logging function"""
@@ -24,76 +95,186 @@ class EnhancedChatProcessor:
             print(f"[DEBUG {timestamp}] ChatProcessor: {message}")
     
     def start_processing(self):
-        """Start the message processing loop"""
+        """Start the message processing loop; sleeps until the database signals new user messages"""
         self.is_running = True
-        self.log_debug("Starting chat processor...")
+        self.log_debug(f"Starting chat processor with {self.workers} workers...")
     
         while self.is_running:
             try:
-                self.process_pending_messages()
-                time.sleep(1)  # Increased to reduce system load
+                # Read the version first so a message added while processing still wakes us
+                seen_version = db.message_notifier.current_version()
+                if self.process_pending_messages(wait=False) >= self.batch_size:
+                    continue  # Full batch: there may be more waiting
+                db.wait_for_messages(seen_version)
             except Exception as e:
                 self.log_debug(f"Error in processing loop: {e}")
                 time.sleep(2)
     
-    def process_pending_messages(self):
-        """Process pending user messages with duplicate prevention"""
+    def process_pending_messages(self, wait=True):
+        """
+        Claim pending user messages and hand them to the worker pool
+        
+        Args:
+            wait: Block until every claimed message has been answered
+        
+        Returns:
+            Number of messages taken for processing (skipped ones aren't counted)
+        """
+        handled = 0
         try:
-            unprocessed = db.get_unprocessed_messages(limit=5)  # Reduced batch size
+            with self._lock:
+                capacity = self.max_in_flight - len(self.currently_processing)
+            if capacity <= 0:
+                return 0  # A finishing worker wakes the loop once there is room again
             
-            if unprocessed:
-                self.log_debug(f"Processing {len(unprocessed)} messages")
+            if time.monotonic() - self._last_claim_sweep >= ClaimSweepInterval:
+                self._last_claim_sweep = time.monotonic()
+                self.release_abandoned_claims()
             
-            for message_data in unprocessed:
-                try:
-                    message_id = message_data['id']
-                    content = message_data['content']
-                    conversation_id = message_data['conversation_id']
-                    
-                    # Create simple message identifier to prevent duplicates
-                    message_key = f"{message_id}_{conversation_id}"
-                    
-                    # Skip if already processed or currently processing
-                    if (message_id in self.currently_processing or 
-                        message_key in self.processed_messages):
-                        continue
-                        
-                    self.currently_processing.add(message_id)
-                    self.processed_messages.add(message_key)
-                    
-                    self.log_debug(f"Processing message {message_id}")
-                    
-                    # Mark as processed BEFORE generating response
-                    db.mark_as_processed(message_id)
-                    
-                    # Generate concise response
-                    response = self.generate_response(content, conversation_id)
-                    
-                    # Only add response if it's not empty and under length limit
-                    if response and len(response.strip()) > 0:
-                        # Ensure response is concise (max 200 characters, 2-4 lines)
-                        response = self.ensure_concise_response(response)
-                        
-                        response_id = db.add_message(
-                            role="assistant",
-                            content=response,
-                            conversation_id=conversation_id,
-                            parent_message_id=message_id,
-                            is_processed=True  # Mark assistant messages as processed immediately
-                        )
-                        
-                        if response_id:
-                            self.log_debug(f"Response added for message {message_id}")
-                        else:
-                            self.log_debug(f"Duplicate response prevented for message {message_id}")
-                    
-                except Exception as e:
-                    self.log_debug(f"Error processing message {message_id}: {e}")
-                finally:
-                    self.currently_processing.discard(message_id)
+            claimed = db.claim_messages(self.claimant, min(self.batch_size, capacity), self.lease_seconds)
+            if claimed:
+                self.log_debug(f"Claimed {len(claimed)} messages")
+            
+            for message_data in claimed:
+                message_id = message_data['id']
+                conversation_id = message_data['conversation_id']
+                message_key = f"{message_id}_{conversation_id}"
+                
+                with self._lock:
+                    # Skip if currently processing (our own claim outlived its lease; it stays ours)
+                    # or already answered
+                    in_flight = message_id in self.currently_processing
+                    answered = message_key in self.processed_messages
+                    if in_flight or answered:
+                        self.metrics['skipped'] += 1
+                    else:
+                        self.currently_processing.add(message_id)
+                        self.metrics['claimed'] += 1
+                        pending = self.conversation_queues.get(conversation_id)
+                        start_worker = pending is None
+                        if start_worker:
+                            pending = self.conversation_queues[conversation_id] = deque()
+                        pending.append(message_data)
+                
+                if answered and not in_flight:
+                    # Replied to already but the processed flag never landed: finish it, ending the claim
+                    try:
+                        db.mark_as_processed(message_id)
+                    except Exception as e:
+                        self.log_debug(f"Error marking message {message_id} as processed: {e}")
+                if in_flight or answered:
+                    continue
+                
+                handled += 1
+                if start_worker:
+                    self.pool.submit(self._drain_conversation, conversation_id)
+            
+            if wait:
+                self.wait_idle()
                     
         except Exception as e:
             self.log_debug(f"Error in process_pending_messages: {e}")
+        
+        return handled
+
+    def release_abandoned_claims(self):
+        """Release claims held by processors on this machine that no longer run (e.g. before a restart)"""
+        for claimant in db.get_claim_holders():
+            if claimant != self.claimant and not claimant_alive(claimant):
+                released = db.release_claims(claimant)
+                if released:
+                    self.log_debug(f"Released {released} claims left by {claimant}")
+
+    def _drain_conversation(self, conversation_id):
+        """Answer one conversation's queued messages in order; only one worker drains a conversation"""
+        while True:
+            with self._lock:
+                pending = self.conversation_queues[conversation_id]
+                if not pending:
+                    del self.conversation_queues[conversation_id]
+                    self._idle.notify_all()
+                    return
+                message_data = pending.popleft()
+            try:
+                self._process_message(message_data)
+            except Exception as e:
+                # Never let one message stop the drain, or the conversation would stay registered forever
+                self.log_debug(f"Error processing message {message_data['id']}: {e}")
+
+    def _process_message(self, message_data):
+        """Generate and store the reply to one claimed message"""
+        message_id = message_data['id']
+        conversation_id = message_data['conversation_id']
+        started = time.perf_counter()
+        ok = False
+        try:
+            self.log_debug(f"Processing message {message_id}")
+            
+            # Generate concise response
+            response = self.generate_response(message_data['content'], conversation_id)
+            
+            # Only add response if it's not empty and under length limit
+            if response and len(response.strip()) > 0:
+                # Ensure response is concise (max 200 characters, 2-4 lines)
+                response = self.ensure_concise_response(response)
+                
+                response_id = db.add_message(
+                    role="assistant",
+                    content=response,
+                    conversation_id=conversation_id,
+                    parent_message_id=message_id,
+                    is_processed=True  # Mark assistant messages as processed immediately
+                )
+                
+                if response_id:
+                    self.log_debug(f"Response added for message {message_id}")
+                else:
+                    self.log_debug(f"Duplicate response prevented for message {message_id}")
+            ok = True
+            
+        except Exception as e:
+            self.log_debug(f"Error processing message {message_id}: {e}")
+        finally:
+            try:
+                # Marked after the reply is stored; until then the claim keeps other processors off
+                # this conversation, which is what keeps its replies in order
+                if ok:
+                    # Remembered first, so a failed mark is retried on re-claim instead of answered twice
+                    self.processed_messages.set(f"{message_id}_{conversation_id}", True, size=1)
+                db.mark_as_processed(message_id)
+            except Exception as e:
+                ok = False
+                self.log_debug(f"Error marking message {message_id} as processed: {e}")
+            finally:
+                with self._lock:
+                    was_full = len(self.currently_processing) >= self.max_in_flight
+                    self.currently_processing.discard(message_id)
+                    self.metrics['processed' if ok else 'failed'] += 1
+                    self.metrics['busy_ms_total'] += (time.perf_counter() - started) * 1000
+                if was_full and self.is_running:
+                    db.message_notifier.notify()  # Room again: let the loop claim more
+
+    def wait_idle(self, timeout=None):
+        """Block until every claimed message has been answered; False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self.conversation_queues, timeout)
+
+    def get_metrics(self):
+        """Throughput and concurrency statistics"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics['in_flight'] = len(self.currently_processing)
+            metrics['active_conversations'] = len(self.conversation_queues)
+        finished = metrics['processed'] + metrics['failed']
+        uptime = time.monotonic() - self.started_at
+        metrics.update({
+            'workers': self.workers,
+            'max_in_flight': self.max_in_flight,
+            'messages_per_second': round(finished / uptime, 3) if uptime > 0 else 0.0,
+            'avg_processing_ms': round(metrics['busy_ms_total'] / finished, 1) if finished else 0.0,
+            'busy_ms_total': round(metrics['busy_ms_total'], 1)
+        })
+        return metrics
 
     def ensure_concise_response(self, response):
         """Ensure response is concise and professional (2-4 lines max)"""
@@ -190,8 +371,8 @@ class EnhancedChatProcessor:
         """Stop the message processing"""
         self.log_debug("Stopping chat processor...")
         self.is_running = False
-        # Clear processing sets
-        self.currently_processing.clear()
+        db.message_notifier.notify()  # Wake the loop so it sees is_running is False
+        # In-flight messages finish on their workers; only the finished-message history is dropped
         self.processed_messages.clear()
 
 
@@ -225,6 +406,7 @@ def test_chat_processor():
         # Process messages
         processor = EnhancedChatProcessor()
         processor.process_pending_messages()
+        print(f"Processor metrics: {processor.get_metrics()}")
         
         # Check results
         messages = db.get_conversation_messages(test_conv_id)
@@ -0,0 +1,79 @@
+# event_loop.py - One long-lived asyncio loop shared by Automation, TTS and other async subsystems
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+class EventLoopService:
+    """
+    Runs a single asyncio event loop on a daemon thread.
+
+    Any thread can hand it a coroutine through submit() (returns a
+    concurrent Future) or run() (blocks for the result). Loop setup and
+    teardown happen once per process instead of once per call, so async
+    clients and their connection pools can stay open between calls.
+    """
+
+    def __init__(self, name: str = "SharedEventLoop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                ready = threading.Event()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run, args=(self._loop, ready),
+                                                name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """Schedule a coroutine from any thread and return a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the shared loop and block until it finishes
+
+        Args:
+            coroutine: Coroutine to run
+            timeout: Seconds to wait, None to wait forever
+
+        Returns:
+            The coroutine's result; its exception is re-raised here
+        """
+        if self.in_loop_thread():
+            coroutine.close()
+            raise RuntimeError("EventLoopService.run() would deadlock when called from the loop thread; use submit()")
+        return self.submit(coroutine).result(timeout)
+
+    def stop(self):
+        """Stop the loop; a later call to submit() starts a fresh one"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+            if thread:
+                thread.join(timeout=5)
+            loop.close()
+
+
+# Global event loop service
+event_loop = EventLoopService()
@@ -0,0 +1,124 @@
+# http_clients.py - Shared keep-alive HTTP sessions and API clients for every outbound call
+import importlib.util
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds applied to every request that doesn't pass its own timeout
+DEFAULT_TIMEOUT: Tuple[float, float] = (5, 30)
+DEFAULT_POOL_SIZE = 10  # connections kept per host
+
+useragent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36'
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session with a default timeout, so no call can hang forever"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of HTTP sessions and SDK clients.
+
+    Every backend module asks the registry instead of constructing its own
+    client, so TLS connections are reused across turns. requests sessions
+    get bounded per-host pools and retries on connection errors; httpx
+    clients (used by the Groq and Cohere SDKs) use HTTP/2 when h2 is installed.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, TimeoutSession] = {}
+        self._httpx_client = None
+        self._groq_clients: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.http2 = importlib.util.find_spec("httpx") is not None and importlib.util.find_spec("h2") is not None
+
+    def session(self, name: str = "default", pool_maxsize: int = DEFAULT_POOL_SIZE,
+                timeout=DEFAULT_TIMEOUT, headers: Optional[Dict[str, str]] = None) -> TimeoutSession:
+        """
+        Get (or create) a named keep-alive session
+
+        Args:
+            name: Registry key, e.g. 'serpapi', 'huggingface', 'web'
+            pool_maxsize: Maximum open connections per host
+            timeout: Default (connect, read) timeout
+            headers: Default headers applied on creation
+
+        Returns:
+            The shared session for that name
+        """
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                session = TimeoutSession(timeout)
+                retry = Retry(total=2, connect=2, read=0, backoff_factor=0.3,
+                              status_forcelist=(502, 503, 504), allowed_methods=frozenset(["GET"]))
+                adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=pool_maxsize,
+                                      pool_block=True, max_retries=retry)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                if headers:
+                    session.headers.update(headers)
+                self._sessions[name] = session
+            return session
+
+    def httpx_client(self):
+        """Shared httpx.Client (HTTP/2 when available), or None if httpx is missing"""
+        with self._lock:
+            if self._httpx_client is None and importlib.util.find_spec("httpx") is not None:
+                import httpx
+                self._httpx_client = httpx.Client(
+                    http2=self.http2,
+                    timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+                    limits=httpx.Limits(max_connections=50, max_keepalive_connections=DEFAULT_POOL_SIZE)
+                )
+            return self._httpx_client
+
+    def groq(self, api_key: str):
+        """Shared Groq client for an API key, reusing the pooled httpx transport"""
+        with self._lock:
+            client = self._groq_clients.get(api_key)
+        if client is not None:
+            return client
+
+        from groq import Groq
+        http_client = self.httpx_client()
+        client = Groq(api_key=api_key, http_client=http_client) if http_client else Groq(api_key=api_key)
+        with self._lock:
+            return self._groq_clients.setdefault(api_key, client)
+
+    def cohere(self, api_key: str):
+        """Cohere client on the pooled httpx transport"""
+        import cohere
+        http_client = self.httpx_client()
+        if http_client:
+            try:
+                return cohere.Client(api_key=api_key, httpx_client=http_client)
+            except TypeError:
+                pass  # Older SDKs don't accept a custom transport
+        return cohere.Client(api_key=api_key)
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            if self._httpx_client is not None:
+                self._httpx_client.close()
+                self._httpx_client = None
+            self._groq_clients.clear()
+
+
+# Global registry instance
+http_clients = ClientRegistry()
@@ -0,0 +1,178 @@
+# image_client.py - Parent-side handle for the long-lived ImageGeneration worker process
+import os
+import subprocess
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.ipc_channel import ChannelListener
+from Backend.state_bus import bus, IMAGE_GENERATION
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ImageGeneration.py")
+MAX_FINISHED_JOBS = 32
+
+
+class ImageGenerationClient:
+    """Starts ImageGeneration.py once and exchanges requests/completion events over a channel"""
+
+    def __init__(self, connect_timeout: float = 30):
+        self.connect_timeout = connect_timeout
+        self.process = None
+        self.channel = None
+        self._listener = None
+        self._lock = threading.Lock()
+        self._starting: Optional[threading.Event] = None
+        self._pending: Dict[str, threading.Event] = {}
+        self._finished: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _running(self) -> bool:
+        """Whether the worker process is alive and its channel is open"""
+        return bool(self.process and self.process.poll() is None and self.channel and not self.channel.closed)
+
+    def start(self) -> bool:
+        """Start the worker process if it is not already running"""
+        with self._lock:
+            if self._running():
+                return True
+            starting = self._starting
+            if starting is None:
+                self._starting = threading.Event()
+
+        # Another caller is already spawning the worker; wait for its outcome
+        if starting is not None:
+            starting.wait(self.connect_timeout)
+            with self._lock:
+                return self._running()
+
+        try:
+            return self._spawn()
+        finally:
+            with self._lock:
+                starting, self._starting = self._starting, None
+            starting.set()
+
+    def _spawn(self) -> bool:
+        """Launch the worker and wait for it to connect, without holding the lock"""
+        listener = None
+        process = None
+        try:
+            listener = ChannelListener()
+            process = subprocess.Popen(
+                [sys.executable, WORKER_SCRIPT],
+                env=listener.child_env(),
+                shell=False
+            )
+            channel = listener.wait_for_channel(self.connect_timeout)
+            if not channel:
+                print("ImageGeneration worker did not connect")
+        except Exception as e:
+            print(f"Error starting ImageGeneration worker: {e}")
+            channel = None
+
+        if not channel:
+            if process:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if listener:
+                listener.close()
+            with self._lock:
+                self.process = None
+                self._listener = None
+                self.channel = None
+            return False
+
+        with self._lock:
+            self._listener = listener
+            self.process = process
+            self.channel = channel
+        threading.Thread(target=self._read_events, name="ImageEvents", daemon=True).start()
+        return True
+
+    def _read_events(self):
+        """Forward worker events to the state bus and resolve waiting callers"""
+        channel = self.channel
+        while not channel.closed:
+            event = channel.recv()
+            if event is None:
+                break
+
+            bus.emit(IMAGE_GENERATION, event)
+            if event.get('type') in ('done', 'error'):
+                self._finish(event.get('id'), event)
+
+        # Fail every job still owned by the dead worker
+        for job_id in list(self._pending):
+            self._finish(job_id, {'type': 'error', 'id': job_id, 'error': 'worker exited'})
+
+    def _finish(self, job_id: str, event: Dict):
+        """Record a job's final event, keeping only the most recent ones"""
+        with self._lock:
+            self._finished[job_id] = event
+            while len(self._finished) > MAX_FINISHED_JOBS:
+                self._finished.popitem(last=False)
+            done = self._pending.pop(job_id, None)
+        if done:
+            done.set()
+
+    def generate(self, prompt: str, priority: int = 0, variants: Optional[int] = None) -> Optional[str]:
+        """
+        Queue an image generation request
+
+        Args:
+            prompt: Image prompt
+            priority: Lower values are generated first
+            variants: Number of images to generate; None uses the worker's ImageVariants setting
+
+        Returns:
+            Job id, or None if the worker could not be reached
+        """
+        if not self.start():
+            return None
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._pending[job_id] = threading.Event()
+        request = {'id': job_id, 'prompt': prompt, 'priority': priority}
+        if variants is not None:
+            request['variants'] = variants
+        if not self.channel.send('generate', **request):
+            self._finish(job_id, {'type': 'error', 'id': job_id, 'error': 'channel closed'})
+            return None
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job or the remaining variants of a running one"""
+        if not self.channel or self.channel.closed:
+            return False
+        return self.channel.send('cancel', id=job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Block until a job completes and return its final event"""
+        done = self._pending.get(job_id)
+        if done and not done.wait(timeout):
+            return None
+        return self._finished.get(job_id)
+
+    def stop(self):
+        """Ask the worker to exit and release the channel"""
+        with self._lock:
+            if self.channel and not self.channel.closed:
+                self.channel.send('shutdown')
+                self.channel.close()
+            if self._listener:
+                self._listener.close()
+            if self.process:
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+
+
+# Global client instance
+image_client = ImageGenerationClient()
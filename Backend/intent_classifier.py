@@ -0,0 +1,348 @@
+# intent_classifier.py - Local pre-classifier in front of the Cohere decision model
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+current_dir = os.getcwd()
+DecisionLogPath = os.path.join(current_dir, "Data", "decision_log.jsonl")
+
+# Labels the decision model can emit, longest first so prefixes match correctly
+Labels = ["generate image", "google search", "youtube search", "reminder", "general", "realtime",
+          "content", "system", "close", "open", "play", "exit"]
+
+# Only commands are resolved locally; general/realtime routing stays with the remote model
+CommandLabels = {"open", "close", "play", "system", "content", "google search", "youtube search",
+                 "generate image", "exit"}
+
+SystemTasks = ["mute", "unmute", "volume up", "volume down"]
+
+# Verb phrases (and a following article) that the decision model drops in front of a command's argument
+CommandVerbs = {
+    "open": r"(?:open|launch|start|run)",
+    "close": r"(?:close|shut down|shut|quit|exit|kill|stop)",
+    "play": r"(?:play|put on)",
+    "content": r"(?:write|draft|compose)(?: me)?",
+    "google search": r"(?:google search|search google for|google|look up|search for)",
+    "youtube search": r"(?:youtube search|search youtube for|search on youtube for)",
+    "generate image": r"(?:generate|create|make|draw)(?: an?)? (?:image|picture)",
+}
+ArgumentPatterns = {label: re.compile(rf"^{verbs}(?: (?:a|an|the))? (?P<argument>.+)$")
+                    for label, verbs in CommandVerbs.items()}
+
+# Examples that seed the bag-of-words model before any decisions are logged
+SeedExamples = [
+    ("open chrome", "open chrome"),
+    ("launch notepad", "open notepad"),
+    ("start spotify", "open spotify"),
+    ("close notepad", "close notepad"),
+    ("shut down chrome", "close chrome"),
+    ("quit telegram", "close telegram"),
+    ("play let her go", "play let her go"),
+    ("play some music by arijit singh", "play some music by arijit singh"),
+    ("mute", "system mute"),
+    ("mute the volume", "system mute"),
+    ("unmute", "system unmute"),
+    ("turn the volume up", "system volume up"),
+    ("volume down", "system volume down"),
+    ("write an application for sick leave", "content application for sick leave"),
+    ("write a poem about rain", "content poem about rain"),
+    ("google search python decorators", "google search python decorators"),
+    ("search google for cheap flights", "google search cheap flights"),
+    ("youtube search lofi beats", "youtube search lofi beats"),
+    ("search youtube for cooking videos", "youtube search cooking videos"),
+    ("generate image of a lion", "generate image of a lion"),
+    ("create an image of a sunset", "generate image of a sunset"),
+    ("bye", "exit"),
+    ("goodbye ray", "exit"),
+    ("who was akbar", "general who was akbar"),
+    ("how are you", "general how are you"),
+    ("who is the indian prime minister", "realtime who is the indian prime minister"),
+    ("what is today's news", "realtime what is today's news"),
+]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return " ".join(text.split())
+
+
+def tokenize(text: str) -> List[str]:
+    return normalize(text).split()
+
+
+def split_clauses(text: str) -> List[str]:
+    """Split a compound utterance into clauses on commas and 'and'"""
+    parts = re.split(r",|\band then\b|\band\b|\bthen\b", normalize_keep_commas(text))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def normalize_keep_commas(text: str) -> str:
+    text = re.sub(r"[^\w\s',]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def label_of(decision: str) -> Optional[str]:
+    """Label prefix of a single decision string, e.g. 'open chrome' -> 'open'"""
+    for label in Labels:
+        if decision == label or decision.startswith(label + " "):
+            return label
+    return None
+
+
+class RuleMatcher:
+    """All command shapes compiled into one alternation, so a clause is matched in a single pass"""
+
+    Rules = [
+        ("exit", r"(?:bye|goodbye|good bye)(?: \w+)?|exit"),
+        ("system", r"(?:please )?(?:turn (?:the )?)?(?P<system>" + "|".join(SystemTasks) + r")(?: please)?"),
+        ("google search", r"(?:google search|search google for) (?P<google>.+)"),
+        ("youtube search", r"(?:youtube search|search youtube for|search on youtube for) (?P<youtube>.+)"),
+        ("generate image", r"(?:generate|create|make) (?:an? )?image (?P<image>(?:of )?.+)"),
+        ("open", r"(?:open|launch) (?P<open>.+)"),
+        ("close", r"(?:close) (?P<close>.+)"),
+        ("play", r"(?:play) (?P<play>.+)"),
+    ]
+
+    def __init__(self):
+        self.pattern = re.compile("|".join(f"(?P<r{i}>^{body}$)" for i, (_, body) in enumerate(self.Rules)))
+
+    def match(self, clause: str) -> Optional[str]:
+        """Return a decision string for a clause, or None"""
+        match = self.pattern.match(clause)
+        if not match:
+            return None
+        # The outer r<i> group closes last, so it names the rule that fired
+        index = int(match.lastgroup[1:])
+        label = self.Rules[index][0]
+        if label == "exit":
+            return "exit"
+        argument = next((value for name, value in match.groupdict().items()
+                         if value and not name.startswith("r")), "")
+        return f"{label} {argument}".strip()
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over unigrams and bigrams, small enough to retrain online"""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.label_counts: Counter = Counter()
+        self.token_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.label_totals: Counter = Counter()
+        self.vocabulary = set()
+
+    @staticmethod
+    def features(text: str) -> List[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+    def learn(self, text: str, label: str):
+        features = self.features(text)
+        self.label_counts[label] += 1
+        for feature in features:
+            self.token_counts[label][feature] += 1
+            self.label_totals[label] += 1
+            self.vocabulary.add(feature)
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Return (label, posterior probability)"""
+        if not self.label_counts:
+            return None, 0.0
+        features = self.features(text)
+        total_docs = sum(self.label_counts.values())
+        vocabulary_size = len(self.vocabulary) or 1
+        scores = {}
+        for label, count in self.label_counts.items():
+            score = math.log(count / total_docs)
+            denominator = self.label_totals[label] + self.alpha * vocabulary_size
+            for feature in features:
+                score += math.log((self.token_counts[label][feature] + self.alpha) / denominator)
+            scores[label] = score
+
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        probability = 1.0 / sum(math.exp(score - top) for score in scores.values())
+        return best, probability
+
+
+class IntentClassifier:
+    """
+    Resolves high-confidence commands locally and defers everything else.
+
+    Each clause goes through the compiled rules first, then the bag-of-words
+    model. The whole utterance is only decided locally if every clause is
+    confidently a command; otherwise classify() returns None.
+    """
+
+    def __init__(self, threshold: float = 0.9, log_path: str = DecisionLogPath):
+        self.threshold = threshold
+        self.log_path = log_path
+        self.rules = RuleMatcher()
+        self.model = NaiveBayesModel()
+        self._lock = threading.Lock()
+        self.stats = {'rule_hits': 0, 'model_hits': 0, 'deferred': 0}
+        self.train(SeedExamples)
+
+    def train(self, examples: Iterable[Tuple[str, str]]):
+        """Train from (utterance, decision) pairs, where decision is a comma separated decision string"""
+        with self._lock:
+            for utterance, decision in examples:
+                clauses = split_clauses(utterance)
+                decisions = [part.strip() for part in normalize_keep_commas(decision).split(",") if part.strip()]
+                # Only clause-aligned examples teach the per-clause model anything useful
+                if len(clauses) != len(decisions):
+                    continue
+                for clause, clause_decision in zip(clauses, decisions):
+                    label = label_of(clause_decision)
+                    if label:
+                        self.model.learn(clause, label)
+
+    def train_from_history(self, chat_history: List[Dict]):
+        """Train from Model.ChatHistory style User/Chatbot message pairs"""
+        pairs = []
+        for user, bot in zip(chat_history[::2], chat_history[1::2]):
+            if user.get("role") == "User" and bot.get("role") == "Chatbot":
+                pairs.append((user["message"], bot["message"]))
+        self.train(pairs)
+
+    def load_log(self, limit: int = 2000) -> List[Tuple[str, str]]:
+        """Read the most recent logged remote decisions"""
+        records = []
+        try:
+            with open(self.log_path, "r", encoding='utf-8') as file:
+                for line in file.readlines()[-limit:]:
+                    try:
+                        entry = json.loads(line)
+                        records.append((entry["query"], ", ".join(entry["decision"])))
+                    except (ValueError, KeyError):
+                        continue
+        except OSError:
+            pass
+        return records
+
+    def log_decision(self, query: str, decision: List[str]):
+        """Append a remote decision to the log and learn from it immediately"""
+        if not decision:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a", encoding='utf-8') as file:
+                file.write(json.dumps({"query": query, "decision": decision, "ts": time.time()}) + "\n")
+        except OSError as e:
+            print(f"Decision log write error: {e}")
+        self.train([(query, ", ".join(decision))])
+
+    def _classify_clause(self, clause: str, previous_label: Optional[str]) -> Tuple[Optional[str], str]:
+        decision = self.rules.match(clause)
+        if decision:
+            return decision, 'rule'
+
+        with self._lock:
+            label, probability = self.model.predict(clause)
+        confident = probability >= self.threshold
+
+        # "open chrome and firefox": a bare noun phrase continues the previous command,
+        # unless the model is confident it is something else
+        if previous_label in ("open", "close", "play") and len(clause.split()) <= 3:
+            if not confident or label == previous_label:
+                return f"{previous_label} {clause}", 'rule'
+
+        if label not in CommandLabels or not confident:
+            return None, 'deferred'
+        if label == "exit":
+            return "exit", 'model'
+        if label == "system":
+            # System tasks are a closed set; anything else goes to the remote model
+            task = next((task for task in SystemTasks if re.search(rf"\b{task}\b", clause)), None)
+            return (f"system {task}", 'model') if task else (None, 'deferred')
+
+        # The argument must follow a known verb phrase, or it won't have the decision model's shape
+        match = ArgumentPatterns[label].match(clause)
+        if not match:
+            return None, 'deferred'
+        return f"{label} {match.group('argument')}", 'model'
+
+    def classify(self, utterance: str) -> Optional[List[str]]:
+        """
+        Decide an utterance locally
+
+        Returns:
+            The decision list, or None when the remote model should decide
+        """
+        clauses = split_clauses(utterance)
+        if not clauses:
+            return None
+
+        decisions, sources, previous_label = [], [], None
+        for clause in clauses:
+            decision, source = self._classify_clause(clause, previous_label)
+            if not decision:
+                self.stats['deferred'] += 1
+                return None
+            decisions.append(decision)
+            sources.append(source)
+            previous_label = label_of(decision)
+
+        self.stats['model_hits' if 'model' in sources else 'rule_hits'] += 1
+        return decisions
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        total = sum(stats.values())
+        stats['local_rate'] = round((stats['rule_hits'] + stats['model_hits']) / total, 3) if total else 0.0
+        return stats
+
+
+def benchmark(classifier: IntentClassifier, records: List[Tuple[str, str]]) -> Dict:
+    """
+    Measure accuracy and latency of local decisions against recorded queries
+
+    Args:
+        classifier: Classifier under test
+        records: (query, expected comma separated decision) pairs
+
+    Returns:
+        Coverage, accuracy on locally decided queries and latency percentiles in microseconds
+    """
+    latencies, covered, correct = [], 0, 0
+    for query, expected in records:
+        started = time.perf_counter()
+        decision = classifier.classify(query)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        if decision is None:
+            continue
+        covered += 1
+        expected_list = [part.strip() for part in normalize_keep_commas(expected).split(",") if part.strip()]
+        if [normalize(d) for d in decision] == [normalize(d) for d in expected_list]:
+            correct += 1
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'queries': count,
+        'coverage': round(covered / count, 3) if count else 0.0,
+        'accuracy': round(correct / covered, 3) if covered else 0.0,
+        'p50_us': round(latencies[count // 2], 1) if count else 0.0,
+        'p95_us': round(latencies[min(count - 1, int(count * 0.95))], 1) if count else 0.0,
+    }
+
+
+# Global classifier instance
+intent_classifier = IntentClassifier()
+
+if __name__ == "__main__":
+    # Benchmark a seed-only classifier against logged remote decisions it never trained on
+    recorded = intent_classifier.load_log()
+    if recorded:
+        holdout = IntentClassifier()
+        print(f"Benchmark on {len(recorded)} recorded queries: {benchmark(holdout, recorded)}")
+    else:
+        print(f"No recorded queries in {DecisionLogPath}; nothing to benchmark")
+    while True:
+        print(intent_classifier.classify(input(">>> ")))
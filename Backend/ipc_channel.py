@@ -0,0 +1,114 @@
+# ipc_channel.py - Local socket/pipe channel between Main.py and long-lived worker processes
+import os
+import secrets
+import threading
+from multiprocessing.connection import Listener, Client
+from typing import Dict, Optional
+
+# Environment variables used to hand the channel address to a child process
+CHANNEL_ADDRESS_ENV = "RAY_CHANNEL_ADDRESS"
+CHANNEL_AUTHKEY_ENV = "RAY_CHANNEL_AUTHKEY"
+
+
+class StateChannel:
+    """Duplex message channel with blocking receive, carrying small dict messages"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    def send(self, kind: str, **payload) -> bool:
+        """
+        Send a message of the given kind
+
+        Args:
+            kind: Message type, e.g. 'generate', 'done', 'error'
+            payload: Extra picklable fields
+
+        Returns:
+            True if the message was written, False if the channel is closed
+        """
+        message = {'type': kind}
+        message.update(payload)
+        try:
+            with self._send_lock:
+                self._connection.send(message)
+            return True
+        except (OSError, EOFError, ValueError) as e:
+            print(f"Channel send error: {e}")
+            self.closed = True
+            return False
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Block until a message arrives
+
+        Args:
+            timeout: Seconds to wait, None to wait forever
+
+        Returns:
+            The message dict, or None on timeout or when the peer went away
+        """
+        try:
+            if timeout is not None and not self._connection.poll(timeout):
+                return None
+            return self._connection.recv()
+        except (OSError, EOFError):
+            self.closed = True
+            return None
+
+    def close(self):
+        """Close the underlying connection"""
+        self.closed = True
+        try:
+            self._connection.close()
+        except OSError:
+            pass
+
+
+class ChannelListener:
+    """Parent side: owns the listening socket and accepts one worker connection"""
+
+    def __init__(self):
+        self.authkey = secrets.token_bytes(16)
+        self._listener = Listener(authkey=self.authkey)
+        self.address = self._listener.address
+        self._channel = None
+        self._accepted = threading.Event()
+        threading.Thread(target=self._accept, name="ChannelAccept", daemon=True).start()
+
+    def _accept(self):
+        try:
+            self._channel = StateChannel(self._listener.accept())
+        except (OSError, EOFError) as e:
+            print(f"Channel accept error: {e}")
+        finally:
+            self._accepted.set()
+
+    def child_env(self) -> Dict[str, str]:
+        """Environment for a child process that should connect back to this listener"""
+        env = dict(os.environ)
+        env[CHANNEL_ADDRESS_ENV] = str(self.address)
+        env[CHANNEL_AUTHKEY_ENV] = self.authkey.hex()
+        return env
+
+    def wait_for_channel(self, timeout: Optional[float] = None) -> Optional[StateChannel]:
+        """Wait for the worker to connect"""
+        self._accepted.wait(timeout)
+        return self._channel
+
+    def close(self):
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+
+
+def connect_from_env() -> Optional[StateChannel]:
+    """Child side: connect to the parent using the address passed in the environment"""
+    address = os.environ.get(CHANNEL_ADDRESS_ENV)
+    authkey = os.environ.get(CHANNEL_AUTHKEY_ENV)
+    if not address or not authkey:
+        return None
+    return StateChannel(Client(address, authkey=bytes.fromhex(authkey)))
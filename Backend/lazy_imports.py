@@ -0,0 +1,204 @@
+# lazy_imports.py - Deferred imports for heavy optional SDKs, background pre-warming and import timing
+import importlib
+import importlib.abc
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# Packages whose import cost is worth reporting individually (besides top-level modules)
+ProjectPackages = ("Backend.", "Frontend.", "Data.")
+
+
+class ImportTimer:
+    """
+    Records how long modules take to import.
+
+    install() adds a meta path hook so every top-level and project module
+    imported afterwards is timed (cumulative, like python -X importtime);
+    timed_import()/optional_import() time lazy imports done later on.
+    """
+
+    def __init__(self):
+        self.times: Dict[str, float] = {}  # module -> cumulative import ms
+        self.failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._finder = None
+        self.started = time.perf_counter()
+
+    def record(self, name: str, elapsed_ms: float, error: Optional[BaseException] = None):
+        with self._lock:
+            if error is None:
+                self.times[name] = elapsed_ms
+            else:
+                self.failures[name] = f"{type(error).__name__}: {error}"
+
+    def install(self):
+        """Start timing imports made from here on (idempotent)"""
+        with self._lock:
+            if self._finder is None:
+                self._finder = _TimingFinder(self)
+                sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        with self._lock:
+            if self._finder is not None and self._finder in sys.meta_path:
+                sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def timed_import(self, name: str):
+        """Import a module, recording the cost if this is its first import"""
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(name)
+        except BaseException as e:
+            self.record(name, 0, e)
+            raise
+        # The meta path hook may already have recorded it; the outer measurement wins
+        self.record(name, (time.perf_counter() - started) * 1000)
+        return module
+
+    def report(self, top: int = 15) -> List[Tuple[str, float]]:
+        """Slowest imports first"""
+        with self._lock:
+            return sorted(self.times.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    def print_report(self, top: int = 15, title: str = "Import timing"):
+        elapsed = (time.perf_counter() - self.started) * 1000
+        print(f"{title} ({elapsed:.0f} ms since start):")
+        for name, ms in self.report(top):
+            print(f"  {ms:8.1f} ms  {name}")
+        with self._lock:
+            failures = dict(self.failures)
+        for name, error in failures.items():
+            print(f"  unavailable  {name} ({error})")
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module's real loader to time exec_module"""
+
+    def __init__(self, loader, name: str, timer: ImportTimer):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Hand the real loader back so introspection (resources, reload) is unaffected
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.record(self._name, (time.perf_counter() - started) * 1000)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path hook that finds specs via the other finders and wraps their loaders"""
+
+    def __init__(self, timer: ImportTimer):
+        self._timer = timer
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if "." in fullname and not fullname.startswith(ProjectPackages):
+            return None
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, fullname, self._timer)
+        return spec
+
+
+# Global timer instance
+import_timer = ImportTimer()
+
+
+def optional_import(name: str):
+    """Import a module on demand; None if it is not installed"""
+    try:
+        return import_timer.timed_import(name)
+    except ImportError:
+        return None
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported when an attribute is first used"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = import_timer.timed_import(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name} ({'loaded' if self.loaded else 'deferred'})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def prewarm(targets: Iterable[Union[str, Callable]], delay: float = 0.0) -> threading.Thread:
+    """
+    Import modules / run initializers on a background thread
+
+    Args:
+        targets: Module names to import, or callables to run (e.g. a backend resolver)
+        delay: Seconds to wait first, so the GUI finishes painting
+
+    Returns:
+        The started daemon thread
+    """
+    targets = list(targets)
+
+    def run():
+        if delay:
+            time.sleep(delay)
+        for target in targets:
+            try:
+                if callable(target):
+                    target()
+                else:
+                    optional_import(target)
+            except Exception as e:
+                print(f"Prewarm error ({target}): {e}")
+
+    thread = threading.Thread(target=run, daemon=True, name="ImportPrewarm")
+    thread.start()
+    return thread
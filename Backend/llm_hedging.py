@@ -0,0 +1,351 @@
+# llm_hedging.py - Hedged / raced LLM calls with per-backend latency histograms
+import bisect
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import dotenv_values
+
+env_vars = dotenv_values(".env")
+# 'hedge': start the next backend once the primary is slower than its usual latency percentile
+# 'race': start the first two backends together; 'off': strict one-after-another fallback
+LLMHedgeMode = env_vars.get("LLMHedgeMode", "hedge").lower()
+LLMHedgePercentile = float(env_vars.get("LLMHedgePercentile", "90"))
+LLMHedgeDelay = float(env_vars.get("LLMHedgeDelay", "2.0"))  # seconds, until enough samples exist
+LLMHedgeMinDelay = float(env_vars.get("LLMHedgeMinDelay", "0.3"))
+LLMCallTimeout = float(env_vars.get("LLMCallTimeout", "30"))
+
+_STREAM_DONE = object()
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram plus a window of recent samples for percentiles"""
+
+    Buckets = (100, 250, 500, 1000, 2000, 3000, 5000, 8000, 13000, 20000)  # ms upper bounds
+
+    def __init__(self, max_samples: int = 200, min_samples: int = 5):
+        self.counts = [0] * (len(self.Buckets) + 1)
+        self.samples = deque(maxlen=max_samples)
+        self.min_samples = min_samples
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float, ok: bool = True):
+        with self._lock:
+            if not ok:
+                self.errors += 1
+                return
+            self.counts[bisect.bisect_left(self.Buckets, elapsed_ms)] += 1
+            self.samples.append(elapsed_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p-th percentile of recent successful calls in ms, None until min_samples exist"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in self.Buckets] + [f">{self.Buckets[-1]}ms"]
+            snapshot = {
+                'count': sum(self.counts),
+                'errors': self.errors,
+                'buckets': {label: count for label, count in zip(labels, self.counts) if count}
+            }
+        for p in (50, 90, 99):
+            value = self.percentile(p)
+            snapshot[f'p{p}_ms'] = round(value, 1) if value is not None else None
+        return snapshot
+
+
+class HedgedLLMCaller:
+    """
+    Runs one request against an ordered list of LLM backends.
+
+    In hedge mode the secondary backend starts only when the primary has
+    been running longer than its own latency percentile (or fails); race
+    mode starts both at once. The first acceptable answer wins and the
+    loser is cancelled: queued calls never start, streams stop reading.
+    """
+
+    def __init__(self, mode: str = LLMHedgeMode, percentile: float = LLMHedgePercentile,
+                 default_delay: float = LLMHedgeDelay, min_delay: float = LLMHedgeMinDelay,
+                 timeout: float = LLMCallTimeout, max_workers: int = 4):
+        self.mode = mode
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="LLMCall")
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'hedged': 0, 'raced': 0, 'secondary_wins': 0, 'cancelled': 0, 'failed': 0}
+
+    def histogram(self, key: str) -> LatencyHistogram:
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram()
+            return self.histograms[key]
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def hedge_delay(self, key: str) -> float:
+        """Seconds to wait on a backend before starting the next one"""
+        observed = self.histogram(key).percentile(self.percentile)
+        if observed is None:
+            return self.default_delay
+        return max(self.min_delay, observed / 1000)
+
+    # ------------------------------------------------------------ whole answers
+
+    def _timed(self, backend, call: Callable, accept: Callable) -> Optional[str]:
+        """Run one backend call, recording its latency whether or not it wins"""
+        started = time.perf_counter()
+        try:
+            result = call(backend)
+        except Exception as e:
+            print(f"{backend.label} API Error: {e}")
+            self.histogram(backend.name).record(0, ok=False)
+            return None
+        ok = accept(result)
+        self.histogram(backend.name).record((time.perf_counter() - started) * 1000, ok=ok)
+        return result if ok else None
+
+    def generate(self, backends: List, call: Callable,
+                 accept: Callable = lambda text: bool(text and text.strip())) -> Tuple[Optional[str], Optional[object]]:
+        """
+        Get one answer from the fastest acceptable backend
+
+        Args:
+            backends: LLM backends in priority order
+            call: call(backend) -> answer text
+            accept: Whether an answer is usable
+
+        Returns:
+            (answer, backend that produced it), or (None, None) if every backend failed
+        """
+        self._count('calls')
+        if self.mode not in ("hedge", "race") or len(backends) < 2:
+            for backend in backends:
+                result = self._timed(backend, call, accept)
+                if result is not None:
+                    return result, backend
+            self._count('failed')
+            return None, None
+
+        primary, secondary = backends[0], backends[1]
+        futures = {self.pool.submit(self._timed, primary, call, accept): primary}
+        deadline = time.monotonic() + self.timeout
+        started_secondary = False
+
+        if self.mode == "race":
+            self._count('raced')
+            futures[self.pool.submit(self._timed, secondary, call, accept)] = secondary
+            started_secondary = True
+
+        try:
+            while futures:
+                if started_secondary:
+                    wait_for = deadline - time.monotonic()
+                else:
+                    wait_for = min(self.hedge_delay(primary.name), deadline - time.monotonic())
+                if wait_for <= 0:
+                    break
+                done, _ = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    backend = futures.pop(future)
+                    result = future.result()
+                    if result is not None:
+                        if backend is not primary:
+                            self._count('secondary_wins')
+                        return result, backend
+
+                if not started_secondary:
+                    # Primary is slow (no result yet) or failed: bring in the secondary now
+                    if futures:
+                        self._count('hedged')
+                    futures[self.pool.submit(self._timed, secondary, call, accept)] = secondary
+                    started_secondary = True
+        finally:
+            for future in futures:
+                # Not-yet-started calls are dropped; running ones can't be cancelled,
+                # they finish (still recording their latency) and are ignored
+                if future.cancel():
+                    self._count('cancelled')
+
+        # Both hedged backends failed or timed out: walk the rest in order
+        for backend in backends[2:]:
+            result = self._timed(backend, call, accept)
+            if result is not None:
+                return result, backend
+        self._count('failed')
+        return None, None
+
+    # ------------------------------------------------------------ streams
+
+    def _record_first_chunk(self, backend, timing: Dict, ok: bool = True):
+        """Record one stream's time to first chunk, once (the pump and a cancel may race)"""
+        with self._lock:
+            if timing['recorded']:
+                return
+            timing['recorded'] = True
+        elapsed = (time.perf_counter() - timing['started']) * 1000
+        self.histogram(f"{backend.name}.first_chunk").record(elapsed if ok else 0, ok=ok)
+
+    def _pump(self, index: int, backend, open_stream: Callable, chunks: queue.Queue, cancel: threading.Event,
+              timing: Dict):
+        """Read one backend's stream into the shared queue until done or cancelled"""
+        first = True
+        stream = None
+        try:
+            stream = open_stream(backend)
+            for chunk in stream:
+                if cancel.is_set():
+                    break
+                if first:
+                    self._record_first_chunk(backend, timing)
+                    first = False
+                chunks.put((index, chunk))
+        except Exception as e:
+            print(f"{backend.label} streaming error: {e}")
+            self._record_first_chunk(backend, timing, ok=False)
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+            chunks.put((index, _STREAM_DONE))
+
+    def stream(self, backends: List, open_stream: Callable) -> Iterator[Tuple[object, str]]:
+        """
+        Stream from the backend that produces its first chunk soonest
+
+        Args:
+            backends: LLM backends in priority order
+            open_stream: open_stream(backend) -> iterator of text chunks
+
+        Yields:
+            (backend, chunk) pairs, all from a single winning backend
+        """
+        self._count('calls')
+        if self.mode not in ("hedge", "race") or len(backends) < 2:
+            for backend in backends:
+                produced = False
+                for _, chunk in self._stream_one(backend, open_stream):
+                    produced = True
+                    yield backend, chunk
+                if produced:
+                    return
+            self._count('failed')
+            return
+
+        chunks = queue.Queue()
+        cancels = [threading.Event(), threading.Event()]
+        started = [False, False]
+        timings = [None, None]
+        running = set()
+        winner = None
+
+        def start(index):
+            started[index] = True
+            timings[index] = {'started': time.perf_counter(), 'recorded': False}
+            running.add(index)
+            threading.Thread(target=self._pump,
+                             args=(index, backends[index], open_stream, chunks, cancels[index], timings[index]),
+                             daemon=True, name=f"LLMStream-{backends[index].name}").start()
+
+        start(0)
+        if self.mode == "race":
+            self._count('raced')
+            start(1)
+
+        deadline = time.monotonic() + self.timeout
+        try:
+            while running:
+                if winner is None:
+                    timeout = deadline - time.monotonic()
+                    if not started[1]:
+                        timeout = min(timeout, self.hedge_delay(f"{backends[0].name}.first_chunk"))
+                else:
+                    timeout = self.timeout  # idle limit between chunks once a winner is streaming
+                if timeout <= 0:
+                    break
+                try:
+                    index, chunk = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    if winner is None and not started[1]:
+                        # Primary has not produced a first chunk in time
+                        self._count('hedged')
+                        start(1)
+                        continue
+                    break
+
+                if chunk is _STREAM_DONE:
+                    running.discard(index)
+                    if index == winner:
+                        return
+                    if winner is None and not started[1]:
+                        start(1)  # Primary failed before producing anything
+                    continue
+
+                if winner is None:
+                    winner = index
+                    if index == 1:
+                        self._count('secondary_wins')
+                    for other in running - {index}:
+                        cancels[other].set()
+                        self._record_first_chunk(backends[other], timings[other])  # censored, see below
+                        self._count('cancelled')
+                if index == winner:
+                    yield backends[index], chunk
+        finally:
+            for index, cancel in enumerate(cancels):
+                cancel.set()
+                if started[index]:
+                    # Censored sample: a stream cancelled (or timed out) before its first chunk took
+                    # at least this long. Leaving it out would bias the percentile toward the winners.
+                    self._record_first_chunk(backends[index], timings[index])
+
+        if winner is None:
+            for backend in backends[2:]:
+                produced = False
+                for _, chunk in self._stream_one(backend, open_stream):
+                    produced = True
+                    yield backend, chunk
+                if produced:
+                    return
+            self._count('failed')
+
+    def _stream_one(self, backend, open_stream: Callable) -> Iterator[Tuple[object, str]]:
+        started = time.perf_counter()
+        first = True
+        try:
+            for chunk in open_stream(backend):
+                if first:
+                    self.histogram(f"{backend.name}.first_chunk").record((time.perf_counter() - started) * 1000)
+                    first = False
+                yield backend, chunk
+        except Exception as e:
+            print(f"{backend.label} streaming error: {e}")
+            self.histogram(f"{backend.name}.first_chunk").record(0, ok=False)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            histograms = dict(self.histograms)
+        stats['mode'] = self.mode
+        stats['latency'] = {key: histogram.snapshot() for key, histogram in histograms.items()}
+        return stats
+
+
+# Global caller shared by every search engine, so latency history accumulates in one place
+llm_caller = HedgedLLMCaller()
@@ -0,0 +1,127 @@
+# lru_cache.py - Thread-safe LRU cache with per-entry TTL and byte-size accounting
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate size of a cached value in bytes (its JSON encoding)"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    try:
+        return len(json.dumps(value, default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class LRUCache:
+    """
+    O(1) get/set LRU cache bounded by entry count and total bytes.
+
+    Entries may carry their own TTL; reads refresh recency, expired entries
+    are dropped lazily on access. All operations hold one lock.
+    """
+
+    def __init__(self, max_entries: int = 50, max_bytes: int = 8 * 1024 * 1024,
+                 default_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl  # seconds, None = never expires
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key: Hashable, max_age: Optional[float] = None) -> Any:
+        """
+        Look up a key and mark it most recently used
+
+        Args:
+            key: Cache key
+            max_age: Seconds; overrides the entry's own TTL for this read
+
+        Returns:
+            The cached value, or None on a miss or expiry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            value, size, stored_at, ttl = entry
+            limit = max_age if max_age is not None else ttl
+            if limit is not None and time.monotonic() - stored_at >= limit:
+                if max_age is None:
+                    self._remove(key)
+                    self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Insert or replace a value, evicting least recently used entries to stay in bounds"""
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic(), self.default_ttl if ttl is None else ttl)
+            self._bytes += size
+            self.stats['sets'] += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def _remove(self, key: Hashable):
+        """Drop an entry; caller holds the lock"""
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get_stats(self) -> Dict:
+        """Counters plus current size, for get_cache_stats()"""
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats['hits'] + stats['misses']
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hit_rate': round(stats['hits'] / lookups, 3) if lookups else 0.0
+            })
+            return stats
+
+
+def memory_cache_key(query: str) -> str:
+    """Case- and whitespace-insensitive key for the in-memory search cache"""
+    return ' '.join(query.lower().split())
+
+
+# In-memory search cache shared by every search engine implementation
+search_memory_cache = LRUCache(max_entries=50, max_bytes=4 * 1024 * 1024)
@@ -0,0 +1,160 @@
+# query_similarity.py - MinHash near-duplicate lookup over recently cached search queries
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+# Words that change how a query is phrased but not what is being asked
+StopWords = {"the", "a", "an", "is", "are", "was", "of", "to", "for", "me", "please", "tell", "about",
+             "can", "you", "could", "do", "does", "what", "whats", "who", "whos", "current", "currently"}
+
+Contractions = [(r"\bwho's\b", "who is"), (r"\bwhat's\b", "what is"), (r"\bwhere's\b", "where is"),
+                (r"\bhow's\b", "how is"), (r"'s\b", "")]
+
+
+def canonical_tokens(query: str) -> List[str]:
+    """Lowercase, expand contractions, drop possessives, punctuation and stop words"""
+    text = query.lower()
+    for pattern, replacement in Contractions:
+        text = re.sub(pattern, replacement, text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return [token for token in text.split() if token not in StopWords]
+
+
+def shingles(query: str, size: int = 3) -> set:
+    """Character shingles of each token, so 'india' and 'indian' still overlap"""
+    result = set()
+    for token in canonical_tokens(query):
+        padded = f" {token} "
+        if len(padded) <= size:
+            result.add(padded)
+        for i in range(len(padded) - size + 1):
+            result.add(padded[i:i + size])
+    return result
+
+
+def numbers_in(query: str) -> Tuple[str, ...]:
+    """Numbers must match exactly: 'weather on 5th' is not 'weather on 6th'"""
+    return tuple(sorted(re.findall(r"\d+", query)))
+
+
+def content_words(query: str) -> frozenset:
+    """
+    Words that carry the question. Queries only count as near-duplicates when
+    these are identical, so 'vice president', 'won'/'lost' or an extra
+    'tomorrow' never reuse another query's answer however high the score.
+    """
+    return frozenset(canonical_tokens(query))
+
+
+class QueryIndex:
+    """
+    Bounded index of MinHash signatures for recently cached queries.
+
+    lookup() estimates Jaccard similarity against every stored signature
+    at once (vectorised with numpy when available) and returns the closest
+    query above the threshold whose content words and numbers are identical;
+    in practice that matches rephrasings (word order, stop words,
+    contractions, punctuation) and nothing else.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, max_entries: int = 500, seed: int = 7):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[tuple, frozenset, list]]" = OrderedDict()
+        self._matrix = None  # numpy signature matrix, rebuilt lazily after changes
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'fuzzy_hits': 0, 'saved_remote_calls': 0}
+
+        # Deterministic permutation parameters
+        state = seed
+        self._a, self._b = [], []
+        for _ in range(num_perm):
+            state = (state * 1103515245 + 12345) % MERSENNE_PRIME
+            self._a.append(state | 1)
+            state = (state * 1103515245 + 12345) % MERSENNE_PRIME
+            self._b.append(state)
+        if NUMPY_AVAILABLE:
+            self._a_np = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.uint64)[:, None]
+
+    def signature(self, query: str) -> Optional[list]:
+        """MinHash signature of a query's shingles"""
+        hashed = [zlib.crc32(shingle.encode("utf-8")) % MERSENNE_PRIME for shingle in shingles(query)]
+        if not hashed:
+            return None
+        if NUMPY_AVAILABLE:
+            values = np.array(hashed, dtype=np.uint64)[None, :]
+            return ((self._a_np * values + self._b_np) % MERSENNE_PRIME).min(axis=1).tolist()
+        return [min((a * h + b) % MERSENNE_PRIME for h in hashed) for a, b in zip(self._a, self._b)]
+
+    def add(self, query: str):
+        """Remember a cached query"""
+        signature = self.signature(query)
+        if signature is None:
+            return
+        with self._lock:
+            self._entries[query] = (numbers_in(query), content_words(query), signature)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def discard(self, query: str):
+        with self._lock:
+            if self._entries.pop(query, None) is not None:
+                self._matrix = None
+
+    def lookup(self, query: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar cached query
+
+        Returns:
+            (cached query, estimated similarity), or None if nothing clears the threshold
+        """
+        signature = self.signature(query)
+        with self._lock:
+            self.stats['lookups'] += 1
+            if signature is None or not self._entries:
+                return None
+            keys = list(self._entries)
+            if NUMPY_AVAILABLE:
+                if self._matrix is None:
+                    self._matrix = np.array([entry[2] for entry in self._entries.values()], dtype=np.uint64)
+                scores = (self._matrix == np.array(signature, dtype=np.uint64)).mean(axis=1).tolist()
+            else:
+                scores = [sum(x == y for x, y in zip(entry[2], signature)) / self.num_perm
+                          for entry in self._entries.values()]
+            numbers, words = numbers_in(query), content_words(query)
+            candidates = [(score, key) for score, key in zip(scores, keys)
+                          if score >= self.threshold and self._entries[key][0] == numbers
+                          and self._entries[key][1] == words]
+        if not candidates:
+            return None
+        score, key = max(candidates)
+        return key, score
+
+    def record_hit(self, saved_calls: int):
+        """Count a near-duplicate served from cache and the remote calls it avoided"""
+        with self._lock:
+            self.stats['fuzzy_hits'] += 1
+            self.stats['saved_remote_calls'] += saved_calls
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['indexed_queries'] = len(self._entries)
+            stats['threshold'] = self.threshold
+            stats['vectorized'] = NUMPY_AVAILABLE
+            return stats
@@ -0,0 +1,97 @@
+# rate_limiter.py - Thread-safe token-bucket rate limiting for outbound APIs
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens per second up to `capacity`.
+
+    A request only waits when the bucket is empty, so an idle engine
+    searches immediately while a burst is still held to the quota.
+    """
+
+    def __init__(self, rate: float, capacity: float, name: str = "bucket"):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'delayed': 0, 'rejected': 0, 'total_wait_ms': 0.0}
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed; caller holds the lock"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self.stats['acquired'] += 1
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, sleeping only as long as the quota requires
+
+        Args:
+            tokens: Tokens this request costs
+            timeout: Maximum seconds to wait, None to wait as long as needed
+
+        Returns:
+            True if the tokens were taken, False if the wait would exceed the timeout
+        """
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.stats['acquired'] += 1
+                    if waited:
+                        self.stats['delayed'] += 1
+                        self.stats['total_wait_ms'] += (now - started) * 1000
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if timeout is not None and (now - started) + wait > timeout:
+                with self._lock:
+                    self.stats['rejected'] += 1
+                return False
+            waited = True
+            time.sleep(wait)
+
+    def state(self) -> Dict:
+        """Current bucket level and counters for monitoring"""
+        with self._lock:
+            self._refill(time.monotonic())
+            state = dict(self.stats)
+            state.update({
+                'name': self.name,
+                'tokens': round(self._tokens, 2),
+                'capacity': self.capacity,
+                'rate_per_second': self.rate,
+                'total_wait_ms': round(self.stats['total_wait_ms'], 1)
+            })
+            return state
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str, rate: float, capacity: float) -> TokenBucket:
+    """Process-wide limiter for a named quota; the first caller's settings win"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = TokenBucket(rate, capacity, name)
+        return limiter
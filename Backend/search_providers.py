@@ -0,0 +1,425 @@
+# search_providers.py - Search backends and LLM backends behind one interface, resolved once at startup
+import copy
+import datetime
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, List, Optional
+
+from dotenv import dotenv_values
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.http_clients import http_clients
+from Backend.rate_limiter import TokenBucket, get_limiter
+from Backend.lazy_imports import optional_import
+
+# Load environment variables
+env_vars = dotenv_values(".env")
+Assistantname = env_vars.get("Assistantname", "Ray")
+GeminiAPIKey = env_vars.get("GeminiAPIKey")
+GroqAPIKey = env_vars.get("GroqAPIKey")
+SerpAPIKey = env_vars.get("SerpAPIKey")
+# SerpAPI quota shared by every engine instance and thread
+SerpAPIRatePerMinute = float(env_vars.get("SerpAPIRatePerMinute", "30"))
+SerpAPIBurst = float(env_vars.get("SerpAPIBurst", "5"))
+# Scraping quota for the googlesearch package, shared across threads
+GoogleRatePerMinute = float(env_vars.get("GoogleRatePerMinute", "20"))
+GoogleBurst = float(env_vars.get("GoogleBurst", "3"))
+# Optional overrides: which search provider to use and the LLM order, e.g. "gemini,groq"
+SearchProviderName = env_vars.get("SearchProvider")
+LLMBackendOrder = [name.strip() for name in env_vars.get("LLMBackends", "gemini,groq").split(",") if name.strip()]
+
+# Optional SDKs are probed on first use (resolve_* / detect_backends), not at import time
+SERPAPI_TYPE = None
+GoogleSearch = None
+google_scrape = None
+genai = None
+_availability: Optional[Dict[str, bool]] = None
+_detect_lock = threading.Lock()
+
+def detect_serpapi_package() -> bool:
+    """Detect which SerpAPI package is available and how to use it"""
+    global GoogleSearch, SERPAPI_TYPE
+
+    serpapi = optional_import("serpapi")
+    if serpapi is None:
+        # No SerpAPI package found
+        print("⚠ Warning: No SerpAPI package found.")
+        print("Please install one of the following:")
+        print("  pip install google-search-results  # Recommended legacy package")
+        print("  pip install serpapi               # Newer package")
+        return False
+
+    if hasattr(serpapi, 'GoogleSearch'):
+        # Both the legacy google-search-results package and newer serpapi releases expose GoogleSearch
+        GoogleSearch = serpapi.GoogleSearch
+        SERPAPI_TYPE = "legacy" if hasattr(serpapi, 'SerpApiClient') else "new_with_googlesearch"
+        print(f"✓ Using serpapi GoogleSearch ({SERPAPI_TYPE})")
+    else:
+        SERPAPI_TYPE = "new_direct_api"
+        print("✓ Using newer serpapi package with direct API calls")
+    return True
+
+def detect_backends() -> Dict[str, bool]:
+    """
+    Probe every optional search/LLM SDK once per process
+
+    Returns:
+        {'serpapi': bool, 'googlesearch': bool, 'gemini': bool, 'groq': bool}
+    """
+    global _availability, google_scrape, genai
+    with _detect_lock:
+        if _availability is not None:
+            return _availability
+
+        availability = {'serpapi': detect_serpapi_package()}
+
+        googlesearch = optional_import("googlesearch")
+        google_scrape = getattr(googlesearch, "search", None)
+        availability['googlesearch'] = google_scrape is not None
+
+        genai = optional_import("google.generativeai")
+        availability['gemini'] = genai is not None
+        if genai is None:
+            print("Warning: Google Gemini package not found. Please install with: pip install google-generativeai")
+        elif not GeminiAPIKey:
+            print("Warning: GeminiAPIKey not found in environment variables")
+
+        availability['groq'] = optional_import("groq") is not None
+        if not availability['groq']:
+            print("Warning: Groq package not found. Please install with: pip install groq")
+        elif not GroqAPIKey:
+            print("Warning: GroqAPIKey not found in environment variables")
+
+        if availability['serpapi'] and not SerpAPIKey:
+            print("Warning: SerpAPIKey not found in environment variables")
+
+        _availability = availability
+        return availability
+
+
+# ---------------------------------------------------------------- search providers
+
+class SearchProvider(ABC):
+    """A web search backend returning [{'title', 'description', 'url', 'rank'}, ...]"""
+
+    name = "none"
+
+    def __init__(self, rate_limiter: Optional[TokenBucket] = None):
+        self.rate_limiter = rate_limiter
+
+    @abstractmethod
+    def search(self, query: str, num: int) -> List[Dict]:
+        """Up to num results for query"""
+
+
+class SerpAPIClassProvider(SearchProvider):
+    """SerpAPI through the GoogleSearch class (legacy or newer serpapi package)"""
+
+    name = "serpapi"
+
+    def __init__(self, api_key: str):
+        super().__init__(get_limiter("serpapi", SerpAPIRatePerMinute / 60, SerpAPIBurst))
+        self.api_key = api_key
+
+    def search(self, query: str, num: int) -> List[Dict]:
+        results = GoogleSearch({
+            "q": query,
+            "api_key": self.api_key,
+            "num": num,
+            "hl": "en",
+            "gl": "us"
+        }).get_dict()
+        return extract_serpapi_results(results)
+
+
+class SerpAPIDirectProvider(SearchProvider):
+    """SerpAPI over plain HTTP on the pooled keep-alive session"""
+
+    name = "serpapi"
+
+    def __init__(self, api_key: str):
+        super().__init__(get_limiter("serpapi", SerpAPIRatePerMinute / 60, SerpAPIBurst))
+        self.api_key = api_key
+
+    def search(self, query: str, num: int) -> List[Dict]:
+        params = {
+            "q": query,
+            "api_key": self.api_key,
+            "num": num,
+            "hl": "en",
+            "gl": "us",
+            "engine": "google"
+        }
+        response = http_clients.session("serpapi").get("https://serpapi.com/search", params=params)
+        response.raise_for_status()
+        return extract_serpapi_results(response.json())
+
+
+class GoogleScrapeProvider(SearchProvider):
+    """Unofficial Google scraping via the googlesearch package"""
+
+    name = "googlesearch"
+
+    def __init__(self):
+        super().__init__(get_limiter("googlesearch", GoogleRatePerMinute / 60, GoogleBurst))
+
+    def search(self, query: str, num: int) -> List[Dict]:
+        structured_results = []
+        for i, result in enumerate(google_scrape(query, advanced=True, num_results=num, lang='en')):
+            structured_results.append({
+                'title': getattr(result, 'title', 'No Title'),
+                'description': getattr(result, 'description', 'No Description'),
+                'url': getattr(result, 'url', ''),
+                'rank': i + 1
+            })
+        return structured_results
+
+
+def extract_serpapi_results(results: Dict) -> List[Dict]:
+    """Extract and structure organic results from a SerpAPI response"""
+    structured_results = []
+    for i, result in enumerate(results.get("organic_results", [])):
+        try:
+            structured_results.append({
+                'title': result.get('title', 'No Title'),
+                'description': result.get('snippet', 'No Description'),
+                'url': result.get('link', ''),
+                'rank': i + 1
+            })
+        except Exception as e:
+            print(f"Error processing search result {i}: {e}")
+    return structured_results
+
+
+def resolve_search_provider(preference: Optional[str] = None) -> Optional[SearchProvider]:
+    """
+    Pick the search provider once, at startup
+
+    Args:
+        preference: 'serpapi' or 'googlesearch'; defaults to the SearchProvider env setting
+
+    Returns:
+        The first usable provider, or None if nothing is installed and configured
+    """
+    preference = preference or SearchProviderName
+    availability = detect_backends()
+    candidates = []
+    if availability['serpapi'] and SerpAPIKey:
+        if SERPAPI_TYPE in ("legacy", "new_with_googlesearch"):
+            candidates.append(lambda: SerpAPIClassProvider(SerpAPIKey))
+        elif SERPAPI_TYPE == "new_direct_api":
+            candidates.append(lambda: SerpAPIDirectProvider(SerpAPIKey))
+    if availability['googlesearch']:
+        candidates.append(GoogleScrapeProvider)
+
+    providers = [make() for make in candidates]
+    for provider in providers:
+        if provider.name == preference:
+            return provider
+    return providers[0] if providers else None
+
+
+# ---------------------------------------------------------------- LLM backends
+
+def search_system_prompt() -> str:
+    """System prompt for chat-style search answers"""
+    current_time = datetime.datetime.now()
+    return f"""You are {Assistantname}, an AI assistant that provides helpful answers using web search results.
+
+Instructions:
+1. Extract key information from the search results
+2. Provide a comprehensive but concise summary (3-5 sentences)
+3. Include relevant facts and details
+4. Use natural, conversational language
+5. Don't mention sources or URLs explicitly
+6. Focus on answering the user's specific question
+7. Be accurate and informative
+
+Current Context:
+- Date: {current_time.strftime('%A, %B %d, %Y')}
+- Time: {current_time.strftime('%I:%M %p')}
+
+Provide a helpful and informative response based on the search results."""
+
+
+class LLMBackend(ABC):
+    """
+    Turns a query plus search context into an answer, whole or streamed.
+
+    system_prompt (a callable returning the prompt text) and max_tokens
+    override the backend's defaults; use with_options() to get a copy with
+    different values, since backend instances are shared per process.
+    """
+
+    name = "none"
+    label = "None"
+
+    def __init__(self, system_prompt: Optional[Callable[[], str]] = None, max_tokens: Optional[int] = None):
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+
+    def with_options(self, system_prompt: Optional[Callable[[], str]] = None,
+                     max_tokens: Optional[int] = None) -> "LLMBackend":
+        """Copy of this backend (sharing its client) with a different system prompt and/or token limit"""
+        backend = copy.copy(self)
+        if system_prompt is not None:
+            backend.system_prompt = system_prompt
+        if max_tokens is not None:
+            backend.max_tokens = max_tokens
+        return backend
+
+    @abstractmethod
+    def generate(self, query: str, search_context: str, conversation_context: str) -> Optional[str]:
+        """The whole answer, or None"""
+
+    @abstractmethod
+    def stream(self, query: str, search_context: str, conversation_context: str) -> Iterator[str]:
+        """The answer as text chunks"""
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+    label = "Gemini"
+
+    def __init__(self, model, system_prompt: Optional[Callable[[], str]] = None, max_tokens: Optional[int] = None):
+        super().__init__(system_prompt, max_tokens)
+        self.model = model
+
+    def build_prompt(self, query: str, search_context: str, conversation_context: str) -> str:
+        """Build the single-turn prompt used for Gemini"""
+        if self.system_prompt:
+            return f"""{self.system_prompt()}
+
+{conversation_context}User Query: {query}
+
+Search Results:
+{search_context}
+
+Please provide your response:"""
+
+        current_time = datetime.datetime.now()
+        return f"""You are {Assistantname}, an AI assistant providing helpful search-based responses.
+
+{conversation_context}User Query: {query}
+
+Search Results:
+{search_context}
+
+Instructions:
+- Provide a comprehensive and accurate answer based on the search results
+- Keep the response informative but concise (3-5 sentences)
+- Include relevant details and key facts
+- Use a natural, conversational tone
+- Don't mention sources or URLs explicitly
+- Focus on answering the user's specific question
+
+Current Date: {current_time.strftime('%A, %B %d, %Y')}
+Current Time: {current_time.strftime('%I:%M %p')}
+
+Please provide your response:"""
+
+    def _options(self) -> Dict:
+        return {'generation_config': {'max_output_tokens': self.max_tokens}} if self.max_tokens else {}
+
+    def generate(self, query: str, search_context: str, conversation_context: str) -> Optional[str]:
+        response = self.model.generate_content(self.build_prompt(query, search_context, conversation_context),
+                                               **self._options())
+        return response.text if response and response.text else None
+
+    def stream(self, query: str, search_context: str, conversation_context: str) -> Iterator[str]:
+        prompt = self.build_prompt(query, search_context, conversation_context)
+        for chunk in self.model.generate_content(prompt, stream=True, **self._options()):
+            text = getattr(chunk, 'text', '')
+            if text:
+                yield text
+
+
+class GroqBackend(LLMBackend):
+    name = "groq"
+    label = "Groq"
+
+    def __init__(self, client, model: str = "llama3-70b-8192", system_prompt: Optional[Callable[[], str]] = None,
+                 max_tokens: int = 200):
+        super().__init__(system_prompt, max_tokens)
+        self.client = client
+        self.model = model
+
+    def build_messages(self, query: str, search_context: str, conversation_context: str) -> List[dict]:
+        """Build the chat messages used for Groq"""
+        user_prompt = f"""{conversation_context}User Query: {query}
+
+Search Results:
+{search_context}
+
+Please provide a comprehensive and accurate answer based on the search results above. Include relevant details and cite sources when appropriate."""
+
+        return [
+            {"role": "system", "content": (self.system_prompt or search_system_prompt)()},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _create(self, query: str, search_context: str, conversation_context: str, stream: bool):
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=self.build_messages(query, search_context, conversation_context),
+            temperature=0.3,
+            max_tokens=self.max_tokens,
+            top_p=0.9,
+            stream=stream
+        )
+
+    def generate(self, query: str, search_context: str, conversation_context: str) -> Optional[str]:
+        completion = self._create(query, search_context, conversation_context, stream=False)
+        return completion.choices[0].message.content if completion else None
+
+    def stream(self, query: str, search_context: str, conversation_context: str) -> Iterator[str]:
+        for chunk in self._create(query, search_context, conversation_context, stream=True):
+            if chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+_llm_backends: Optional[Dict[str, LLMBackend]] = None
+_llm_lock = threading.Lock()
+
+def available_llm_backends() -> Dict[str, LLMBackend]:
+    """Initialize each configured LLM client once per process"""
+    global _llm_backends
+    with _llm_lock:
+        if _llm_backends is None:
+            _llm_backends = _create_llm_backends()
+        return _llm_backends
+
+def _create_llm_backends() -> Dict[str, LLMBackend]:
+
+    availability = detect_backends()
+    backends = {}
+    if availability['gemini'] and GeminiAPIKey:
+        try:
+            genai.configure(api_key=GeminiAPIKey)
+            backends["gemini"] = GeminiBackend(genai.GenerativeModel('gemini-1.5-flash'))
+            print("✓ Gemini model initialized")
+        except Exception as e:
+            print(f"Warning: Failed to initialize Gemini: {e}")
+    if availability['groq'] and GroqAPIKey:
+        try:
+            backends["groq"] = GroqBackend(http_clients.groq(GroqAPIKey))
+            print("✓ Groq client initialized")
+        except Exception as e:
+            print(f"Warning: Failed to initialize Groq: {e}")
+    return backends
+
+
+def resolve_llm_backends(order: Optional[List[str]] = None) -> List[LLMBackend]:
+    """
+    LLM backends in fallback order
+
+    Args:
+        order: Backend names, first is primary; defaults to the LLMBackends env setting
+
+    Returns:
+        The usable backends in that order (may be empty)
+    """
+    backends = available_llm_backends()
+    return [backends[name] for name in (order or LLMBackendOrder) if name in backends]
@@ -0,0 +1,204 @@
+# speech_pipeline.py - Streaming LLM tokens -> sentence chunker -> TTS -> playback
+import os
+import re
+import sys
+import threading
+import time
+from queue import Queue, Empty, Full
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.audio_player import AudioPlayer, audio_player
+
+# Marks the end of a stage's input
+_END = object()
+
+
+class SentenceChunker:
+    """Incrementally splits a token stream into speakable sentences"""
+
+    SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n+')
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 300):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, token: str) -> List[str]:
+        """Add a token and return every sentence it completed"""
+        self.buffer += token
+        sentences = []
+
+        while True:
+            match = None
+            for candidate in self.SENTENCE_END.finditer(self.buffer):
+                # Skip boundaries that would produce tiny fragments such as "Dr." or "1."
+                if candidate.end() >= self.min_chars:
+                    match = candidate
+                    break
+
+            if match:
+                sentence = self.buffer[:match.end()].strip()
+                self.buffer = self.buffer[match.end():]
+            elif len(self.buffer) > self.max_chars:
+                # Run-on text: break at the last comma or space to keep the first audio early
+                cut = max(self.buffer.rfind(",", 0, self.max_chars), self.buffer.rfind(" ", 0, self.max_chars))
+                cut = cut + 1 if cut > 0 else self.max_chars
+                sentence = self.buffer[:cut].strip()
+                self.buffer = self.buffer[cut:]
+            else:
+                break
+
+            if sentence:
+                sentences.append(sentence)
+
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once the stream has ended"""
+        tail, self.buffer = self.buffer.strip(), ""
+        return tail or None
+
+
+class StreamingSpeechPipeline:
+    """
+    Speaks text while it is still being generated.
+
+    Tokens are chunked into sentences, each sentence is synthesised while the
+    previous one plays, and bounded queues between the stages provide
+    backpressure. cancel() stops everything immediately (barge-in).
+    """
+
+    def __init__(self, player: AudioPlayer = audio_player,
+                 max_pending_sentences: int = 4, max_pending_audio: int = 2):
+        self.player = player
+        self.max_pending_sentences = max_pending_sentences
+        self.max_pending_audio = max_pending_audio
+        self.last_timings: Dict[str, float] = {}
+        self._cancel = threading.Event()
+        self._speak_lock = threading.Lock()
+
+    def speak_stream(self, tokens: Iterable[str], on_text: Callable[[str], None] = None) -> str:
+        """
+        Speak a stream of text chunks as they arrive
+
+        Args:
+            tokens: Iterable of text chunks, e.g. an LLM streaming response
+            on_text: Optional callback receiving the accumulated text after every chunk
+
+        Returns:
+            The full text that was received
+        """
+        with self._speak_lock:
+            self._cancel.clear()
+            started = time.perf_counter()
+            self.last_timings = {}
+
+            sentences = Queue(maxsize=self.max_pending_sentences)
+            audio = Queue(maxsize=self.max_pending_audio)
+            synthesizer = threading.Thread(target=self._synthesize_worker, args=(sentences, audio),
+                                           name="TTSSynthesize", daemon=True)
+            player = threading.Thread(target=self._playback_worker, args=(audio, started),
+                                      name="TTSPlayback", daemon=True)
+            synthesizer.start()
+            player.start()
+
+            chunker = SentenceChunker()
+            text = ""
+            try:
+                for token in tokens:
+                    if self._cancel.is_set():
+                        break
+                    if not token:
+                        continue
+                    if not text:
+                        self.last_timings['first_token_ms'] = (time.perf_counter() - started) * 1000
+                    text += token
+                    if on_text:
+                        on_text(text)
+                    for sentence in chunker.feed(token):
+                        self._put(sentences, sentence)
+
+                tail = chunker.flush()
+                if tail:
+                    self._put(sentences, tail)
+            finally:
+                self._put(sentences, _END)
+                synthesizer.join()
+                player.join()
+                self.last_timings['total_ms'] = (time.perf_counter() - started) * 1000
+
+            return text
+
+    def speak_text(self, text: str) -> str:
+        """Speak already complete text, synthesising sentence by sentence"""
+        return self.speak_stream([text])
+
+    def cancel(self):
+        """Barge-in: drop pending sentences and audio and stop playback now"""
+        self._cancel.set()
+        self.player.stop()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _put(self, queue: Queue, item) -> bool:
+        """Put with backpressure; gives up on cancellation except for the end marker"""
+        while True:
+            if self._cancel.is_set() and item is not _END:
+                return False
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+
+    def _synthesize_worker(self, sentences: Queue, audio: Queue):
+        while True:
+            sentence = sentences.get()
+            if sentence is _END:
+                self._put(audio, _END)
+                return
+            if self._cancel.is_set():
+                continue
+            try:
+                data = self.player.synthesize(sentence, self._should_continue)
+                if data:
+                    self._put(audio, data)
+            except Exception as e:
+                print(f"Error in TTS synthesis: {e}")
+
+    def _should_continue(self) -> bool:
+        return not self._cancel.is_set()
+
+    def _playback_worker(self, audio: Queue, started: float):
+        while True:
+            try:
+                data = audio.get(timeout=0.1)
+            except Empty:
+                continue
+            if data is _END:
+                return
+            if self._cancel.is_set():
+                continue
+            try:
+                if 'first_audio_ms' not in self.last_timings:
+                    self.last_timings['first_audio_ms'] = (time.perf_counter() - started) * 1000
+                self.player.play(data, self._should_continue)
+            except Exception as e:
+                print(f"Error in TTS playback: {e}")
+
+    def close(self):
+        """Stop speaking and release the audio device"""
+        self.cancel()
+        self.player.close()
+
+
+# Global pipeline instance
+speech_pipeline = StreamingSpeechPipeline()
+
+if __name__ == "__main__":
+    while True:
+        speech_pipeline.speak_text(input("Enter the text: "))
+        print(f"Timings: {speech_pipeline.last_timings}")
@@ -0,0 +1,209 @@
+# state_bus.py - In-process state/event bus replacing the Frontend/Files/*.data flag files
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Known state keys and the legacy .data file each one used to live in.
+MIC_STATUS = "Mic"
+ASSISTANT_STATUS = "Status"
+AUDIO_OUTPUT = "AudioOutput"
+RESPONSES = "Responses"
+DATABASE_TEXT = "Database"
+IMAGE_GENERATION = "ImageGeneration"
+
+STATE_DEFAULTS = {
+    MIC_STATUS: "False",
+    ASSISTANT_STATUS: "Ready",
+    AUDIO_OUTPUT: True,
+    RESPONSES: "",
+    DATABASE_TEXT: "",
+}
+
+STATE_TYPES = {
+    MIC_STATUS: str,
+    ASSISTANT_STATUS: str,
+    AUDIO_OUTPUT: bool,
+    RESPONSES: str,
+    DATABASE_TEXT: str,
+}
+
+
+class StateBus:
+    """Typed key/value state with publish/subscribe and condition-variable wakeups"""
+
+    def __init__(self):
+        self._state: Dict[str, Any] = dict(STATE_DEFAULTS)
+        self._versions: Dict[str, int] = {key: 0 for key in STATE_DEFAULTS}
+        self._subscribers: Dict[str, List[Callable[[str, Any], None]]] = {}
+        self._condition = threading.Condition()
+        self._mirror = None
+
+    def _coerce(self, key: str, value: Any) -> Any:
+        """Coerce a published value to the declared type of its key"""
+        expected = STATE_TYPES.get(key)
+        if expected is bool and isinstance(value, str):
+            return value.strip() == "True"
+        if expected is str and not isinstance(value, str):
+            return str(value)
+        return value
+
+    def publish(self, key: str, value: Any) -> bool:
+        """
+        Publish a new value for a key
+
+        Args:
+            key: State key (see the module level constants)
+            value: New value, coerced to the key's declared type
+
+        Returns:
+            True if the value changed and subscribers were notified
+        """
+        value = self._coerce(key, value)
+        with self._condition:
+            if key in self._state and self._state[key] == value:
+                return False
+            self._state[key] = value
+            self._versions[key] = self._versions.get(key, 0) + 1
+            callbacks = list(self._subscribers.get(key, ()))
+            self._condition.notify_all()
+
+        for callback in callbacks:
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"StateBus subscriber error for {key}: {e}")
+        return True
+
+    def emit(self, key: str, value: Any = None):
+        """Deliver a one-shot event to subscribers without storing it as state"""
+        with self._condition:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            callbacks = list(self._subscribers.get(key, ()))
+            self._condition.notify_all()
+
+        for callback in callbacks:
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"StateBus subscriber error for {key}: {e}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the current value of a key"""
+        with self._condition:
+            return self._state.get(key, default)
+
+    def version(self, key: str) -> int:
+        """Get the change counter of a key, usable with wait_for_change"""
+        with self._condition:
+            return self._versions.get(key, 0)
+
+    def subscribe(self, key: str, callback: Callable[[str, Any], None]) -> Callable[[], None]:
+        """
+        Register a callback invoked as callback(key, value) on every change
+
+        Returns:
+            A function that removes the subscription
+        """
+        with self._condition:
+            self._subscribers.setdefault(key, []).append(callback)
+
+        def unsubscribe():
+            with self._condition:
+                callbacks = self._subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+
+        return unsubscribe
+
+    def wait_for(self, key: str, predicate: Callable[[Any], bool],
+                 timeout: Optional[float] = None) -> bool:
+        """
+        Block until predicate(value) holds for a key
+
+        Returns:
+            True if the predicate became true, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: predicate(self._state.get(key)), timeout)
+
+    def wait_for_change(self, key: str, since_version: int,
+                        timeout: Optional[float] = None) -> bool:
+        """Block until a key's version moves past since_version"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._versions.get(key, 0) != since_version, timeout
+            )
+
+    def enable_file_mirror(self, directory: str, keys: Optional[List[str]] = None,
+                           debounce: float = 0.25) -> "FileMirror":
+        """Mirror selected keys to <directory>/<key>.data for legacy readers"""
+        if self._mirror is None:
+            self._mirror = FileMirror(self, directory, keys or list(STATE_TYPES), debounce)
+        return self._mirror
+
+    def load_from_files(self, directory: str, keys: Optional[List[str]] = None):
+        """Seed the bus from existing .data files without notifying subscribers"""
+        for key in keys or list(STATE_TYPES):
+            path = os.path.join(directory, f"{key}.data")
+            try:
+                with open(path, "r", encoding='utf-8') as file:
+                    value = file.read().strip()
+            except OSError:
+                continue
+            if value:
+                with self._condition:
+                    self._state[key] = self._coerce(key, value)
+
+
+class FileMirror:
+    """Debounced sink writing bus state to .data files, only when it actually changed"""
+
+    def __init__(self, bus: StateBus, directory: str, keys: List[str], debounce: float = 0.25):
+        self.bus = bus
+        self.directory = directory
+        self.debounce = debounce
+        self._dirty = set()
+        self._written: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+
+        for key in keys:
+            bus.subscribe(key, self._on_change)
+
+        self._thread = threading.Thread(target=self._run, name="StateBusFileMirror", daemon=True)
+        self._thread.start()
+
+    def _on_change(self, key: str, value: Any):
+        with self._lock:
+            self._dirty.add(key)
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Coalesce bursts of updates into a single write per key
+            time.sleep(self.debounce)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every dirty key to disk"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+
+        for key in dirty:
+            text = str(self.bus.get(key, ""))
+            if self._written.get(key) == text:
+                continue
+            try:
+                with open(os.path.join(self.directory, f"{key}.data"), "w", encoding='utf-8') as file:
+                    file.write(text)
+                self._written[key] = text
+            except OSError as e:
+                print(f"StateBus mirror write error for {key}: {e}")
+
+
+# Global bus instance
+bus = StateBus()
@@ -0,0 +1,90 @@
+# task_executor.py - Dispatch every part of a decision at once and merge the results in order
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.event_loop import EventLoopService, event_loop
+
+
+class TaskResult:
+    """Outcome of one decision item"""
+
+    def __init__(self, name: str, value: Any = None, error: Optional[BaseException] = None, elapsed_ms: float = 0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"TaskResult({self.name!r}, {status}, {self.elapsed_ms:.0f}ms)"
+
+
+class TaskGraphExecutor:
+    """
+    Runs coroutines on one shared event loop and blocking calls on a thread pool.
+
+    submit() starts a task immediately and returns a Future, so independent
+    decision items overlap; gather() waits for them and returns TaskResults
+    in submission order.
+    """
+
+    def __init__(self, max_workers: int = 6, loop_service: EventLoopService = event_loop):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="DecisionTask")
+        self.loop_service = loop_service
+
+    def submit(self, name: str, function: Callable, *args, **kwargs) -> Future:
+        """
+        Start a task now
+
+        Args:
+            name: Label used in results and timing logs
+            function: Coroutine function (run on the shared loop) or plain callable (run on the pool)
+
+        Returns:
+            Future resolving to a TaskResult; errors are captured, not raised
+        """
+        started = time.perf_counter()
+
+        if asyncio.iscoroutinefunction(function):
+            inner = self.loop_service.submit(function(*args, **kwargs))
+        else:
+            inner = self.pool.submit(function, *args, **kwargs)
+
+        outer = Future()
+
+        def done(future):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            try:
+                outer.set_result(TaskResult(name, value=future.result(), elapsed_ms=elapsed_ms))
+            except BaseException as e:
+                outer.set_result(TaskResult(name, error=e, elapsed_ms=elapsed_ms))
+
+        inner.add_done_callback(done)
+        return outer
+
+    def gather(self, futures: List[Future], timeout: Optional[float] = None) -> List[TaskResult]:
+        """Wait for futures and return their results in the order given"""
+        return [future.result(timeout) for future in futures]
+
+    def run(self, tasks: List[tuple]) -> List[TaskResult]:
+        """Submit (name, function, *args) tuples together and wait for all of them"""
+        return self.gather([self.submit(name, function, *args) for name, function, *args in tasks])
+
+    def timings(self, results: List[TaskResult]) -> Dict[str, float]:
+        return {result.name: round(result.elapsed_ms, 1) for result in results}
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
+
+
+# Global executor instance
+task_executor = TaskGraphExecutor()
@@ -0,0 +1,160 @@
+# tts_cache.py - Content-addressed audio cache for repeated TTS phrases
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+current_dir = os.getcwd()
+DEFAULT_CACHE_DIR = os.path.join(current_dir, "Data", "tts_cache")
+
+
+class TTSCache:
+    """
+    Two-level (memory + disk) LRU cache of synthesized MP3 audio.
+
+    Entries are keyed by a hash of (text, voice, pitch, rate), so the same
+    phrase spoken with the same voice settings is only synthesized once.
+    Both levels are bounded by total size in bytes.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_memory_bytes: int = 8 * 1024 * 1024,
+                 max_disk_bytes: int = 64 * 1024 * 1024, max_text_chars: int = 300):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_text_chars = max_text_chars
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(text: str, voice: str, pitch: str, rate: str) -> str:
+        """Content address for a phrase and its voice settings"""
+        raw = "\0".join((text.strip(), voice or "", pitch or "", rate or ""))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def cacheable(self, text: str) -> bool:
+        """Only short phrases are worth keeping; long answers rarely repeat"""
+        return bool(text and text.strip()) and len(text) <= self.max_text_chars
+
+    def get(self, text: str, voice: str, pitch: str, rate: str) -> Optional[bytes]:
+        """
+        Look up synthesized audio for a phrase
+
+        Returns:
+            MP3 bytes, or None on a miss
+        """
+        key = self.make_key(text, voice, pitch, rate)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return data
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)  # mtime doubles as the disk LRU clock
+        except OSError:
+            data = None
+
+        with self._lock:
+            if not data:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, text: str, voice: str, pitch: str, rate: str, data: bytes):
+        """Store synthesized audio in memory and on disk"""
+        if not data or not self.cacheable(text):
+            return
+        key = self.make_key(text, voice, pitch, rate)
+        with self._lock:
+            self._remember(key, data)
+            self.stats['stores'] += 1
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            # An overwritten entry's bytes are already counted
+            replaced_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"TTS cache write error: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data) - replaced_bytes
+        self._evict_disk()
+
+    def _remember(self, key: str, data: bytes):
+        """Insert into the memory level; caller holds the lock"""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats['evictions'] += 1
+
+    def _evict_disk(self):
+        """Drop least recently used files until the disk level fits its budget"""
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes:
+                return
+
+        try:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".mp3"):
+                    path = os.path.join(self.directory, name)
+                    info = os.stat(path)
+                    entries.append((info.st_mtime, info.st_size, path))
+        except OSError as e:
+            print(f"TTS cache scan error: {e}")
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self.stats['evictions'] += 1
+            except OSError:
+                pass
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and current memory usage"""
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+            stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else 0.0
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+            return stats
+
+
+# Global cache instance
+tts_cache = TTSCache()
@@ -1,37 +1,424 @@
 import sqlite3
 import datetime
-from typing import List, Tuple, Optional, Dict
+from typing import Any, Callable, List, Tuple, Optional, Dict
+from concurrent.futures import Future
 import json
+import queue
 import threading
+import time
+import hashlib
+import re
+import unicodedata
 import sys
 import os
 
+# Bump when normalize_search_query changes so old keys are migrated instead of silently missed
+SEARCH_KEY_VERSION = 1
+
+def normalize_search_query(query: str) -> str:
+    """Canonical form of a search query: NFKC, case-folded, single spaces, no trailing punctuation"""
+    text = unicodedata.normalize("NFKC", query or "").casefold()
+    text = " ".join(text.split())
+    return re.sub(r"[\s?.!,;:]+$", "", text)
+
+def search_cache_key(query: str) -> str:
+    """Deterministic, process-independent search_cache key (unlike hash(), which is salted per process)"""
+    digest = hashlib.sha256(normalize_search_query(query).encode("utf-8")).hexdigest()
+    return f"v{SEARCH_KEY_VERSION}:{digest}"
+
+def message_content_hash(content: str) -> str:
+    """Deterministic message digest, identical across processes (unlike hash(), which is salted per process)"""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+# Seconds since the epoch from a CURRENT_TIMESTAMP (UTC) text value, for backfilling rows
+EPOCH_FROM_TIMESTAMP_SQL = "(julianday({column}) - 2440587.5) * 86400.0"
+
+# Same content from the same role within this window is treated as a double submit
+DUPLICATE_WINDOW_SECONDS = 60
+
+# Queries whose plans must stay index-driven: name -> (sql, params, index the plan must use)
+QUERY_PLAN_EXPECTATIONS = {
+    'unprocessed_messages': (
+        "SELECT id, conversation_id, role, content, timestamp FROM messages "
+        "WHERE is_processed = FALSE AND role = 'user' AND is_error = FALSE "
+        "ORDER BY created_epoch ASC, id ASC LIMIT 10",
+        (), 'idx_messages_pending'),
+    'conversation_context': (
+        "SELECT role, content FROM messages "
+        "WHERE conversation_id = ? AND is_processed = TRUE AND is_error = FALSE "
+        "ORDER BY created_epoch DESC, id DESC LIMIT 5",
+        ('conv',), 'idx_messages_conversation_state'),
+    'duplicate_check': (
+        "SELECT 1 FROM messages WHERE content_hash = ? AND conversation_id = ? AND role = ? "
+        "AND content = ? AND created_epoch > ?",
+        ('hash', 'conv', 'user', 'text', 0.0), 'idx_messages_content_hash'),
+    'search_cache_lookup': (
+        "SELECT query FROM search_cache WHERE query_hash = ? AND expires_epoch > ?",
+        ('key', 0.0), 'query_hash'),
+    'expired_search_cache': (
+        "SELECT id FROM search_cache WHERE expires_epoch <= ?",
+        (0.0,), 'idx_search_cache_expires'),
+}
+
+# Applied to every connection. WAL lets readers run alongside the single writer;
+# synchronous=NORMAL is durable under WAL except for the last commits on power loss.
+SQLitePragmas = [
+    ("synchronous", "NORMAL"),
+    ("cache_size", "-16000"),      # negative = KiB: 16 MB page cache per connection
+    ("mmap_size", "134217728"),    # 128 MB of the file read through mmap
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", "5000"),      # ms to wait for a lock instead of failing immediately
+]
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply the shared pragmas to a new connection"""
+    for name, value in SQLitePragmas:
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+class _WriteJob:
+    __slots__ = ("function", "args", "future")
+
+    def __init__(self, function: Callable, args: tuple):
+        self.function = function
+        self.args = args
+        self.future = Future()
+
+class BatchWriter:
+    """
+    Single writer thread for one SQLite file.
+
+    Jobs are functions taking a cursor. The writer drains whatever is queued
+    (waiting at most batch_window seconds for writers seen in the previous
+    batch) and runs it all in one transaction, each job inside its own
+    savepoint so one failure doesn't undo the others. Callers either wait
+    for the commit or fire and forget; fire-and-forget failures are logged.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], batch_window: float = 0.005,
+                 max_batch: int = 64):
+        self.connect = connect
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.thread = None
+        self._last_batch = 0
+        self._lock = threading.Lock()
+        self.stats = {'jobs': 0, 'batches': 0, 'largest_batch': 0, 'failed_jobs': 0, 'commit_ms_total': 0.0}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True, name="DatabaseWriter")
+                self.thread.start()
+
+    def submit(self, function: Callable, *args, wait: bool = True, timeout: Optional[float] = 30,
+               description: str = None) -> Any:
+        """
+        Queue a write
+
+        Args:
+            function: function(cursor, *args) run inside the writer's transaction; arguments
+                should already be serialised, since it runs later on the writer thread
+            wait: Block until committed and return the function's result (re-raising its error)
+            timeout: Seconds to wait when wait=True
+            description: What the write does, for the error logged when a wait=False job fails
+
+        Returns:
+            The function's result if wait, otherwise a Future
+        """
+        job = _WriteJob(function, args)
+        if not wait:
+            # Nobody reads this Future, so report failures here instead of dropping them
+            job.future.add_done_callback(self._report_failure(description or function.__name__))
+        if threading.current_thread() is self.thread:
+            # Called from inside another job: we're already in the transaction
+            job.future.set_result(function(self._connection.cursor(), *args))
+        else:
+            self._ensure_started()
+            self.queue.put(job)
+        return job.future.result(timeout) if wait else job.future
+
+    def _run(self):
+        self._connection = self.connect()
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            batch = [job]
+            stop = False
+            # Take what is already queued; only linger (up to the window) while fewer
+            # writers have shown up than last time, so a lone writer commits at once
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    if len(batch) < self._last_batch:
+                        job = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    else:
+                        job = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._last_batch = len(batch)
+            self._execute(batch)
+            if stop:
+                break
+        self._connection.close()
+
+    def _execute(self, batch: List[_WriteJob]):
+        conn = self._connection
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job in batch:
+                conn.execute("SAVEPOINT job")
+                try:
+                    outcomes.append((job, job.function(conn.cursor(), *job.args), None))
+                    conn.execute("RELEASE job")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    outcomes.append((job, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            print(f"Database write batch failed: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            outcomes = [(job, None, e) for job in batch]
+
+        with self._lock:
+            self.stats['jobs'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+            self.stats['commit_ms_total'] += (time.perf_counter() - started) * 1000
+            self.stats['failed_jobs'] += sum(1 for _, _, error in outcomes if error is not None)
+
+        for job, result, error in outcomes:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    @staticmethod
+    def _report_failure(description: str) -> Callable[[Future], None]:
+        def report(future: Future):
+            error = future.exception()
+            if error is not None:
+                print(f"Error {description}: {error}")
+        return report
+
+    def flush(self, timeout: Optional[float] = 30):
+        """Wait until everything queued so far is committed"""
+        self.submit(lambda cursor: None, timeout=timeout)
+
+    def stop(self, timeout: Optional[float] = 5):
+        with self._lock:
+            thread = self.thread
+        if thread is not None and thread.is_alive():
+            self.queue.put(None)
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats['queued'] = self.queue.qsize()
+        stats['avg_batch'] = round(stats['jobs'] / stats['batches'], 2) if stats['batches'] else 0
+        stats['avg_commit_ms'] = round(stats['commit_ms_total'] / stats['batches'], 2) if stats['batches'] else 0
+        stats['commit_ms_total'] = round(stats['commit_ms_total'], 1)
+        return stats
+
+class MessageNotifier:
+    """
+    Wakes subscribers when new user messages are committed.
+
+    Writers in this process call notify() after their commit, which wakes
+    waiters immediately. Commits from other processes are picked up through
+    PRAGMA data_version, checked every poll_interval seconds while someone
+    is waiting (None disables the check).
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], poll_interval: Optional[float] = 5.0):
+        self.connect = connect
+        self.poll_interval = poll_interval
+        self.version = 0
+        self._condition = threading.Condition()
+        self._connection = None
+        self._data_version = None
+        self.stats = {'notifications': 0, 'external_changes': 0, 'wakeups': 0}
+
+    def notify(self):
+        """Signal that new messages are available"""
+        with self._condition:
+            self.version += 1
+            self.stats['notifications'] += 1
+            self._condition.notify_all()
+
+    def current_version(self) -> int:
+        """
+        Version to pass to wait(), read before looking for messages.
+        
+        Also snapshots data_version, so commits from other processes after
+        this point count as changes.
+        """
+        with self._condition:
+            if self.poll_interval:
+                self._check_external()
+            return self.version
+
+    def wait(self, seen_version: int, timeout: Optional[float] = None) -> int:
+        """
+        Block until something was written after seen_version
+        
+        Args:
+            seen_version: The current_version() read before the caller last looked for messages
+            timeout: Seconds to wait at most; None waits indefinitely
+            
+        Returns:
+            The current version (unchanged on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self.version == seen_version:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                step = remaining
+                if self.poll_interval:
+                    step = self.poll_interval if remaining is None else min(remaining, self.poll_interval)
+                if not self._condition.wait(step) and self.poll_interval:
+                    self._check_external()
+            self.stats['wakeups'] += 1
+            return self.version
+
+    def _check_external(self):
+        """Bump the version if another connection committed since the last check; caller holds the lock"""
+        try:
+            if self._connection is None:
+                self._connection = self.connect()
+            data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error checking database data_version: {e}")
+            return
+        if self._data_version is not None and data_version != self._data_version:
+            self.version += 1
+            self.stats['external_changes'] += 1
+            self._condition.notify_all()
+        self._data_version = data_version
+
+    def get_stats(self) -> Dict:
+        with self._condition:
+            stats = dict(self.stats)
+            stats['version'] = self.version
+            return stats
+
 class EnhancedDatabase:
-    def __init__(self, db_path: str = "Data/assistant.db"):
+    def __init__(self, db_path: str = "Data/assistant.db", batch_window_ms: float = 5, max_batch: int = 64,
+                 notify_poll_interval: Optional[float] = 5.0):
         self.db_path = db_path
         self.local = threading.local()
+        # Every write goes through one thread; reads use per-thread connections and never block on it
+        self.writer = BatchWriter(self._connect_writer, batch_window_ms / 1000, max_batch)
+        # Lets message processors sleep until a user message arrives instead of polling
+        self.message_notifier = MessageNotifier(self._connect_notifier, notify_poll_interval)
         self.init_database()
 
     def get_connection(self):
-        """Get thread-local database connection"""
+        """Get thread-local database connection (used for reads)"""
         if not hasattr(self.local, 'connection'):
-            self.local.connection = sqlite3.connect(self.db_path)
+            self.local.connection = configure_connection(sqlite3.connect(self.db_path, timeout=5))
             self.local.connection.row_factory = sqlite3.Row
         return self.local.connection
+
+    def _connect_writer(self) -> sqlite3.Connection:
+        """Autocommit connection for the writer thread, which manages its own transactions"""
+        conn = configure_connection(sqlite3.connect(self.db_path, timeout=5, isolation_level=None,
+                                                    check_same_thread=False))
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _connect_notifier(self) -> sqlite3.Connection:
+        """Connection used only to read PRAGMA data_version (from whichever thread is waiting)"""
+        return sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+
+    def wait_for_messages(self, seen_version: int, timeout: Optional[float] = None) -> int:
+        """Block until a user message is added after seen_version (see MessageNotifier.wait)"""
+        return self.message_notifier.wait(seen_version, timeout)
+
+    def get_write_stats(self) -> Dict:
+        """Batching statistics for the writer thread"""
+        return self.writer.get_stats()
     
     def column_exists(self, table_name: str, column_name: str) -> bool:
-        """Check if a column exists in a table"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = [column[1] for column in cursor.fetchall()]
+        """Check if a column exists in a table (answered from the schema cached at init)"""
+        columns = self.schema.get(table_name)
+        if columns is None:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            columns = {column[1] for column in cursor.fetchall()}
+            if columns:
+                self.schema[table_name] = columns
         return column_name in columns
 
+    def _load_schema(self, cursor) -> Dict[str, set]:
+        """Column names of every table, read once so hot paths never run PRAGMA table_info"""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        schema = {}
+        for table in tables:
+            cursor.execute(f"PRAGMA table_info({table})")
+            schema[table] = {column[1] for column in cursor.fetchall()}
+        return schema
+
+    def _build_insert_message_sql(self) -> str:
+        """
+        Duplicate check and insert as one statement: the row is only inserted if the
+        same message wasn't stored in the last minute (rowcount 0 means duplicate)
+        """
+        if self.column_exists('messages', 'content_hash'):
+            return '''
+                INSERT INTO messages 
+                (conversation_id, role, content, content_hash, message_type, metadata, search_query, 
+                 response_type, is_processed, is_error, parent_message_id, created_epoch)
+                SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM messages 
+                    WHERE content_hash = ? 
+                    AND conversation_id = ? 
+                    AND role = ? 
+                    AND content = ? 
+                    AND created_epoch > ?
+                )
+            '''
+        return '''
+            INSERT INTO messages 
+            (conversation_id, role, content, message_type, metadata, search_query, 
+             response_type, is_processed, is_error, parent_message_id, created_epoch)
+            SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM messages 
+                WHERE conversation_id = ? 
+                AND role = ? 
+                AND content = ? 
+                AND created_epoch > ?
+            )
+        '''
+
     def init_database(self):
         """Initialize enhanced database schema with migration support"""
+        self.schema = {}
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # WAL is persistent in the file, so this only does work the first time
+        journal_mode = cursor.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if str(journal_mode).lower() != "wal":
+            print(f"Warning: SQLite WAL mode unavailable, using {journal_mode}")
+        
         # Create messages table with backward compatibility
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS messages (
@@ -47,6 +434,9 @@ class EnhancedDatabase:
                 is_processed BOOLEAN DEFAULT FALSE,
                 is_error BOOLEAN DEFAULT FALSE,
                 parent_message_id INTEGER,
+                created_epoch REAL,
+                claimed_by TEXT,
+                claimed_epoch REAL,
                 FOREIGN KEY (parent_message_id) REFERENCES messages (id)
             )
         ''')
@@ -131,18 +521,35 @@ class EnhancedDatabase:
                 results TEXT,
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                 source TEXT,
-                cache_duration INTEGER DEFAULT 30
+                cache_duration INTEGER DEFAULT 30,
+                created_epoch REAL,
+                expires_epoch REAL
             )
         ''')
         
+        self._migrate_search_cache_keys(cursor)
+        self._migrate_epoch_columns(cursor)
+        
         # Create indexes safely
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_processed ON messages(is_processed)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_role ON messages(role)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_search_cache_query ON search_cache(query_hash)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_search_cache_timestamp ON search_cache(timestamp)')
         
+        # Composite indexes for the real access patterns (equality columns first, sort key last);
+        # they make the single-column conversation/processed indexes redundant
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_messages_conversation_state
+            ON messages(conversation_id, is_processed, is_error, created_epoch)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_messages_pending
+            ON messages(is_processed, role, is_error, created_epoch)
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache(expires_epoch)')
+        cursor.execute('DROP INDEX IF EXISTS idx_messages_conversation')
+        cursor.execute('DROP INDEX IF EXISTS idx_messages_processed')
+        
         # Only create content_hash index if column exists
         if 'content_hash' in columns or self.column_exists('messages', 'content_hash'):
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_content_hash ON messages(content_hash)')
@@ -150,8 +557,122 @@ class EnhancedDatabase:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_history_status ON task_history(status)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminders_scheduled ON reminders(scheduled_time)')
         
+        # Schema is final now: cache it and the statements that depend on it
+        self.schema = self._load_schema(cursor)
+        self._insert_message_sql = self._build_insert_message_sql()
+        if self.column_exists('messages', 'content_hash'):
+            self._backfill_content_hashes(conn, cursor)
+        
         conn.commit()
 
+    def _backfill_content_hashes(self, conn, cursor):
+        """Replace missing or old per-process hash() values with the deterministic digest"""
+        conn.create_function("message_content_hash", 1, message_content_hash)
+        cursor.execute('''
+            UPDATE messages SET content_hash = message_content_hash(content)
+            WHERE content_hash IS NULL OR instr(content_hash, '_') > 0
+        ''')
+        if cursor.rowcount > 0:
+            print(f"Backfilled content_hash for {cursor.rowcount} messages")
+
+    def _migrate_epoch_columns(self, cursor):
+        """
+        Add and backfill the epoch columns that time-window queries compare against
+        (plus the claim columns used by claim_messages).
+        
+        datetime(timestamp) > datetime('now', ...) can't use an index; created_epoch > ?
+        can. Triggers fill the columns for rows inserted by code that doesn't set them.
+        """
+        epoch_columns = {
+            'messages': ['created_epoch', 'claimed_epoch'],
+            'search_cache': ['created_epoch', 'expires_epoch']
+        }
+        for table, columns in epoch_columns.items():
+            cursor.execute(f"PRAGMA table_info({table})")
+            existing = {column[1] for column in cursor.fetchall()}
+            for column in columns:
+                if column not in existing:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} REAL')
+                    print(f"Added {column} column to {table} table")
+            if table == 'messages' and 'claimed_by' not in existing:
+                cursor.execute('ALTER TABLE messages ADD COLUMN claimed_by TEXT')
+                print("Added claimed_by column to messages table")
+        
+        created = EPOCH_FROM_TIMESTAMP_SQL.format(column='timestamp')
+        cursor.execute(f'UPDATE messages SET created_epoch = {created} WHERE created_epoch IS NULL')
+        cursor.execute(f'''
+            UPDATE search_cache
+            SET created_epoch = COALESCE(created_epoch, {created}),
+                expires_epoch = COALESCE(created_epoch, {created}) + COALESCE(cache_duration, 30) * 60
+            WHERE created_epoch IS NULL OR expires_epoch IS NULL
+        ''')
+        
+        new_created = EPOCH_FROM_TIMESTAMP_SQL.format(column='NEW.timestamp')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_messages_created_epoch
+            AFTER INSERT ON messages WHEN NEW.created_epoch IS NULL
+            BEGIN
+                UPDATE messages SET created_epoch = {new_created} WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_search_cache_epochs
+            AFTER INSERT ON search_cache WHEN NEW.created_epoch IS NULL OR NEW.expires_epoch IS NULL
+            BEGIN
+                UPDATE search_cache
+                SET created_epoch = COALESCE(NEW.created_epoch, {new_created}),
+                    expires_epoch = COALESCE(NEW.created_epoch, {new_created}) + COALESCE(NEW.cache_duration, 30) * 60
+                WHERE id = NEW.id;
+            END
+        ''')
+
+    def explain_query_plan(self, sql: str, params: tuple = ()) -> List[str]:
+        """EXPLAIN QUERY PLAN detail lines for a statement"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+    def check_query_plans(self) -> Dict[str, Dict]:
+        """
+        Verify the hot queries are still answered from their indexes
+        
+        Returns:
+            name -> {'ok': bool, 'plan': [...]}; not ok means a full scan or a
+            missing index, or an extra sort the index should have avoided
+        """
+        results = {}
+        for name, (sql, params, index) in QUERY_PLAN_EXPECTATIONS.items():
+            plan = self.explain_query_plan(sql, params)
+            uses_index = any(index in line and line.startswith("SEARCH") for line in plan)
+            sorts = any("TEMP B-TREE" in line for line in plan)
+            results[name] = {'ok': uses_index and not sorts, 'plan': plan}
+        return results
+
+    def _migrate_search_cache_keys(self, cursor):
+        """Re-key search_cache rows written with an older or per-process key scheme"""
+        current_prefix = f"v{SEARCH_KEY_VERSION}:"
+        cursor.execute('''
+            SELECT id, query FROM search_cache
+            WHERE query_hash IS NULL OR substr(query_hash, 1, ?) != ?
+            ORDER BY timestamp DESC
+        ''', (len(current_prefix), current_prefix))
+        legacy_rows = cursor.fetchall()
+        if not legacy_rows:
+            return
+        
+        migrated = 0
+        for row_id, query in legacy_rows:
+            # Newest row wins a key; older duplicates are ignored here and deleted below
+            cursor.execute('UPDATE OR IGNORE search_cache SET query_hash = ? WHERE id = ?',
+                           (search_cache_key(query or ""), row_id))
+            migrated += cursor.rowcount
+        
+        cursor.execute('''
+            DELETE FROM search_cache
+            WHERE query_hash IS NULL OR substr(query_hash, 1, ?) != ?
+        ''', (len(current_prefix), current_prefix))
+        print(f"Migrated {migrated} search_cache keys to v{SEARCH_KEY_VERSION}, dropped {cursor.rowcount} duplicates")
+
     def add_message(self, role: str = None, content: str = None, conversation_id: str = None, 
                message_type: str = 'text', metadata: Dict = None, 
                search_query: str = None, response_type: str = None,
@@ -159,9 +680,6 @@ class EnhancedDatabase:
                parent_message_id: int = None, sender: str = None, message: str = None,
                timestamp: str = None) -> int:
         """Add a message with basic duplicate prevention - supports both old and new parameter formats"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-    
     # Handle backward compatibility - map UI parameters to database parameters
         if sender and not role:
             role = 'user' if sender.lower() == 'user' else 'assistant'
@@ -177,43 +695,35 @@ class EnhancedDatabase:
             conversation_id = f"conv_{int(datetime.datetime.now().timestamp())}"
     
         try:
-        # Check for recent duplicate (same content in last 5 messages)
-            cursor.execute('''
-            SELECT COUNT(*) FROM messages 
-            WHERE conversation_id = ? 
-            AND role = ? 
-            AND content = ? 
-            AND datetime(timestamp) > datetime('now', '-1 minute')
-            ''', (conversation_id, role, content))
-        
-            if cursor.fetchone()[0] > 0:
-                print(f"Duplicate message prevented: {content[:50]}...")
-                return None
-        
-            cursor.execute('''
-            INSERT INTO messages 
-            (conversation_id, role, content, message_type, metadata, search_query, 
-             response_type, is_processed, is_error, parent_message_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (conversation_id, role, content, message_type, 
-                json.dumps(metadata) if metadata else None,
-                search_query, response_type, is_processed, is_error, parent_message_id))
-        
-            message_id = cursor.lastrowid
-        
-        # If content_hash column exists, update it
+            now = time.time()
+            values = (json.dumps(metadata) if metadata else None,
+                      search_query, response_type, is_processed, is_error, parent_message_id, now)
+            duplicate_since = now - DUPLICATE_WINDOW_SECONDS
             if self.column_exists('messages', 'content_hash'):
-                cursor.execute('''
-                UPDATE messages 
-                SET content_hash = ? 
-                WHERE id = ?
-                ''', (f"{hash(content)}_{message_id}", message_id))
-        
-            conn.commit()
-        
-        # Update conversation timestamp
-            self.update_conversation(conversation_id)
-        
+                content_hash = message_content_hash(content)
+                params = (conversation_id, role, content, content_hash, message_type) + values + \
+                         (content_hash, conversation_id, role, content, duplicate_since)
+            else:
+                params = (conversation_id, role, content, message_type) + values + \
+                         (conversation_id, role, content, duplicate_since)
+            
+            def insert(cursor):
+                # Duplicate check, insert and hash in one statement
+                cursor.execute(self._insert_message_sql, params)
+                if cursor.rowcount == 0:
+                    print(f"Duplicate message prevented: {content[:50]}...")
+                    return None
+                message_id = cursor.lastrowid
+            
+                # Update conversation timestamp in the same transaction
+                self._touch_conversation(cursor, conversation_id)
+                return message_id
+            
+            # Committed together with any other writes queued at the same moment
+            message_id = self.writer.submit(insert)
+            if message_id and role == 'user' and not is_processed:
+                # Committed by now, so woken processors will see it
+                self.message_notifier.notify()
             return message_id
         
         except Exception as e:
@@ -282,7 +792,7 @@ class EnhancedDatabase:
         cursor = conn.cursor()
     
         base_query = '''
-            SELECT DISTINCT id, conversation_id, role, content, timestamp 
+            SELECT id, conversation_id, role, content, timestamp 
             FROM messages
             WHERE is_processed = FALSE 
             AND role = 'user'
@@ -292,12 +802,12 @@ class EnhancedDatabase:
         if conversation_id:
             cursor.execute(base_query + '''
                 AND conversation_id = ?
-                ORDER BY timestamp ASC
+                ORDER BY created_epoch ASC, id ASC
                 LIMIT ?
             ''', (conversation_id, limit))
         else:
             cursor.execute(base_query + '''
-                ORDER BY timestamp ASC
+                ORDER BY created_epoch ASC, id ASC
                 LIMIT ?
             ''', (limit,))
     
@@ -313,29 +823,111 @@ class EnhancedDatabase:
     
         return messages
 
-    def mark_as_processed(self, message_id: int) -> bool:
-        """Mark a message as processed with verification"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def claim_messages(self, claimant: str, limit: int = 5, lease_seconds: float = 300) -> List[Dict]:
+        """
+        Atomically claim pending user messages for one processor
         
-        # Check if message exists and is not already processed
-        cursor.execute('''
-            SELECT is_processed FROM messages WHERE id = ?
-        ''', (message_id,))
+        Selection and claim happen in one IMMEDIATE transaction, so processors
+        sharing the database (threads or processes) never get the same message.
+        Conversations with an unfinished claim held by another processor are
+        skipped to keep their messages in order. Claims older than lease_seconds
+        are treated as abandoned and can be taken over.
         
-        result = cursor.fetchone()
-        if not result:
-            return False
+        Args:
+            claimant: Unique id of the claiming processor
+            limit: Maximum messages to claim
+            lease_seconds: How long a claim stays valid without being processed
             
-        if result[0]:  # Already processed
-            return True
+        Returns:
+            Claimed messages, oldest first
+        """
+        def claim(cursor):
+            now = time.time()
+            stale = now - lease_seconds
+            cursor.execute('''
+                SELECT id, conversation_id, role, content, timestamp
+                FROM messages
+                WHERE is_processed = FALSE 
+                AND role = 'user'
+                AND is_error = FALSE
+                AND (claimed_by IS NULL OR claimed_epoch < ?)
+                AND conversation_id NOT IN (
+                    SELECT conversation_id FROM messages
+                    WHERE is_processed = FALSE 
+                    AND role = 'user'
+                    AND is_error = FALSE
+                    AND claimed_by != ?
+                    AND claimed_epoch >= ?
+                )
+                ORDER BY created_epoch ASC, id ASC
+                LIMIT ?
+            ''', (stale, claimant, stale, limit))
+            rows = cursor.fetchall()
+            cursor.executemany('''
+                UPDATE messages SET claimed_by = ?, claimed_epoch = ? WHERE id = ?
+            ''', [(claimant, now, row[0]) for row in rows])
+            return [{
+                'id': row[0],
+                'conversation_id': row[1],
+                'role': row[2],
+                'content': row[3],
+                'timestamp': row[4]
+            } for row in rows]
+        
+        try:
+            return self.writer.submit(claim)
+        except Exception as e:
+            print(f"Error claiming messages: {e}")
+            return []
+
+    def get_claim_holders(self) -> List[str]:
+        """Claimants currently holding claims on unprocessed user messages"""
+        try:
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT DISTINCT claimed_by FROM messages
+                WHERE is_processed = FALSE 
+                AND role = 'user'
+                AND is_error = FALSE
+                AND claimed_by IS NOT NULL
+            ''')
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting claim holders: {e}")
+            return []
+
+    def release_claims(self, claimant: str) -> int:
+        """Release every unfinished claim held by a claimant (e.g. a processor that no longer runs)"""
+        try:
+            return self.writer.submit(lambda cursor: cursor.execute('''
+                UPDATE messages SET claimed_by = NULL, claimed_epoch = NULL
+                WHERE claimed_by = ? AND is_processed = FALSE
+            ''', (claimant,)).rowcount)
+        except Exception as e:
+            print(f"Error releasing claims: {e}")
+            return 0
+
+    def mark_as_processed(self, message_id: int) -> bool:
+        """Mark a message as processed with verification"""
+        def mark(cursor):
+            # Check if message exists and is not already processed
+            cursor.execute('''
+                SELECT is_processed FROM messages WHERE id = ?
+            ''', (message_id,))
             
-        cursor.execute('''
-            UPDATE messages SET is_processed = TRUE WHERE id = ?
-        ''', (message_id,))
+            result = cursor.fetchone()
+            if not result:
+                return False
+                
+            if result[0]:  # Already processed
+                return True
+                
+            cursor.execute('''
+                UPDATE messages SET is_processed = TRUE WHERE id = ?
+            ''', (message_id,))
+            return cursor.rowcount > 0
         
-        conn.commit()
-        return cursor.rowcount > 0
+        return self.writer.submit(mark)
 
     def get_conversation_context(self, conversation_id: str, limit: int = 5) -> List[Tuple]:
         """Get recent conversation context - processed messages only"""
@@ -347,7 +939,7 @@ class EnhancedDatabase:
             WHERE conversation_id = ? 
             AND is_processed = TRUE
             AND is_error = FALSE
-            ORDER BY timestamp DESC
+            ORDER BY created_epoch DESC, id DESC
             LIMIT ?
         ''', (conversation_id, limit))
         
@@ -360,22 +952,20 @@ class EnhancedDatabase:
         if not conversation_id:
             conversation_id = f"conv_{int(datetime.datetime.now().timestamp())}"
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        self.writer.submit(lambda cursor: cursor.execute('''
             INSERT OR REPLACE INTO conversations (id, title, user_id)
             VALUES (?, ?, ?)
-        ''', (conversation_id, title, user_id))
-        
-        conn.commit()
+        ''', (conversation_id, title, user_id)))
         return conversation_id
 
     def update_conversation(self, conversation_id: str, title: str = None):
-        """Update conversation metadata"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        """Update conversation metadata (queued; doesn't wait for the commit)"""
+        self.writer.submit(self._touch_conversation, conversation_id, title, wait=False,
+                           description="updating conversation")
+
+    @staticmethod
+    def _touch_conversation(cursor, conversation_id: str, title: str = None):
+        """Bump a conversation's updated_at (and title) inside the caller's transaction"""
         if title:
             cursor.execute('''
                 UPDATE conversations 
@@ -388,8 +978,6 @@ class EnhancedDatabase:
                 SET updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (conversation_id,))
-        
-        conn.commit()
 
     def get_conversation_messages(self, conversation_id: str) -> List[Dict]:
         """Retrieve all messages for a conversation - ordered and clean"""
@@ -423,9 +1011,10 @@ class EnhancedDatabase:
 
     def cleanup_duplicate_responses(self, conversation_id: str = None):
         """Clean up any duplicate assistant responses"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        return self.writer.submit(self._delete_duplicate_responses, conversation_id)
+
+    @staticmethod
+    def _delete_duplicate_responses(cursor, conversation_id: str = None) -> int:
         if conversation_id:
             cursor.execute('''
                 DELETE FROM messages 
@@ -449,7 +1038,6 @@ class EnhancedDatabase:
                 AND role = 'assistant'
             ''')
         
-        conn.commit()
         return cursor.rowcount
 
     def get_processing_stats(self) -> Dict:
@@ -479,33 +1067,49 @@ class EnhancedDatabase:
 
     # ===== SEARCH CACHE METHODS =====
     
-    def get_search_cache(self, query: str, cache_duration_minutes: int = 30) -> Optional[Dict]:
-        """Get cached search results if they exist and are not expired"""
+    def get_search_cache(self, query: str, cache_duration_minutes: int = None) -> Optional[Dict]:
+        """
+        Get a cached search entry if it exists and is not expired
+        
+        Args:
+            query: Search query
+            cache_duration_minutes: Maximum age to accept; None uses the TTL stored with the entry
+            
+        Returns:
+            The cached dict as it was saved (results, response, ...) plus timestamp/source/cache_duration
+        """
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
             
-            # Create a hash of the query for consistent lookups
-            query_hash = str(hash(query.lower().strip()))
+            # Stable digest of the normalized query, identical across restarts
+            query_hash = search_cache_key(query)
             
-            # Check for cached results within the cache duration
-            cursor.execute('''
-                SELECT query, results, timestamp, source
+            # Check for cached results within the entry's own (or the requested) freshness window
+            if cache_duration_minutes is None:
+                freshness, threshold = 'expires_epoch > ?', time.time()
+            else:
+                freshness, threshold = 'created_epoch > ?', time.time() - cache_duration_minutes * 60
+            cursor.execute(f'''
+                SELECT query, results, timestamp, source, cache_duration
                 FROM search_cache
                 WHERE query_hash = ?
-                AND datetime(timestamp) > datetime('now', '-{} minutes')
-                ORDER BY timestamp DESC
+                AND {freshness}
                 LIMIT 1
-            '''.format(cache_duration_minutes), (query_hash,))
+            ''', (query_hash, threshold))
             
             result = cursor.fetchone()
             if result:
-                return {
-                    'query': result[0],
-                    'results': json.loads(result[1]) if result[1] else [],
+                payload = json.loads(result[1]) if result[1] else []
+                # Rows store the engine's whole cache dict; very old rows stored a bare result list
+                cached = dict(payload) if isinstance(payload, dict) else {'results': payload}
+                cached.setdefault('query', result[0])
+                cached.update({
                     'timestamp': result[2],
-                    'source': result[3]
-                }
+                    'source': result[3],
+                    'cache_duration': result[4]
+                })
+                return cached
             
             return None
             
@@ -513,42 +1117,59 @@ class EnhancedDatabase:
             print(f"Error getting search cache: {e}")
             return None
 
-    def save_search_result(self, query: str, results: Dict, source: str = 'google') -> bool:
-        """Save search results to cache"""
+    def save_search_result(self, query: str, results: Dict, source: str = 'google',
+                           cache_duration_minutes: int = 30) -> bool:
+        """Save search results to cache with the entry's own freshness window"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Create a hash of the query for consistent lookups
-            query_hash = str(hash(query.lower().strip()))
+            # Stable digest of the normalized query, identical across restarts
+            query_hash = search_cache_key(query)
             
-            # Insert or replace the cached result
-            cursor.execute('''
-                INSERT OR REPLACE INTO search_cache (query_hash, query, results, source)
-                VALUES (?, ?, ?, ?)
-            ''', (query_hash, query, json.dumps(results), source))
+            now = time.time()
+            # Serialised now: the write runs later on the writer thread, and the caller may
+            # change results meanwhile; a non-JSON result also fails here, where it's reported
+            params = (query_hash, query, json.dumps(results), source, int(cache_duration_minutes),
+                      now, now + int(cache_duration_minutes) * 60)
             
-            conn.commit()
+            # Insert or replace the cached result; queued so the answer isn't held up by the commit
+            self.writer.submit(lambda cursor: cursor.execute('''
+                INSERT OR REPLACE INTO search_cache 
+                (query_hash, query, results, source, cache_duration, created_epoch, expires_epoch)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', params), wait=False, description="saving search result")
             return True
             
         except Exception as e:
             print(f"Error saving search result: {e}")
             return False
 
-    def clear_expired_cache(self, cache_duration_minutes: int = 30) -> int:
-        """Clear expired cache entries"""
+    def get_recent_search_queries(self, limit: int = 500) -> List[str]:
+        """Most recently cached search queries, newest first"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
             cursor.execute('''
-                DELETE FROM search_cache
-                WHERE datetime(timestamp) <= datetime('now', '-{} minutes')
-            '''.format(cache_duration_minutes))
+                SELECT query FROM search_cache
+                ORDER BY timestamp DESC
+                LIMIT ?
+            ''', (limit,))
+            return [row[0] for row in cursor.fetchall() if row[0]]
+        except Exception as e:
+            print(f"Error getting recent search queries: {e}")
+            return []
+
+    def clear_expired_cache(self, cache_duration_minutes: int = None) -> int:
+        """Clear expired cache entries; None uses each entry's own TTL, 0 clears everything"""
+        try:
+            if cache_duration_minutes is None:
+                expired, threshold = 'expires_epoch <= ?', time.time()
+            else:
+                expired, threshold = 'created_epoch <= ?', time.time() - cache_duration_minutes * 60
             
-            removed_count = cursor.rowcount
-            conn.commit()
-            return removed_count
+            def delete(cursor):
+                cursor.execute(f'DELETE FROM search_cache WHERE {expired}', (threshold,))
+                return cursor.rowcount
+            
+            return self.writer.submit(delete)
             
         except Exception as e:
             print(f"Error clearing expired cache: {e}")
@@ -562,12 +1183,11 @@ class EnhancedDatabase:
             
             cursor.execute('''
                 SELECT 
-                    COUNT(*) as total_cached,
-                    COUNT(CASE WHEN datetime(timestamp) > datetime('now', '-30 minutes') THEN 1 END) as fresh_cache,
-                    MIN(timestamp) as oldest_entry,
-                    MAX(timestamp) as newest_entry
-                FROM search_cache
-            ''')
+                    (SELECT COUNT(*) FROM search_cache) as total_cached,
+                    (SELECT COUNT(*) FROM search_cache WHERE expires_epoch > ?) as fresh_cache,
+                    (SELECT MIN(timestamp) FROM search_cache) as oldest_entry,
+                    (SELECT MAX(timestamp) FROM search_cache) as newest_entry
+            ''', (time.time(),))
             
             result = cursor.fetchone()
             return {
@@ -585,35 +1205,25 @@ class EnhancedDatabase:
     
     def add_task(self, conversation_id: str, task_type: str, task_content: str) -> int:
         """Add a task to the task history"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        return self.writer.submit(lambda cursor: cursor.execute('''
             INSERT INTO task_history (conversation_id, task_type, task_content)
             VALUES (?, ?, ?)
-        ''', (conversation_id, task_type, task_content))
-        
-        task_id = cursor.lastrowid
-        conn.commit()
-        return task_id
+        ''', (conversation_id, task_type, task_content)).lastrowid)
 
     def update_task(self, task_id: int, status: str, result: str = None, 
                    error_message: str = None):
-        """Update task status and result"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        """Update task status and result (queued; doesn't wait for the commit)"""
+        params = (status, result, error_message, task_id)
+        self.writer.submit(lambda cursor: cursor.execute('''
             UPDATE task_history 
             SET status = ?, result = ?, error_message = ?, 
                 completed_at = CURRENT_TIMESTAMP
             WHERE id = ?
-        ''', (status, result, error_message, task_id))
-        
-        conn.commit()
+        ''', params), wait=False, description="updating task")
 
     def close(self):
-        """Close database connections"""
+        """Flush queued writes and close database connections"""
+        self.writer.stop()
         if hasattr(self.local, 'connection'):
             self.local.connection.close()
 
@@ -0,0 +1,90 @@
+# dbbench.py - Microbenchmark for EnhancedDatabase.add_message (run from the project root)
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from Data.database import EnhancedDatabase
+
+
+def legacy_add_message(conn, conversation_id, role, content):
+    """The add_message write path before schema caching: PRAGMA, dedup SELECT, INSERT, hash UPDATE, touch"""
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(messages)")
+    has_content_hash = 'content_hash' in [column[1] for column in cursor.fetchall()]
+    cursor.execute('''
+    SELECT COUNT(*) FROM messages 
+    WHERE conversation_id = ? AND role = ? AND content = ? 
+    AND datetime(timestamp) > datetime('now', '-1 minute')
+    ''', (conversation_id, role, content))
+    if cursor.fetchone()[0] > 0:
+        return None
+    cursor.execute('''
+    INSERT INTO messages (conversation_id, role, content, message_type, is_processed, is_error)
+    VALUES (?, ?, ?, 'text', 0, 0)
+    ''', (conversation_id, role, content))
+    message_id = cursor.lastrowid
+    if has_content_hash:
+        cursor.execute("UPDATE messages SET content_hash = ? WHERE id = ?",
+                       (f"{hash(content)}_{message_id}", message_id))
+    conn.commit()
+    cursor.execute("UPDATE conversations SET updated_at = CURRENT_TIMESTAMP WHERE id = ?", (conversation_id,))
+    conn.commit()
+    return message_id
+
+
+def run_threads(count, threads, insert):
+    """Insert count messages split over threads; returns inserts per second"""
+    per_thread = count // threads
+
+    def work(offset):
+        for i in range(per_thread):
+            insert(f"benchmark message {offset + i}")
+
+    workers = [threading.Thread(target=work, args=(t * per_thread,)) for t in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def benchmark(count=2000, threads=(1, 4)):
+    with tempfile.TemporaryDirectory() as folder:
+        for thread_count in threads:
+            # Before: one connection per call site, separate statements and commits
+            path = os.path.join(folder, f"legacy_{thread_count}.db")
+            EnhancedDatabase(path).close()
+            lock = threading.Lock()
+            local = threading.local()
+
+            def legacy_insert(content):
+                if not hasattr(local, 'conn'):
+                    local.conn = sqlite3.connect(path, timeout=30)
+                with lock:  # the old code serialized writers on SQLite's file lock
+                    legacy_add_message(local.conn, 'bench', 'user', content)
+
+            conn = sqlite3.connect(path)
+            conn.execute("INSERT INTO conversations (id, title) VALUES ('bench', 'bench')")
+            conn.commit()
+            conn.close()
+            before = run_threads(count, thread_count, legacy_insert)
+
+            # After: cached schema, one conditional INSERT, batched commits
+            db = EnhancedDatabase(os.path.join(folder, f"current_{thread_count}.db"))
+            conversation_id = db.create_conversation("bench", "bench")
+            after = run_threads(count, thread_count, lambda content: db.add_message(
+                role='user', content=content, conversation_id=conversation_id))
+            stats = db.get_write_stats()
+            db.close()
+
+            print(f"{thread_count} thread(s): before {before:8.0f} inserts/s   "
+                  f"after {after:8.0f} inserts/s   ({after / before:.1f}x, {stats})")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
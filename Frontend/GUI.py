@@ -14,10 +14,7 @@ import time
 import speech_recognition as sr
 from threading import Thread
 import uuid
-import pygame
 import random
-import asyncio
-import edge_tts
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -26,6 +23,9 @@ from Backend.RealtimeSearchEngine import RealtimeSearchEngine
 from Backend.Chatbot import ChatBot
 from Backend.Automation import Automation
 from Data.database import db
+from Backend.state_bus import bus, MIC_STATUS, ASSISTANT_STATUS, AUDIO_OUTPUT, RESPONSES
+from Backend.audio_player import audio_player
+from Backend.event_loop import event_loop
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -75,20 +75,32 @@ def TempDirectoryPath(Filename):
     path = os.path.join(TempDirPath, Filename)
     return path.replace('\\', '/')
 
+# Shared UI state lives in the in-process bus; the .data files are only an optional mirror
+if env_vars.get("MirrorStateFiles", "False") == "True":
+    bus.load_from_files(TempDirPath)
+    bus.enable_file_mirror(TempDirPath)
+
 =======
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QStackedWidget, QWidget, QLineEdit, QGridLayout, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QLabel, QSizePolicy
 from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat
-from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtCore import Qt, QSize, QTimer, QObject, pyqtSignal
 from dotenv import dotenv_values
 import sys
 import os
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Backend.state_bus import bus, MIC_STATUS, ASSISTANT_STATUS, AUDIO_OUTPUT, RESPONSES
+
 env_vars = dotenv_values(".env")
 Assistantname = env_vars.get("Assistantname")
 current_dir = os.getcwd()
 old_chat_message = TempDirPath = rf"{current_dir}\Frontend\Files"
 GraphicsDirPath = rf"{current_dir}\Frontend\Graphics"
 
+if env_vars.get("MirrorStateFiles", "False") == "True":
+    bus.load_from_files(TempDirPath)
+    bus.enable_file_mirror(TempDirPath)
+
 def AnswerModifier(Answer):
     lines = Answer.split('\n')
     non_empty_lines = [line for line in lines if line.strip()]
@@ -113,44 +125,29 @@ def QueryModifier(Query):
 
 >>>>>>> 9c5cf6a2519cd1b02854e9a55419503dac015cb8
 def SetMicrophoneStatus(Command):
-    with open(TempDirectoryPath('Mic.data'), "w", encoding='utf-8') as file:
-        file.write(Command)
+    bus.publish(MIC_STATUS, Command)
 
 def GetMicrophoneStatus():
 <<<<<<< HEAD
-    try:
-        with open(TempDirectoryPath('Mic.data'), "r", encoding='utf-8') as file:
-            return file.read().strip()
-    except:
-        SetMicrophoneStatus("False")
-        return "False"
+    return bus.get(MIC_STATUS, "False")
 
 def SetAssistantStatus(Status):
-    with open(TempDirectoryPath('Status.data'), "w", encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(ASSISTANT_STATUS, Status)
 
 def GetAssistantStatus():
-    try:
-        with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-            status = file.read().strip()
-            return status if status else "Ready"
-    except:
-        SetAssistantStatus("Ready")
-        return "Ready"
+    status = bus.get(ASSISTANT_STATUS, "")
+    return status if status else "Ready"
 
 def SetAudioOutputStatus(status):
     """Set audio output status (True/False)"""
-    with open(TempDirectoryPath('AudioOutput.data'), "w", encoding='utf-8') as file:
-        file.write(str(status))
+    bus.publish(AUDIO_OUTPUT, status)
 
 def GetAudioOutputStatus():
     """Get audio output status"""
-    try:
-        with open(TempDirectoryPath('AudioOutput.data'), "r", encoding='utf-8') as file:
-            return file.read().strip() == "True"
-    except:
-        SetAudioOutputStatus(True)
-        return True
+    return bus.get(AUDIO_OUTPUT, True)
+
+def ShowTextToScreen(Text):
+    bus.publish(RESPONSES, Text)
 
 def capitalize_first_letter(text):
     """Capitalize the first letter of a string"""
@@ -246,47 +243,17 @@ class TTSThread(QThread):
         
     def run(self):
         try:
-            # Convert text to audio file
-            asyncio.run(self.text_to_audio_file(self.text))
-            
-            if self.should_stop:
-                return
-                
-            # Play the audio
-            pygame.mixer.init()
-            speech_file = os.path.join(DataDirPath, "speech.mp3")
-            pygame.mixer.music.load(speech_file)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy() and not self.should_stop:
-                self.msleep(100)
-                
+            # Synthesise into memory and play on the shared, long-lived mixer
+            audio_player.speak(self.text, lambda: not self.should_stop)
         except Exception as e:
             self.error.emit(str(e))
         finally:
-            try:
-                pygame.mixer.music.stop()
-                pygame.mixer.quit()
-            except:
-                pass
             self.finished.emit()
     
-    async def text_to_audio_file(self, text):
-        """Convert text to audio file using edge_tts"""
-        file_path = os.path.join(DataDirPath, "speech.mp3")
-        
-        # Remove existing file
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Generate speech
-        communicate = edge_tts.Communicate(text, AssistantVoice, pitch='+5Hz', rate='+13%')
-        await communicate.save(file_path)
-    
     def stop(self):
         """Stop TTS playback"""
         self.should_stop = True
+        audio_player.stop()
 
 class SpeechRecognitionThread(QThread):
     recognized = pyqtSignal(str)
@@ -294,18 +261,13 @@ class SpeechRecognitionThread(QThread):
     listening_state = pyqtSignal(bool)
     processing_complete = pyqtSignal()
 =======
-    with open(rf'{TempDirPath}\Mic.data', "r", encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    return bus.get(MIC_STATUS, "False")
 
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}\Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(ASSISTANT_STATUS, Status)
 
 def GetAssistantStatus():
-    with open(rf'{TempDirPath}\Status.data', "r", encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    return bus.get(ASSISTANT_STATUS, "")
 
 def MicButtonInitialed():
     SetMicrophoneStatus("False")
@@ -322,8 +284,16 @@ def TempDirectoryPath(Filename):
     return Path
 
 def ShowTextToScreen(Text):
-    with open(rf'{TempDirPath}\Responses.data', "w", encoding='utf-8') as file:
-        file.write(Text)
+    bus.publish(RESPONSES, Text)
+
+class BusBridge(QObject):
+    """Re-emits state bus changes of one key as a Qt signal so widgets update in the GUI thread"""
+    changed = pyqtSignal(str)
+
+    def __init__(self, key, parent=None):
+        super().__init__(parent)
+        unsubscribe = bus.subscribe(key, lambda _key, value: self.changed.emit(str(value)))
+        self.destroyed.connect(lambda *_: unsubscribe())
 >>>>>>> 9c5cf6a2519cd1b02854e9a55419503dac015cb8
 
     def __init__(self):
@@ -643,6 +613,14 @@ class MainWindow(QMainWindow):
             "Please check the chat for the complete response.",
             "The detailed response is shown in the conversation."
         ]
+        self.status_confirmations = [
+            "Microphone turned on",
+            "Microphone turned off",
+            "Audio output turned on",
+            "Audio output turned off"
+        ]
+        # Fill the TTS cache so canned phrases play without a network round-trip
+        audio_player.prewarm(self.tts_responses + self.status_confirmations)
         
         # Initialize UI components
         self.initUI()
@@ -1375,13 +1353,8 @@ class MainWindow(QMainWindow):
     def run_automation(self, commands):
         """Run automation commands asynchronously"""
         try:
-        # Create new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        # Run automation
-            loop.run_until_complete(Automation(commands))
-            loop.close()
+        # Run automation on the shared background loop
+            event_loop.run(Automation(commands))
         
         # Show success message in chat
             self.update_chat_safe.emit("✓ Command executed successfully", False)
@@ -1905,10 +1878,12 @@ if __name__ == "__main__":
         font = QFont()
         font.setPointSize(13)
         self.chat_text_edit.setFont(font)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(5)
+        self.responses_bridge = BusBridge(RESPONSES, self)
+        self.responses_bridge.changed.connect(self.loadMessages)
+        self.status_bridge = BusBridge(ASSISTANT_STATUS, self)
+        self.status_bridge.changed.connect(self.SpeechRecogText)
+        self.loadMessages(bus.get(RESPONSES, ""))
+        self.SpeechRecogText(GetAssistantStatus())
         self.chat_text_edit.viewport().installEventFilter(self)
         self.setStyleSheet("""
             QScrollBar:vertical {
@@ -1942,23 +1917,20 @@ if __name__ == "__main__":
             }
             """)
 
-    def loadMessages(self):
+    def loadMessages(self, messages):
         global old_chat_message
-        with open(TempDirectoryPath('Responses.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
-            if None == messages:
-                pass
-            elif len(messages) <= 1:
-                pass
-            elif str(old_chat_message) == str(messages):
-                pass
-            else:
-                self.addMessage(message=messages, color='White')
-                old_chat_message = messages
+        if None == messages:
+            pass
+        elif len(messages) <= 1:
+            pass
+        elif str(old_chat_message) == str(messages):
+            pass
+        else:
+            self.addMessage(message=messages, color='White')
+            old_chat_message = messages
 
-    def SpeechRecogText(self):
-        with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
+    def SpeechRecogText(self, messages):
+        if self.label.text() != messages:
             self.label.setText(messages)
 
     def load_icon(self, path, width=60, height=60):
@@ -2022,13 +1994,12 @@ class InitialScreen(QWidget):
         self.setFixedHeight(screen_height)
         self.setFixedWidth(screen_width)
         self.setStyleSheet("background-color: black;")
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(5)
+        self.status_bridge = BusBridge(ASSISTANT_STATUS, self)
+        self.status_bridge.changed.connect(self.SpeechRecogText)
+        self.SpeechRecogText(GetAssistantStatus())
 
-    def SpeechRecogText(self):
-        with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
+    def SpeechRecogText(self, messages):
+        if self.label.text() != messages:
             self.label.setText(messages)
 
     def load_icon(self, path, width=60, height=60):
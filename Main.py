@@ -1,3 +1,6 @@
+from Backend.lazy_imports import import_timer, prewarm
+import_timer.install()  # Times every import below for the startup report
+
 <<<<<<< HEAD
 from Frontend.GUI2 import (
 =======
@@ -15,14 +18,15 @@ from Frontend.GUI import (
 )
 from Backend.Model import FirstLayerDMM
 from Backend.RealtimeSearchEngine import RealtimeSearchEngine  # Corrected module name
-from Backend.Automation import Automation
+from Backend.Automation import Automation, PrewarmModules
 from Backend.SpeechToText import SpeechRecognition  # Corrected module name
 from Backend.Chatbot import ChatBot
-from Backend.TextToSpeech import TextToSpeech
+from Backend.TextToSpeech import TextToSpeech, PrewarmResponses
+from Backend.speech_pipeline import speech_pipeline
+from Backend.state_bus import bus, MIC_STATUS, DATABASE_TEXT, AUDIO_OUTPUT
+from Backend.image_client import image_client
+from Backend.task_executor import task_executor
 from dotenv import dotenv_values # type: ignore
-from asyncio import run
-from time import sleep
-import subprocess
 import threading
 import json
 import os
@@ -32,16 +36,20 @@ Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 DefaultMessage = f'''{Username} : Hello {Assistantname}, How are you?
 {Assistantname} : Welcome {Username}. I am doing well. How may I help you?'''
-subprocesses = []
 Functions = ["open", "close", "play", "system", "content", "google search", "youtube search"]
+# Import search/LLM SDKs and automation packages in the background once the GUI is up
+PrewarmBackends = env_vars.get("PrewarmBackends", "True").lower() == "true"
+chatbot = ChatBot()
+search_engine = RealtimeSearchEngine()
+
+# Barge-in: switching audio output off stops the answer being spoken
+bus.subscribe(AUDIO_OUTPUT, lambda key, enabled: None if enabled else speech_pipeline.cancel())
 
 def ShowDefaultChatIfNoChats():
     with open(r'Data\ChatLog.json', "r", encoding='utf-8') as file:
         if len(file.read()) < 5:
-            with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as db_file:
-                db_file.write("")
-            with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as res_file:
-                res_file.write(DefaultMessage)
+            bus.publish(DATABASE_TEXT, "")
+            ShowTextToScreen(DefaultMessage)
 
 def ReadChatLogJson():
     with open(r'Data\ChatLog.json', 'r', encoding='utf-8') as file:
@@ -58,17 +66,14 @@ def ChatLogIntegration():
             formatted_chatlog += f"Assistant: {entry['content']}\n"
     formatted_chatlog = formatted_chatlog.replace("User", Username + " ")
     formatted_chatlog = formatted_chatlog.replace("Assistant", Assistantname + " ")
-    with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-        file.write(AnswerModifier(formatted_chatlog))
+    bus.publish(DATABASE_TEXT, AnswerModifier(formatted_chatlog))
 
 def ShowChatsOnGUI():
-    with open(TempDirectoryPath('Database.data'), "r", encoding='utf-8') as file:
-        data = file.read()
-        if len(str(data)) > 0:
-            lines = data.split('\n')
-            result = '\n'.join(lines)
-            with open(TempDirectoryPath('Responses.data'), "w", encoding='utf-8') as res_file:
-                res_file.write(result)
+    data = bus.get(DATABASE_TEXT, "")
+    if len(str(data)) > 0:
+        lines = data.split('\n')
+        result = '\n'.join(lines)
+        ShowTextToScreen(result)
 
 def InitialExecution():
     SetMicrophoneStatus("False")
@@ -76,13 +81,62 @@ def InitialExecution():
     ShowDefaultChatIfNoChats()
     ChatLogIntegration()
     ShowChatsOnGUI()
+    PrewarmResponses()
+    import_timer.print_report(title="Startup import timing")
+    if PrewarmBackends:
+        search_engine.prewarm(delay=1.0)
+        prewarm(PrewarmModules, delay=1.0)
 
 InitialExecution()
 
+def SpeakStream(Chunks):
+    """Show and speak an answer while it is still being generated"""
+    def OnText(Text):
+        if speech_pipeline.cancelled:
+            return
+        SetAssistantStatus("Answering ... ")
+        ShowTextToScreen(f"{Assistantname} : {Text}")
+
+    if not bus.get(AUDIO_OUTPUT, True):
+        Answer = "".join(Chunks)
+        ShowTextToScreen(f"{Assistantname} : {Answer}")
+        return Answer
+
+    Answer = speech_pipeline.speak_stream(Chunks, on_text=OnText)
+    print(f"Speech timings: {speech_pipeline.last_timings}")
+    return Answer
+
+def GroupAnswerItems(Decision):
+    """General items stay separate; all realtime items become one list searched in parallel"""
+    Items = []
+    Realtime = []
+    for Item in Decision:
+        if Item.startswith("general"):
+            Items.append(Item)
+        elif Item.startswith("realtime"):
+            if not Realtime:
+                Items.append(Realtime)
+            Realtime.append(QueryModifier(Item.removeprefix("realtime").strip()))
+    return Items
+
+def ItemName(Item):
+    return "realtime " + " and ".join(Item) if isinstance(Item, list) else Item
+
+def AnswerDecision(Item):
+    """Blocking answer for one general item or a group of realtime sub-queries"""
+    if isinstance(Item, list):
+        return search_engine.process(Item)
+    return chatbot.generate_response(QueryModifier(Item.removeprefix("general").strip()))
+
+def StreamDecision(Item):
+    """Streaming answer for one general item or a group of realtime sub-queries"""
+    if isinstance(Item, list):
+        SetAssistantStatus("Searching...")
+        return search_engine.process_stream(Item)
+    SetAssistantStatus("Thinking ... ")
+    return chatbot.generate_streaming_response(QueryModifier(Item.removeprefix("general").strip()))
+
 def MainExecution():
-    TaskExecution = False
-    ImageExecution = False
-    ImageGenerationQuery = ""
     SetAssistantStatus("Listening ..... ")
     Query = SpeechRecognition()
     ShowTextToScreen(f"{Username} : {Query}")
@@ -93,66 +147,49 @@ def MainExecution():
     print(f"Decision: {Decision}")
     print("")
 
-    G = any([i for i in Decision if i.startswith("general")])
-    R = any([i for i in Decision if i.startswith("realtime")])
-
-    Merged_query = " and ".join(
-        [" ".join(i.split()[1:]) for i in Decision if i.startswith("general") or i.startswith("realtime")]
-    )
-    for queries in Decision:
-        if "generate" in queries:
-            ImageGenerationQuery = str(queries)
-            ImageExecution = True
-
-    for queries in Decision:
-        if not TaskExecution:  # Fixed comparison
-            if any(queries.startswith(func) for func in Functions):
-                run(Automation(list(Decision)))
-                TaskExecution = True
-        if ImageExecution:  # Fixed comparison
-            with open(r"Frontend\Files\ImageGeneration.data", "w") as file:
-                file.write(f"{ImageGenerationQuery}, True")
-            try:
-                p1 = subprocess.Popen(['python', r'Backend\ImageGeneration.py'],
-                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                     stdin=subprocess.PIPE, shell=False)
-                subprocesses.append(p1)
-            except Exception as e:
-                print(f"Error starting ImageGeneration.py: {e}")
-
-    if (G and R) or R:
-        SetAssistantStatus("Searching...")
-        Answer = RealtimeSearchEngine(QueryModifier(Merged_query))  # Corrected module name
+    AutomationItems = [i for i in Decision if any(i.startswith(func) for func in Functions)]
+    ImageItems = [i for i in Decision if i.startswith("generate")]
+    AnswerItems = GroupAnswerItems(Decision)
+    Exit = any(i.startswith("exit") for i in Decision)
+
+    # Dispatch every independent part of the decision at once
+    Futures = []
+    if AutomationItems:
+        Futures.append(task_executor.submit("automation", Automation, AutomationItems))
+    for Item in ImageItems:
+        # The resident worker picks the request up over the channel; completion arrives on the state bus
+        Futures.append(task_executor.submit(Item, image_client.generate, Item))
+    # Later answers are computed while the first one is being spoken
+    AnswerFutures = [task_executor.submit(ItemName(Item), AnswerDecision, Item) for Item in AnswerItems[1:]]
+
+    # Merge answers in decision order; the first streams straight to speech
+    Answers = []
+    if AnswerItems:
+        Answers.append(SpeakStream(StreamDecision(AnswerItems[0])))
+    for Result in task_executor.gather(AnswerFutures):
+        if Result.ok and Result.value:
+            Answers.append(SpeakStream([Result.value]))
+        else:
+            print(f"Error answering {Result.name}: {Result.error}")
+
+    Results = task_executor.gather(Futures)
+    for Result in Results:
+        if not Result.ok:
+            print(f"Error executing {Result.name}: {Result.error}")
+        elif Result.name in ImageItems and not Result.value:
+            print("Error: ImageGeneration worker is not available")
+    print(f"Task timings: {task_executor.timings(Results + task_executor.gather(AnswerFutures))}")
+
+    if Exit:
+        QueryFinal = "Okay, Bye!"
+        Answer = chatbot.generate_response(QueryModifier(QueryFinal))
         ShowTextToScreen(f"{Assistantname} : {Answer}")
-        SetAssistantStatus("Answering ... ")
+        SetAssistantStatus("Answering ...")
         TextToSpeech(Answer)
-        return True
-    else:
-        for Queries in Decision:
-            if "general" in Queries:
-                SetAssistantStatus("Thinking ... ")
-                QueryFinal = Queries.replace("general", "")
-                Answer = ChatBot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering...")
-                TextToSpeech(Answer)
-                return True
-            elif "realtime" in Queries:
-                SetAssistantStatus("Searching...")
-                QueryFinal = Queries.replace("realtime ", "")
-                Answer = RealtimeSearchEngine(QueryModifier(QueryFinal))  # Corrected module name
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                TextToSpeech(Answer)
-                return True
-            elif "exit" in Queries:
-                QueryFinal = "Okay, Bye!"
-                Answer = ChatBot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                TextToSpeech(Answer)
-                SetAssistantStatus("Answering...")
-                os._exit(1)
+        SetAssistantStatus("Answering...")
+        os._exit(1)
+
+    return bool(Answers or Futures)
 
 def FirstThread():
     while True:
@@ -161,10 +198,10 @@ def FirstThread():
             MainExecution()
         else:
             AIStatus = GetAssistantStatus()
-            if "Available..." in AIStatus:
-                sleep(0.1)
-            else:
+            if "Available..." not in AIStatus:
                 SetAssistantStatus("Available...")
+            # Sleep on the state bus until the microphone is switched on
+            bus.wait_for(MIC_STATUS, lambda status: status == "True")
 
 def SecondThread():
     GraphicalUserInterface()
@@ -42,6 +42,26 @@ def check_database_connection():
         traceback.print_exc()
         return False
 
+def check_query_plans():
+    """Check that hot message/search cache queries still use their indexes"""
+    print("\n=== QUERY PLAN TEST ===")
+    try:
+        from Data.database import db
+        
+        results = db.check_query_plans()
+        for name, result in results.items():
+            if result['ok']:
+                print(f"✓ {name}: {'; '.join(result['plan'])}")
+            else:
+                print(f"✗ {name} no longer uses its index: {'; '.join(result['plan'])}")
+        
+        return all(result['ok'] for result in results.values())
+        
+    except Exception as e:
+        print(f"✗ Query plan test failed: {e}")
+        traceback.print_exc()
+        return False
+
 def check_chat_processor():
     """Check if chat processor is working"""
     print("\n=== CHAT PROCESSOR TEST ===")
@@ -195,6 +215,7 @@ def main():
         ("File Structure", check_file_structure),
         ("Environment Variables", check_environment_variables),
         ("Database Connection", check_database_connection),
+        ("Query Plans", check_query_plans),
         ("Chat Processor", check_chat_processor),
         ("Full Integration", run_full_integration_test)
     ]